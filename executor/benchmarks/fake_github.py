@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""ベンチマーク用のGitHub APIのスタブサーバー
+
+github.py が発行するGraphQLクエリ・ミューテーションとREST呼び出しに、メモリ上の
+ボード（ProjectV2）・Issue・PR・コメントから応答します。クエリは本物のGraphQLとして
+解釈せず、github.py のクエリに含まれるフィールド名で判別します。
+
+応答ごとに固定の遅延（latency）と、返したノード数に比例する遅延（latency_per_node）を
+加えることで、ネットワークとGitHub側の処理時間を模擬できます。
+
+単体で起動して、実際のコマンドの接続先にすることもできます。
+
+    python benchmarks/fake_github.py --items 10000 --port 8765 --latency-ms 80
+    GITHUB_API_URL=http://127.0.0.1:8765 GH_TOKEN=dummy python execute.py -o o -r r -p 1
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+# ボードのStatusの選択肢
+STATUSES = ("Backlog", "Todo", "In progress", "Done")
+PRIORITIES = ("P0", "P1", "P2", "P3")
+
+# Issue・コメントの作成日時の基準
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+_CONNECTION_ARGS_PATTERN = re.compile(r"(\w+):\s*(\$?\w+|\"[^\"]*\")")
+_MUTATION_PATTERN = re.compile(
+    r"(?:(\w+)\s*:\s*)?(addReaction|addComment|updateProjectV2ItemFieldValue)\s*\("
+    r"\s*input:\s*\{(.*?)\}\s*\)",
+    re.DOTALL,
+)
+_INPUT_VARIABLE_PATTERN = re.compile(r"(\w+)\s*:\s*\$(\w+)")
+_BULK_ISSUE_PATTERN = re.compile(r"(\w+):\s*issue\(number:\s*(\d+)\)")
+_REST_COMMENT_PATTERN = re.compile(r"^/repos/[^/]+/[^/]+/issues/(\d+)/comments$")
+
+
+def _timestamp(offset_seconds: float) -> str:
+    """基準日時からの経過秒数をISO 8601形式に変換"""
+    return (BASE_TIME + timedelta(seconds=offset_seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _filler(size: int, seed: int) -> str:
+    """指定した長さのダミーテキストを生成"""
+    words = f"lorem{seed} ipsum dolor sit amet consectetur adipiscing elit "
+    return (words * (size // len(words) + 1))[:size]
+
+
+def _connection_args(query: str, field: str, variables: dict[str, Any]) -> dict[str, Any]:
+    """クエリ中の `field(...)` の引数を取り出す（$変数は variables から解決）"""
+    match = re.search(rf"\b{field}\(([^)]*)\)", query)
+    if not match:
+        return {}
+    args: dict[str, Any] = {}
+    for name, raw in _CONNECTION_ARGS_PATTERN.findall(match.group(1)):
+        if raw.startswith("$"):
+            args[name] = variables.get(raw[1:])
+        elif raw.startswith('"'):
+            args[name] = raw[1:-1]
+        elif raw.isdigit():
+            args[name] = int(raw)
+        else:
+            args[name] = raw
+    return args
+
+
+def _paginate(nodes: list[Any], args: dict[str, Any]) -> dict[str, Any]:
+    """first/after/last/before に従ってコネクションの1ページを切り出す
+
+    カーソルはリスト上の位置を文字列にしたものです。
+    """
+    start, end = 0, len(nodes)
+    if args.get("after") is not None:
+        start = int(args["after"]) + 1
+    if args.get("before") is not None:
+        end = int(args["before"])
+    if args.get("first") is not None:
+        end = min(end, start + int(args["first"]))
+    if args.get("last") is not None:
+        start = max(start, end - int(args["last"]))
+    start = min(start, end)
+    return {
+        "totalCount": len(nodes),
+        "pageInfo": {
+            "hasNextPage": end < len(nodes),
+            "hasPreviousPage": start > 0,
+            "startCursor": str(start) if end > start else None,
+            "endCursor": str(end - 1) if end > start else None,
+        },
+        "nodes": nodes[start:end],
+    }
+
+
+class FakeBoard:
+    """スタブサーバーが返すボード・Issue・PR・コメント
+
+    Issue #1〜#items がすべてボードに載っています。pr_every 件ごとのIssueには
+    `feature/{番号}` ブランチのオープンなPRがあり、それぞれ comments 件のコメントが付きます。
+    アイテムには Priority（P0〜P3 または未設定）があり、70件ごとに urgent ラベルが付きます。
+    """
+
+    def __init__(
+        self,
+        items: int = 1000,
+        backlog_every: int = 10,
+        pr_every: int = 3,
+        comments: int = 50,
+        comment_bytes: int = 400,
+        body_bytes: int = 2000,
+        latency: float = 0.0,
+        latency_per_node: float = 0.0,
+    ):
+        """初期化
+
+        Args:
+            items: ボードのアイテム数
+            backlog_every: この件数ごとに1件を Backlog にする（残りは他のStatusに順に割り当てる）
+            pr_every: この件数ごとに1件のIssueにオープンなPRを作る（0の場合は作らない）
+            comments: PRごとのコメント数
+            comment_bytes: コメント本文の長さ
+            body_bytes: Issue本文の長さ
+            latency: 1リクエストあたりの遅延（秒）
+            latency_per_node: 応答に含めたノード1件あたりの追加の遅延（秒）
+        """
+        self.items = items
+        self.pr_every = pr_every
+        self.comments = comments
+        self.comment_bytes = comment_bytes
+        self.body_bytes = body_bytes
+        self.latency = latency
+        self.latency_per_node = latency_per_node
+
+        self.statuses = {
+            number: "Backlog" if number % backlog_every == 0 else STATUSES[1 + number % 3]
+            for number in range(1, items + 1)
+        }
+        # set_status で変更したアイテムの更新日時
+        self.updated_at: dict[int, str] = {}
+        # add_pr_comment でコメントを追加したPRの更新日時
+        self.pr_updated_at: dict[int, str] = {}
+        self.posted_comments: dict[int, int] = {}
+        # addComment で投稿されたコメント本文（受け取った値のまま）
+        self.added_comment_bodies: list[Any] = []
+        self.stats: Counter = Counter()
+        self._lock = threading.Lock()
+        self._comment_cache: dict[int, list[dict[str, Any]]] = {}
+        # 以降のリクエストに1件ずつ順に注入する障害
+        #   "drop": 処理せずに応答しないまま切断する（待機中の接続をサーバーが閉じた場合と同じ）
+        #   "drop_after": 処理してから応答しないまま切断する
+        #   "graphql_error": 処理せずにHTTP 200でGraphQLの内部エラーを返す
+        #   "graphql_notice": 処理した応答に、path のない（どのフィールドのものでもない）エラーを加える
+        self.faults: list[str] = []
+
+    def take_fault(self) -> Optional[str]:
+        """次のリクエストに注入する障害を取り出す"""
+        with self._lock:
+            return self.faults.pop(0) if self.faults else None
+
+    def set_status(self, number: int, status: str) -> None:
+        """アイテムのStatusを変更（実際のAPIと同じく更新日時も現在時刻にする）"""
+        with self._lock:
+            self.statuses[number] = status
+            self.updated_at[number] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    # ---- データ ----
+
+    def _item(self, number: int) -> dict[str, Any]:
+        return {
+            "id": f"PVTI_{number}",
+            "updatedAt": self.updated_at.get(number) or _timestamp(number * 60),
+            "content": {
+                "__typename": "Issue",
+                "repository": {"nameWithOwner": "fake/fake"},
+                "number": number,
+                "title": f"Ticket {number}",
+                "url": f"https://github.com/fake/fake/issues/{number}",
+                "state": "OPEN",
+                "createdAt": _timestamp(number * 60),
+                "labels": {"nodes": self._labels(number)},
+            },
+            "fieldValueByName": {"name": self.statuses[number]},
+            "priority": self._priority(number),
+        }
+
+    def _priority(self, number: int) -> Optional[dict[str, str]]:
+        # Backlog のチケット（backlog_every の倍数）にも P0〜P3 と未設定が散らばるようにする
+        index = number * 7 // 10 % (len(PRIORITIES) + 1)
+        return {"name": PRIORITIES[index]} if index < len(PRIORITIES) else None
+
+    def _labels(self, number: int) -> list[dict[str, str]]:
+        labels = [{"name": "enhancement"}]
+        if number % 70 == 0:
+            labels.append({"name": "urgent"})
+        return labels
+
+    def _issue(self, number: int) -> Optional[dict[str, Any]]:
+        if number not in self.statuses:
+            return None
+        return {
+            "id": f"I_{number}",
+            "number": number,
+            "title": f"Ticket {number}",
+            "body": _filler(self.body_bytes, number),
+            "state": "OPEN",
+            "createdAt": _timestamp(number * 60),
+            "updatedAt": _timestamp(number * 60),
+            "author": {"login": "maintainer"},
+            "labels": {"nodes": self._labels(number)},
+        }
+
+    def has_pr(self, number: int) -> bool:
+        """IssueにオープンなPRがあるかどうか"""
+        return bool(self.pr_every) and number in self.statuses and number % self.pr_every == 0
+
+    def _pr(self, number: int) -> dict[str, Any]:
+        return {
+            "number": 100000 + number,
+            "title": f"Fix ticket {number}",
+            "url": f"https://github.com/fake/fake/pull/{100000 + number}",
+            "state": "OPEN",
+            "headRefName": f"feature/{number}",
+            "updatedAt": self.pr_updated_at.get(number) or _timestamp(number * 60 + 30),
+        }
+
+    def _pr_comments(self, number: int) -> list[dict[str, Any]]:
+        with self._lock:
+            comments = self._comment_cache.get(number)
+            if comments is None:
+                comments = self._comment_cache[number] = [
+                    {
+                        "id": f"IC_{number}_{index}",
+                        "author": (
+                            {"__typename": "User", "login": "reviewer"} if index % 2 == 0
+                            else {"__typename": "Bot", "login": "github-actions"}
+                        ),
+                        "body": _filler(self.comment_bytes, index),
+                        "createdAt": _timestamp(number * 60 + index),
+                    }
+                    for index in range(self.comments)
+                ]
+            return comments
+
+    def add_pr_comment(self, number: int, body: str, created_at: Optional[str] = None) -> None:
+        """IssueのPRにコメントを追加（実際のAPIと同じくPRの更新日時もコメントの作成日時にする）
+
+        Args:
+            number: Issue番号
+            body: コメント本文
+            created_at: コメントの作成日時（Noneの場合は現在時刻）
+        """
+        comments = self._pr_comments(number)
+        created_at = created_at or datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock:
+            index = len(comments)
+            comments.append({
+                "id": f"IC_{number}_{index}",
+                "author": {"__typename": "User", "login": "reviewer"},
+                "body": body,
+                "createdAt": created_at,
+            })
+            self.pr_updated_at[number] = created_at
+
+    # ---- GraphQL ----
+
+    def graphql(self, query: str, variables: dict[str, Any]) -> tuple[dict[str, Any], int]:
+        """GraphQLリクエストに応答
+
+        Args:
+            query: クエリまたはミューテーション
+            variables: 変数
+
+        Returns:
+            (レスポンス, 応答に含めたノード数) のタプル
+        """
+        errors: list[dict[str, Any]] = []
+        if query.lstrip().startswith("mutation"):
+            kind, nodes = "mutation", 1
+            data, errors = self._mutation(query, variables)
+        elif "fields(first" in query:
+            kind, data, nodes = "project_info", self._project_info(), 1
+        elif "projectItems" in query:
+            kind, data, nodes = "project_items", self._project_items(variables), 1
+        elif "items(first" in query:
+            kind, (data, nodes) = "board_page", self._board_page(query, variables)
+        elif "pullRequest(number" in query:
+            kind, (data, nodes) = "pr_comments", self._pr_comments_page(query, variables)
+        elif "orderBy" in query:
+            kind, (data, nodes) = "open_pr_activity", self._open_pr_activity(variables)
+        elif "pullRequests(first: 1" in query and "issue(number" in query:
+            kind, (data, nodes) = "ticket_context", self._ticket_context(query, variables)
+        elif "pullRequests(first: 1" in query:
+            kind, data, nodes = "pr_by_branch", self._pr_by_branch(variables), 1
+        elif _BULK_ISSUE_PATTERN.search(query):
+            kind, (data, nodes, errors) = "issue_details_bulk", self._issues_bulk(query)
+        elif "issue(number" in query:
+            kind, data, nodes = "issue_details", self._issue_details(variables), 1
+        else:
+            return {"errors": [{"message": "fake_github: unsupported query"}]}, 0
+
+        with self._lock:
+            self.stats[kind] += 1
+            self.stats[f"{kind}.nodes"] += nodes
+        if "rateLimit" in query and not query.lstrip().startswith("mutation"):
+            reset_at = (datetime.now(timezone.utc) + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+            data["rateLimit"] = {"cost": 1, "remaining": 4999, "resetAt": reset_at, "limit": 5000}
+        if errors:
+            return {"data": data, "errors": errors}, nodes
+        return {"data": data}, nodes
+
+    def _project_info(self) -> dict[str, Any]:
+        options = [{"id": f"OPT_{index}", "name": name} for index, name in enumerate(STATUSES)]
+        return {"repository": {"projectV2": {
+            "id": "PVT_fake",
+            "fields": {"nodes": [
+                {"id": "PVTF_title", "name": "Title"},
+                {"id": "PVTSSF_status", "name": "Status", "options": options},
+            ]},
+        }}}
+
+    def _project_items(self, variables: dict[str, Any]) -> dict[str, Any]:
+        number = int(variables["number"])
+        nodes = [{"id": f"PVTI_{number}", "project": {"id": "PVT_fake"}}] if number in self.statuses else []
+        return {"repository": {"issue": {"projectItems": _paginate(nodes, {"first": 50})}}}
+
+    def _board_page(self, query: str, variables: dict[str, Any]) -> tuple[dict[str, Any], int]:
+        numbers = list(self.statuses)
+        query_filter = variables.get("filter") or ""
+        status = re.search(r'status:"([^"]+)"', query_filter)
+        if status:
+            numbers = [number for number in numbers if self.statuses[number] == status.group(1)]
+        updated = re.search(r"updated:>=(\S+)", query_filter)
+        if updated:
+            numbers = [
+                number for number in numbers
+                if (self.updated_at.get(number) or _timestamp(number * 60))[:10] >= updated.group(1)
+            ]
+
+        page = _paginate(numbers, _connection_args(query, "items", variables))
+        page["nodes"] = [self._item(number) for number in page["nodes"]]
+        return {"repository": {"projectV2": {"items": page}}}, len(page["nodes"])
+
+    def _comments_connection(self, number: int, query: str, variables: dict[str, Any]) -> dict[str, Any]:
+        return _paginate(self._pr_comments(number), _connection_args(query, "comments", variables))
+
+    def _pr_comments_page(self, query: str, variables: dict[str, Any]) -> tuple[dict[str, Any], int]:
+        number = int(variables["number"]) - 100000
+        if not self.has_pr(number):
+            return {"repository": {"pullRequest": None}}, 0
+        comments = self._comments_connection(number, query, variables)
+        pr = dict(self._pr(number), comments=comments)
+        return {"repository": {"pullRequest": pr}}, len(comments["nodes"])
+
+    def _open_pr_activity(self, variables: dict[str, Any]) -> tuple[dict[str, Any], int]:
+        numbers = sorted((number for number in self.statuses if self.has_pr(number)), reverse=True)
+        nodes = [
+            dict(self._pr(number), comments={"nodes": self._pr_comments(number)[-int(variables.get("comments") or 1):]})
+            for number in numbers[:int(variables.get("first") or 50)]
+        ]
+        return {"repository": {"pullRequests": {"nodes": nodes}}}, len(nodes)
+
+    def _ticket_context(self, query: str, variables: dict[str, Any]) -> tuple[dict[str, Any], int]:
+        number = int(variables["number"])
+        prs = []
+        nodes = 1
+        if self.has_pr(number) and variables.get("branch") == f"feature/{number}":
+            comments = self._comments_connection(number, query, variables)
+            prs.append(dict(self._pr(number), comments=comments))
+            nodes += len(comments["nodes"])
+        return {"repository": {"issue": self._issue(number), "pullRequests": {"nodes": prs}}}, nodes
+
+    def _pr_by_branch(self, variables: dict[str, Any]) -> dict[str, Any]:
+        branch = variables.get("branch") or ""
+        number = int(branch.split("/")[-1]) if branch.split("/")[-1].isdigit() else 0
+        prs = [self._pr(number)] if self.has_pr(number) and branch == f"feature/{number}" else []
+        return {"repository": {"pullRequests": {"nodes": prs}}}
+
+    def _issues_bulk(self, query: str) -> tuple[dict[str, Any], int, list[dict[str, Any]]]:
+        """エイリアス付きのIssueの一括取得に応答
+
+        存在しないIssueは、実際のAPIと同じくそのエイリアスだけが null になり、
+        path にエイリアスを含むエラーを返します。
+        """
+        repository = {alias: self._issue(int(number)) for alias, number in _BULK_ISSUE_PATTERN.findall(query)}
+        errors = [
+            {
+                "type": "NOT_FOUND",
+                "path": ["repository", alias],
+                "message": f"Could not resolve to an Issue with the number of {alias[1:]}.",
+            }
+            for alias, issue in repository.items()
+            if issue is None
+        ]
+        return {"repository": repository}, len(repository), errors
+
+    def _issue_details(self, variables: dict[str, Any]) -> dict[str, Any]:
+        return {"repository": {"issue": self._issue(int(variables["number"]))}}
+
+    def _mutation(self, query: str, variables: dict[str, Any]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+        """エイリアス付きの複数の操作を含むミューテーションに応答
+
+        subjectId・itemId が "INVALID" で始まる操作は、実際のAPIと同じく
+        その操作だけが null になり、path にエイリアスを含むエラーを返します。
+
+        Returns:
+            (data, errors) のタプル
+        """
+        data: dict[str, Any] = {}
+        errors: list[dict[str, Any]] = []
+        for alias, field, input_text in _MUTATION_PATTERN.findall(query):
+            name = alias or field
+            inputs = {key: variables.get(variable) for key, variable in _INPUT_VARIABLE_PATTERN.findall(input_text)}
+            subject = str(inputs.get("subjectId") or inputs.get("itemId") or "")
+            with self._lock:
+                self.stats[f"mutation.{field}"] += 1
+            if subject.startswith("INVALID"):
+                data[name] = None
+                errors.append({
+                    "type": "NOT_FOUND",
+                    "path": [name],
+                    "message": f"Could not resolve to a node with the global id of '{subject}'",
+                })
+                continue
+            if field == "addReaction":
+                payload = {"reaction": {"content": inputs.get("content") or "THUMBS_UP"}}
+            elif field == "addComment":
+                with self._lock:
+                    self.added_comment_bodies.append(inputs.get("body"))
+                payload = {"commentEdge": {"node": {"id": f"IC_new_{len(data)}", "url": "https://github.com/fake"}}}
+            else:
+                payload = {"projectV2Item": {"id": inputs.get("itemId") or "PVTI_unknown"}}
+            data[name] = payload
+        return data, errors
+
+    # ---- REST ----
+
+    def rest(self, method: str, path: str, payload: Optional[dict[str, Any]]) -> tuple[int, Any]:
+        """REST APIのリクエストに応答
+
+        Returns:
+            (HTTPステータス, レスポンス) のタプル
+        """
+        match = _REST_COMMENT_PATTERN.match(path)
+        if method == "POST" and match:
+            number = int(match.group(1))
+            with self._lock:
+                self.stats["post_comment"] += 1
+                self.posted_comments[number] = self.posted_comments.get(number, 0) + 1
+            return 201, {"id": number * 1000 + self.posted_comments[number], "body": (payload or {}).get("body")}
+        return 404, {"message": "Not Found"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """スタブサーバーのHTTPハンドラ（keep-alive対応）"""
+
+    protocol_version = "HTTP/1.1"
+    # ヘッダーと本文を別々に書き込むため、Nagleアルゴリズムで応答が遅れないようにする
+    disable_nagle_algorithm = True
+    server: "FakeGitHubServer"
+
+    def _respond(self, status: int, body: Any) -> None:
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def setup(self) -> None:
+        # 待機中の接続を idle_timeout 秒で閉じる
+        self.timeout = self.server.idle_timeout
+        super().setup()
+
+    def _handle(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length)) if length else None
+        board = self.server.board
+        path = self.path.split("?")[0]
+
+        fault = board.take_fault()
+        if fault == "drop":
+            self.close_connection = True
+            return
+        if fault == "graphql_error":
+            self._respond(200, {"data": None, "errors": [{
+                "message": "Something went wrong while executing your query. "
+                "Please include `FAKE:0000` when reporting this issue.",
+            }]})
+            return
+
+        if method == "POST" and path == "/graphql":
+            response, nodes = board.graphql(payload.get("query", ""), payload.get("variables") or {})
+            status = 200
+        else:
+            status, response = board.rest(method, path, payload)
+            nodes = 1
+
+        delay = board.latency + board.latency_per_node * nodes
+        if delay > 0:
+            time.sleep(delay)
+        if fault == "drop_after":
+            self.close_connection = True
+            return
+        if fault == "graphql_notice":
+            response.setdefault("errors", []).append({
+                "message": "Although you appear to have the correct authorization credentials, "
+                "the `fake` organization has an IP allow list enabled.",
+            })
+        self._respond(status, response)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_PATCH(self) -> None:
+        self._handle("PATCH")
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # リクエストごとのアクセスログは出力しない
+        return
+
+
+class FakeGitHubServer(ThreadingHTTPServer):
+    """FakeBoard を公開するHTTPサーバー"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        board: FakeBoard,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        idle_timeout: Optional[float] = None,
+    ):
+        super().__init__((host, port), _Handler)
+        self.board = board
+        self.idle_timeout = idle_timeout
+
+    @property
+    def url(self) -> str:
+        """GITHUB_API_URL に指定するURL"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_server(
+    board: FakeBoard,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    idle_timeout: Optional[float] = None,
+) -> FakeGitHubServer:
+    """スタブサーバーをバックグラウンドで起動
+
+    Args:
+        board: 応答に使うボード
+        host: 待ち受けるアドレス
+        port: 待ち受けるポート（0の場合は空いているポート）
+        idle_timeout: 待機中の接続を閉じるまでの秒数（Noneの場合は閉じない）
+
+    Returns:
+        起動したサーバー（停止する場合は shutdown() を呼ぶ）
+    """
+    server = FakeGitHubServer(board, host, port, idle_timeout)
+    thread = threading.Thread(target=server.serve_forever, name="fake-github", daemon=True)
+    thread.start()
+    return server
+
+
+def main() -> None:
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="ベンチマーク用のGitHub APIのスタブサーバーを起動")
+    parser.add_argument("--host", default="127.0.0.1", help="待ち受けるアドレス (デフォルト: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="待ち受けるポート (デフォルト: 8765)")
+    parser.add_argument("--items", type=int, default=1000, help="ボードのアイテム数 (デフォルト: 1000)")
+    parser.add_argument("--comments", type=int, default=50, help="PRごとのコメント数 (デフォルト: 50)")
+    parser.add_argument("--comment-bytes", type=int, default=400, help="コメント本文の長さ (デフォルト: 400)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="1リクエストあたりの遅延（ミリ秒） (デフォルト: 0)")
+    parser.add_argument(
+        "--latency-per-node-ms",
+        type=float,
+        default=0.0,
+        help="応答のノード1件あたりの追加の遅延（ミリ秒） (デフォルト: 0)",
+    )
+    args = parser.parse_args()
+
+    board = FakeBoard(
+        items=args.items,
+        comments=args.comments,
+        comment_bytes=args.comment_bytes,
+        latency=args.latency_ms / 1000,
+        latency_per_node=args.latency_per_node_ms / 1000,
+    )
+    server = FakeGitHubServer(board, args.host, args.port)
+    print(f"✓ スタブサーバーを起動しました: {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"リクエスト数: {dict(board.stats)}")
+
+
+if __name__ == "__main__":
+    main()
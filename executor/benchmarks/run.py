@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""ネットワークなしで実行できるベンチマーク
+
+スタブのGitHub APIサーバー（fake_github.py）と、benchmarks/bin のスタブの gh・claude
+コマンドを使い、次の項目を計測します。
+
+    overhead: GitHub API呼び出し1回あたりのクライアント側のオーバーヘッド
+              （素のHTTPクライアント、github.py 経由、gh コマンド経由）
+    fetch:    ボードの規模（例: 100 / 1,000 / 10,000件）ごとの fetch_tickets の所要時間
+    logger:   SimpleLogger の書き込みスループット（テキスト、バッファ付き、圧縮+構造化）
+    e2e:      execute_ticket によるチケットの実行（取得・実行・報告）の1時間あたりの処理件数
+
+キャッシュとログは一時ディレクトリに書き出すため、実際のキャッシュやログには影響しません。
+レート制限のトークンバケットは、--rate-limit を指定しない限り無制限にします。
+
+使用例:
+    python benchmarks/run.py
+    python benchmarks/run.py --only fetch --items 100,1000,10000 --latency-ms 80
+    python benchmarks/run.py --only e2e --tickets 20 --concurrency 1,4,8 --claude-seconds 2 --json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from fake_github import FakeBoard, start_server  # noqa: E402
+
+BENCHMARKS = ("overhead", "fetch", "logger", "e2e")
+
+OWNER = "fake"
+REPO = "fake"
+PROJECT_NUMBER = 1
+
+
+def _parse_ints(value: str) -> list[int]:
+    """カンマ区切りの整数のリストを解析"""
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    """パーセンタイルを計算"""
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[percent - 1]
+
+
+def _timings(values: list[float]) -> dict[str, float]:
+    """所要時間（秒）のリストをミリ秒の統計値に変換"""
+    return {
+        "mean_ms": statistics.fmean(values) * 1000,
+        "p50_ms": _percentile(values, 50) * 1000,
+        "p95_ms": _percentile(values, 95) * 1000,
+    }
+
+
+@contextlib.contextmanager
+def _serve(board: FakeBoard):
+    """スタブサーバーを起動して GITHUB_API_URL を向ける"""
+    import github_client
+
+    server = start_server(board)
+    previous = os.environ.get("GITHUB_API_URL")
+    os.environ["GITHUB_API_URL"] = server.url
+    github_client.set_client(None)
+    try:
+        yield server
+    finally:
+        github_client.set_client(None)
+        if previous is None:
+            os.environ.pop("GITHUB_API_URL", None)
+        else:
+            os.environ["GITHUB_API_URL"] = previous
+        server.shutdown()
+        server.server_close()
+
+
+@contextlib.contextmanager
+def _transport(name: str):
+    """EXECUTOR_GITHUB_TRANSPORT を一時的に切り替える"""
+    previous = os.environ.get("EXECUTOR_GITHUB_TRANSPORT")
+    os.environ["EXECUTOR_GITHUB_TRANSPORT"] = name
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop("EXECUTOR_GITHUB_TRANSPORT", None)
+        else:
+            os.environ["EXECUTOR_GITHUB_TRANSPORT"] = previous
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> list[float]:
+    """func を repeat 回呼び出して1回ごとの所要時間（秒）を返す"""
+    durations = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started_at)
+    return durations
+
+
+def bench_overhead(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """GitHub API呼び出し1回あたりのオーバーヘッドを計測"""
+    import github
+    import github_client
+
+    latency = args.latency_ms / 1000
+    board = FakeBoard(items=max(args.calls, 10), latency=latency)
+    results = []
+    with _serve(board):
+        def raw_client() -> None:
+            github_client.get_client().graphql(
+                "query($number:Int!) { repository(owner: \"fake\", name: \"fake\") "
+                "{ issue(number: $number) { number } } }",
+                {"number": 1},
+            )
+
+        def via_github() -> None:
+            github.get_issue_details(OWNER, REPO, 1)
+
+        cases = [
+            ("HTTPクライアント（素）", "http", raw_client, args.calls),
+            ("github.py（HTTP）", "http", via_github, args.calls),
+            ("github.py（gh）", "gh", via_github, max(args.calls // 10, 5)),
+        ]
+        for name, transport, func, calls in cases:
+            with _transport(transport):
+                func()  # 接続の確立とトークンの解決を除く
+                durations = _measure(func, calls)
+            stats = _timings(durations)
+            results.append({
+                "case": name,
+                "calls": calls,
+                **stats,
+                "overhead_ms": stats["mean_ms"] - args.latency_ms,
+            })
+    return results
+
+
+def bench_fetch(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """ボードの規模ごとに fetch_tickets の所要時間を計測"""
+    import github
+
+    results = []
+    for items in args.items:
+        board = FakeBoard(
+            items=items,
+            latency=args.latency_ms / 1000,
+            latency_per_node=args.latency_per_node_ms / 1000,
+        )
+        with _serve(board):
+            for status in (None, "Backlog"):
+                before = board.stats["board_page"]
+                started_at = time.perf_counter()
+                # リポジトリ名を変えて、前の計測の Item ID の索引を引き継がないようにする
+                tickets = github.fetch_tickets(OWNER, f"{REPO}-{items}", PROJECT_NUMBER, status)
+                elapsed = time.perf_counter() - started_at
+                pages = board.stats["board_page"] - before
+                results.append({
+                    "items": items,
+                    "status": status or "(すべて)",
+                    "tickets": len(tickets),
+                    "pages": pages,
+                    "seconds": elapsed,
+                    "ms_per_page": elapsed / max(pages, 1) * 1000,
+                    "tickets_per_second": len(tickets) / elapsed if elapsed else 0.0,
+                })
+    return results
+
+
+def bench_logger(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """SimpleLogger の書き込みスループットを計測"""
+    from logger import SimpleLogger
+
+    message = ("x" * args.log_line_bytes)
+    cases = [
+        ("テキスト", {}),
+        ("テキスト（バッファ付き）", {"buffered": True}),
+        ("JSONL+gzip（--log-format jsonl --compress-logs）", {"compress": True, "structured": True, "issue_number": 1}),
+    ]
+    lines = args.log_lines
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for index, (name, options) in enumerate(cases):
+            # バッファなしのロガーは1行ごとにファイルを開き直すため、行数を減らして計測する
+            count = lines if options else max(lines // 10, 1)
+            logger = SimpleLogger(str(Path(tmp_dir) / f"bench_{index}.log"), **options)
+            started_at = time.perf_counter()
+            for number in range(count):
+                logger.info(f"{number:08d} {message}", stream="stdout")
+            logged_at = time.perf_counter()
+            logger.close()
+            closed_at = time.perf_counter()
+
+            total = closed_at - started_at
+            results.append({
+                "case": name,
+                "lines": count,
+                "log_call_us": (logged_at - started_at) / count * 1_000_000,
+                "lines_per_second": count / total,
+                "input_mb_per_second": count * (len(message) + 9) / total / 1_000_000,
+                "file_kb": logger.log_file.stat().st_size / 1024,
+            })
+    return results
+
+
+def bench_e2e(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """execute_ticket の1時間あたりの処理件数を計測"""
+    import execute
+
+    os.environ["FAKE_CLAUDE_SECONDS"] = str(args.claude_seconds)
+    os.environ["FAKE_CLAUDE_LINES"] = str(args.claude_lines)
+    board = FakeBoard(
+        items=max(args.tickets, 10),
+        comments=args.comments,
+        latency=args.latency_ms / 1000,
+    )
+    results = []
+    with _serve(board):
+        for concurrency in args.concurrency:
+            output = io.StringIO()
+            started_at = time.perf_counter()
+            with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    exit_codes = list(pool.map(
+                        lambda number: execute.execute_ticket(
+                            OWNER, REPO, PROJECT_NUMBER, number, "prompt",
+                            use_worktree=False, claude_output_format=args.claude_output_format,
+                        ),
+                        range(1, args.tickets + 1),
+                    ))
+            elapsed = time.perf_counter() - started_at
+            failures = sum(1 for code in exit_codes if code != 0)
+            if failures:
+                print(output.getvalue(), file=sys.stderr)
+
+            results.append({
+                "concurrency": concurrency,
+                "tickets": args.tickets,
+                "failures": failures,
+                "seconds": elapsed,
+                "tickets_per_hour": args.tickets / elapsed * 3600,
+                # 1件あたりの所要時間のうち、Claude Code の実行以外（取得・ログ・報告）にかかった時間
+                "overhead_per_ticket_s": elapsed * concurrency / args.tickets - args.claude_seconds,
+            })
+    return results
+
+
+def _print_table(title: str, rows: list[dict[str, Any]], columns: list[tuple[str, str, str]]) -> None:
+    """結果を表形式で出力"""
+    print(f"\n## {title}")
+    widths = [
+        max(len(header), *(len(format(row[key], spec)) for row in rows))
+        for header, key, spec in columns
+    ]
+    print("  ".join(header.rjust(width) for (header, _, _), width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(format(row[key], spec).rjust(width) for (_, key, spec), width in zip(columns, widths)))
+
+
+def print_report(results: dict[str, list[dict[str, Any]]]) -> None:
+    """計測結果を出力"""
+    if "overhead" in results:
+        _print_table("API呼び出し1回あたりの時間（get_issue_details）", results["overhead"], [
+            ("方式", "case", ""), ("回数", "calls", "d"), ("平均ms", "mean_ms", ".2f"),
+            ("p50ms", "p50_ms", ".2f"), ("p95ms", "p95_ms", ".2f"),
+            ("オーバーヘッドms", "overhead_ms", ".2f"),
+        ])
+    if "fetch" in results:
+        _print_table("fetch_tickets のスケーリング", results["fetch"], [
+            ("アイテム数", "items", "d"), ("Status", "status", ""), ("件数", "tickets", "d"),
+            ("ページ", "pages", "d"), ("秒", "seconds", ".3f"), ("ms/ページ", "ms_per_page", ".2f"),
+            ("件/秒", "tickets_per_second", ".0f"),
+        ])
+    if "logger" in results:
+        _print_table("SimpleLogger のスループット", results["logger"], [
+            ("モード", "case", ""), ("行数", "lines", "d"), ("log()µs", "log_call_us", ".2f"),
+            ("行/秒", "lines_per_second", ".0f"), ("MB/秒", "input_mb_per_second", ".1f"),
+            ("ファイルKB", "file_kb", ".0f"),
+        ])
+    if "e2e" in results:
+        _print_table("エンドツーエンド（execute_ticket）", results["e2e"], [
+            ("並行数", "concurrency", "d"), ("チケット", "tickets", "d"), ("失敗", "failures", "d"),
+            ("秒", "seconds", ".2f"), ("件/時", "tickets_per_hour", ".0f"),
+            ("1件あたりのオーバーヘッド秒", "overhead_per_ticket_s", ".3f"),
+        ])
+
+
+def main() -> None:
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="スタブの GitHub API と Claude Code を使ったベンチマーク")
+    parser.add_argument(
+        "--only",
+        type=lambda value: value.split(","),
+        default=list(BENCHMARKS),
+        help=f"実行するベンチマーク（カンマ区切り: {','.join(BENCHMARKS)}） (デフォルト: すべて)",
+    )
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="スタブサーバーの1リクエストあたりの遅延（ミリ秒） (デフォルト: 0)")
+    parser.add_argument(
+        "--latency-per-node-ms",
+        type=float,
+        default=0.0,
+        help="ボードのページのアイテム1件あたりの追加の遅延（ミリ秒） (デフォルト: 0)",
+    )
+    parser.add_argument("--calls", type=int, default=200, help="overhead: 方式ごとの呼び出し回数 (デフォルト: 200)")
+    parser.add_argument("--items", type=_parse_ints, default=[100, 1000, 10000], help="fetch: ボードのアイテム数 (デフォルト: 100,1000,10000)")
+    parser.add_argument("--log-lines", type=int, default=100000, help="logger: 書き込む行数 (デフォルト: 100000)")
+    parser.add_argument("--log-line-bytes", type=int, default=120, help="logger: 1行の長さ (デフォルト: 120)")
+    parser.add_argument("--tickets", type=int, default=8, help="e2e: 実行するチケット数 (デフォルト: 8)")
+    parser.add_argument("--concurrency", type=_parse_ints, default=[1, 4], help="e2e: 並行数 (デフォルト: 1,4)")
+    parser.add_argument("--claude-seconds", type=float, default=0.5, help="e2e: スタブの Claude Code の実行時間（秒） (デフォルト: 0.5)")
+    parser.add_argument("--claude-lines", type=int, default=5000, help="e2e: スタブの Claude Code の出力行数 (デフォルト: 5000)")
+    parser.add_argument(
+        "--claude-output-format",
+        choices=["text", "stream-json"],
+        default="stream-json",
+        help="e2e: Claude Codeの出力形式 (デフォルト: stream-json)",
+    )
+    parser.add_argument("--comments", type=int, default=200, help="e2e: PRごとのコメント数 (デフォルト: 200)")
+    parser.add_argument("--rate-limit", action="store_true", help="レート制限のトークンバケットを無効にしない")
+    parser.add_argument("--json", action="store_true", help="結果をJSONで出力")
+    args = parser.parse_args()
+
+    unknown = sorted(set(args.only) - set(BENCHMARKS))
+    if unknown:
+        parser.error(f"不明なベンチマーク: {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory(prefix="executor-bench-") as work_dir:
+        # 実行環境を一時ディレクトリとスタブのコマンドに向けてから executor のモジュールを読み込む
+        os.environ["EXECUTOR_CACHE_DIR"] = str(Path(work_dir) / "cache")
+        os.environ["EXECUTOR_LOG_DIR"] = str(Path(work_dir) / "logs")
+        os.environ["GH_TOKEN"] = "fake-token"
+        os.environ["PATH"] = f"{BENCH_DIR / 'bin'}{os.pathsep}{os.environ.get('PATH', '')}"
+
+        import rate_limit
+
+        if not args.rate_limit:
+            rate_limit.set_limiter(rate_limit.RateLimiter(points_per_minute=10 ** 9))
+
+        runners = {"overhead": bench_overhead, "fetch": bench_fetch, "logger": bench_logger, "e2e": bench_e2e}
+        results = {}
+        for name in BENCHMARKS:
+            if name in args.only:
+                if not args.json:
+                    print(f"計測中: {name} ...", file=sys.stderr)
+                results[name] = runners[name](args)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
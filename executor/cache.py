@@ -0,0 +1,196 @@
+"""ディスクに永続化するシンプルなTTL付きキャッシュ"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+
+# キャッシュファイルの保存先（EXECUTOR_CACHE_DIR で変更可能）
+DEFAULT_CACHE_DIR = Path(__file__).parent / ".cache"
+
+# set_cache_dir で一時的に切り替えたキャッシュディレクトリ
+_cache_dir_override: Optional[Path] = None
+
+
+def get_cache_dir() -> Path:
+    """キャッシュディレクトリを取得
+
+    Returns:
+        キャッシュディレクトリのパス
+    """
+    if _cache_dir_override is not None:
+        return _cache_dir_override
+    return Path(os.environ.get("EXECUTOR_CACHE_DIR") or DEFAULT_CACHE_DIR)
+
+
+def set_cache_dir(path: Optional[Path]) -> None:
+    """プロセス内のキャッシュディレクトリを切り替える
+
+    作成済みの JsonFileCache も、次回のアクセスから新しいディレクトリを使います。
+
+    Args:
+        path: 新しいキャッシュディレクトリ（Noneの場合は環境変数またはデフォルト値に戻す）
+    """
+    global _cache_dir_override
+    _cache_dir_override = Path(path) if path is not None else None
+
+
+class JsonFileCache:
+    """JSONファイルに永続化するTTL付きキャッシュ
+
+    値はJSONに変換できるものに限ります。書き込みは一時ファイル経由で置き換えるため、
+    途中でプロセスが終了してもファイルが壊れることはありません。
+    監視モードのデーモンと単発の実行のように複数のプロセスが同じキャッシュを使う場合も、
+    書き込みはファイルロックを取ってからファイルを読み直し、変更したキーだけを反映するため、
+    他のプロセスが保存したエントリを失いません。読み込みもファイルが更新されていれば読み直します。
+    """
+
+    def __init__(self, name: str, ttl: Optional[float] = None):
+        """初期化
+
+        Args:
+            name: キャッシュ名（ファイル名に使用）
+            ttl: 有効期間（秒）。Noneの場合は期限切れにならない
+        """
+        self.name = name
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Optional[dict[str, dict[str, Any]]] = None
+        self._loaded_path: Optional[Path] = None
+        self._loaded_stat: Optional[tuple[int, int]] = None
+
+    @property
+    def path(self) -> Path:
+        """キャッシュファイルのパス"""
+        return get_cache_dir() / f"{self.name}.json"
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        """ファイルからエントリを読み込む（初回と、ファイルやキャッシュディレクトリが変わった場合のみ）"""
+        path = self.path
+        try:
+            stat = os.stat(path)
+            signature: Optional[tuple[int, int]] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+        if self._entries is None or self._loaded_path != path or self._loaded_stat != signature:
+            self._loaded_path = path
+            self._loaded_stat = signature
+            try:
+                with open(path, encoding="utf-8") as f:
+                    entries = json.load(f)
+                self._entries = entries if isinstance(entries, dict) else {}
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    @contextlib.contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """他のプロセスの書き込みと排他するファイルロック（ロックできない環境では何もしない）"""
+        if fcntl is None:
+            yield
+            return
+        lock_path = self.path.with_suffix(".lock")
+        try:
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            lock_file = open(lock_path, "a")
+        except OSError:
+            yield
+            return
+        with lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _modify(self, change: Callable[[dict[str, dict[str, Any]]], bool]) -> None:
+        """ファイルの最新の内容に変更を適用して保存
+
+        Args:
+            change: エントリを変更する関数（変更がない場合はFalseを返す）
+        """
+        with self._lock, self._file_lock():
+            if change(self._load()):
+                self._save()
+
+    def _save(self) -> None:
+        """エントリをファイルへ書き込む"""
+        try:
+            self._loaded_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self._loaded_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self._loaded_path)
+            stat = os.stat(self._loaded_path)
+            self._loaded_stat = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            # キャッシュの保存に失敗しても処理は続行する
+            pass
+
+    def get(self, key: str) -> Optional[Any]:
+        """値を取得
+
+        Args:
+            key: キー
+
+        Returns:
+            キャッシュされた値（存在しないか期限切れの場合はNone）
+        """
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is None:
+                return None
+            if self.ttl is not None and time.time() - entry.get("stored_at", 0) > self.ttl:
+                return None
+            return entry.get("value")
+
+    def set(self, key: str, value: Any) -> None:
+        """値を保存
+
+        Args:
+            key: キー
+            value: JSONに変換可能な値
+        """
+        def change(entries: dict[str, dict[str, Any]]) -> bool:
+            entries[key] = {"stored_at": time.time(), "value": value}
+            return True
+
+        self._modify(change)
+
+    def delete(self, key: str) -> None:
+        """値を削除
+
+        Args:
+            key: キー
+        """
+        self._modify(lambda entries: entries.pop(key, None) is not None)
+
+    def update(self, key: str, values: dict[str, Any]) -> None:
+        """辞書型の値に要素をまとめて追加・更新
+
+        内容が変わらない場合はファイルへの書き込みを省略します。
+
+        Args:
+            key: キー
+            values: 追加・更新する要素
+        """
+        def change(entries: dict[str, dict[str, Any]]) -> bool:
+            entry = entries.get(key)
+            current = entry.get("value") if entry else None
+            if not isinstance(current, dict):
+                current = {}
+            if all(current.get(k) == v for k, v in values.items()) and entry is not None:
+                return False
+            current.update(values)
+            entries[key] = {"stored_at": time.time(), "value": current}
+            return True
+
+        self._modify(change)
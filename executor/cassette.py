@@ -0,0 +1,274 @@
+"""GitHub APIのリクエストと応答の記録・再生（カセット）
+
+記録モードでは、github.py が送信したリクエストと受け取った応答（エラーを含む）を
+カセットファイル（1行1件のJSONL）に追記します。再生モードでは、ネットワークに接続せずに
+カセットから応答を返します。リクエストはクエリ文書（空白を正規化したもの）と変数で照合します。
+
+同じリクエストが複数回記録されている場合は記録された順に返し、使い切った後は最後の応答を
+繰り返し返します。記録されていないリクエストは CassetteMissError になります。
+
+送信するリクエストはディスク上のキャッシュ（プロジェクトのメタデータ、Item ID、PRコメントの
+カーソルなど）の状態によって変わるため、記録・再生の間は空の一時ディレクトリをキャッシュに使います。
+これにより、記録したときと同じリクエストが再生時にも送信され、実際のキャッシュも書き換えません。
+
+環境変数:
+    EXECUTOR_GITHUB_CASSETTE: カセットファイルのパス（execute.py の --record-github / --replay-github と同じ）
+    EXECUTOR_GITHUB_CASSETTE_MODE: "record" または "replay"（既定: replay）
+
+使用例:
+    python execute.py -p 1 --record-github incident.jsonl --execute
+    python execute.py -p 1 --replay-github incident.jsonl --format prompt
+"""
+
+import atexit
+import copy
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Callable, Optional
+
+import cache
+from github_client import GitHubAPIError
+
+RECORD = "record"
+REPLAY = "replay"
+MODES = (RECORD, REPLAY)
+
+CASSETTE_ENV = "EXECUTOR_GITHUB_CASSETTE"
+CASSETTE_MODE_ENV = "EXECUTOR_GITHUB_CASSETTE_MODE"
+
+# カセットファイルの形式のバージョン
+CASSETTE_VERSION = 1
+
+# 照合できなかったリクエストをエラーメッセージに含める最大文字数
+MAX_MISS_PREVIEW_CHARS = 200
+
+# 記録・再生するGitHubAPIErrorの属性
+_ERROR_ATTRIBUTES = ("status", "transient", "sent", "rate_limited", "retry_after")
+
+
+class CassetteMissError(GitHubAPIError):
+    """再生モードで、カセットに記録されていないリクエストが送信された"""
+
+
+def _normalize_target(target: str) -> str:
+    """クエリ文書の空白の違いを無視するために正規化"""
+    return " ".join(target.split())
+
+
+def _normalize_variables(variables: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """変数を正規化（null は省略と同じ扱いにする）"""
+    return {key: value for key, value in (variables or {}).items() if value is not None}
+
+
+def request_key(kind: str, target: str, variables: Optional[dict[str, Any]] = None) -> str:
+    """リクエストの照合に使うキーを生成
+
+    Args:
+        kind: "graphql" または "rest"
+        target: GraphQLのクエリ文書、またはRESTの "METHOD path"
+        variables: GraphQLの変数、またはRESTのリクエストボディ
+
+    Returns:
+        キー
+    """
+    variables_json = json.dumps(
+        _normalize_variables(variables), sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return f"{kind}\n{_normalize_target(target)}\n{variables_json}"
+
+
+class Cassette:
+    """1つのカセットファイルへの記録、またはカセットファイルからの再生
+
+    複数スレッドから同時に呼び出しても安全です。
+    """
+
+    def __init__(self, path: Path, mode: str = REPLAY):
+        """初期化
+
+        記録モードではファイルを新しく作り直し、再生モードではファイルを読み込みます。
+
+        Args:
+            path: カセットファイルのパス
+            mode: "record" または "replay"
+
+        Raises:
+            ValueError: mode が不正な場合
+            RuntimeError: 再生モードでカセットファイルを読み込めない場合
+        """
+        if mode not in MODES:
+            raise ValueError(f"カセットのモードは {', '.join(MODES)} のいずれかです: {mode}")
+        self.path = Path(path)
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self._interactions: dict[str, list[dict[str, Any]]] = {}
+        self._positions: dict[str, int] = {}
+
+        if mode == RECORD:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._write({"version": CASSETTE_VERSION, "recorded_at": datetime.now().isoformat()})
+            atexit.register(self.close)
+        else:
+            self._load()
+
+    def _load(self) -> None:
+        """カセットファイルを読み込む"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = [line for line in f if line.strip()]
+        except OSError as e:
+            raise RuntimeError(f"カセットファイルを読み込めません: {e}")
+
+        if not lines or json.loads(lines[0]).get("version") != CASSETTE_VERSION:
+            raise RuntimeError(f"カセットファイルの形式が不正です: {self.path}")
+        for line in lines[1:]:
+            entry = json.loads(line)
+            key = request_key(entry["kind"], entry["target"], entry.get("variables"))
+            self._interactions.setdefault(key, []).append(entry)
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        """カセットファイルに1行追記（途中で異常終了しても記録済みの分は残る）"""
+        self._file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def play(
+        self,
+        kind: str,
+        target: str,
+        variables: Optional[dict[str, Any]],
+        send: Callable[[], Any],
+    ) -> Any:
+        """リクエストを送信して記録する、またはカセットから応答を返す
+
+        Args:
+            kind: "graphql" または "rest"
+            target: GraphQLのクエリ文書、またはRESTの "METHOD path"
+            variables: GraphQLの変数、またはRESTのリクエストボディ
+            send: 実際にリクエストを送信する関数（再生モードでは呼び出さない）
+
+        Returns:
+            デコード済みの応答
+
+        Raises:
+            GitHubAPIError: 送信に失敗した場合、または記録されたエラーを再生した場合
+            CassetteMissError: 再生モードで、記録されていないリクエストの場合
+        """
+        if self.mode == REPLAY:
+            return self._replay(kind, target, variables)
+
+        entry: dict[str, Any] = {
+            "kind": kind,
+            "target": target,
+            "variables": _normalize_variables(variables),
+        }
+        try:
+            response = send()
+        except GitHubAPIError as e:
+            entry["error"] = {"message": str(e), **{name: getattr(e, name) for name in _ERROR_ATTRIBUTES}}
+            self._record(entry)
+            raise
+        entry["response"] = response
+        # 記録はこの時点でJSONに変換されるため、呼び出し元が応答を書き換えても影響しない
+        self._record(entry)
+        return response
+
+    def _record(self, entry: dict[str, Any]) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._write(entry)
+
+    def _replay(self, kind: str, target: str, variables: Optional[dict[str, Any]]) -> Any:
+        key = request_key(kind, target, variables)
+        with self._lock:
+            entries = self._interactions.get(key)
+            if not entries:
+                # 照合に失敗した原因が分かりやすいよう、変数をクエリ文書より先に示す
+                variables_json = json.dumps(_normalize_variables(variables), ensure_ascii=False)
+                preview = f"{kind} {variables_json} {_normalize_target(target)}"
+                if len(preview) > MAX_MISS_PREVIEW_CHARS:
+                    preview = preview[:MAX_MISS_PREVIEW_CHARS] + "…"
+                raise CassetteMissError(f"GitHub API error: カセットに記録されていないリクエストです: {preview}")
+            position = self._positions.get(key, 0)
+            entry = entries[min(position, len(entries) - 1)]
+            self._positions[key] = position + 1
+
+        error = entry.get("error")
+        if error is not None:
+            raise GitHubAPIError(error["message"], **{name: error.get(name) for name in _ERROR_ATTRIBUTES})
+        return copy.deepcopy(entry.get("response"))
+
+    def close(self) -> None:
+        """記録モードのカセットファイルを閉じる"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        atexit.unregister(self.close)
+
+
+_cassette: Optional[Cassette] = None
+_configured = False
+_cassette_lock = threading.Lock()
+_cache_dir: Optional[tempfile.TemporaryDirectory] = None
+
+
+def _isolate_cache(enabled: bool) -> None:
+    """記録・再生に使うキャッシュディレクトリを空の一時ディレクトリに切り替える
+
+    カセットを差し替えるたびに作り直し、記録・再生をやめた場合は元のディレクトリに戻します。
+
+    Args:
+        enabled: 記録・再生するかどうか
+    """
+    global _cache_dir
+    if _cache_dir is not None:
+        cache.set_cache_dir(None)
+        _cache_dir.cleanup()
+        _cache_dir = None
+    if enabled:
+        _cache_dir = tempfile.TemporaryDirectory(prefix="executor-cassette-cache-")
+        cache.set_cache_dir(Path(_cache_dir.name))
+
+
+def get_cassette() -> Optional[Cassette]:
+    """プロセス共有のカセットを取得（初回は環境変数から設定）
+
+    Returns:
+        Cassette インスタンス（記録・再生しない場合はNone）
+    """
+    global _cassette, _configured
+    with _cassette_lock:
+        if not _configured:
+            path = os.environ.get(CASSETTE_ENV)
+            if path:
+                _cassette = Cassette(Path(path), os.environ.get(CASSETTE_MODE_ENV) or REPLAY)
+            _configured = True
+        return _cassette
+
+
+def set_cassette(cassette: Optional[Cassette]) -> None:
+    """プロセス共有のカセットを差し替える
+
+    Args:
+        cassette: 新しいカセット（Noneの場合は記録・再生しない）
+    """
+    global _cassette, _configured
+    with _cassette_lock:
+        old, _cassette = _cassette, cassette
+        _configured = True
+        if old is not cassette:
+            _isolate_cache(cassette is not None)
+    if old is not None and old is not cassette:
+        old.close()
+
+
+# カセットは最初のリクエストで設定されるが、それより前にキャッシュが読まれることがあるため、
+# 環境変数で指定されている場合は読み込み時点でキャッシュを切り替える
+if os.environ.get(CASSETTE_ENV):
+    _isolate_cache(True)
@@ -0,0 +1,213 @@
+"""Claude Codeの stream-json 出力の逐次デコード
+
+`claude -p --output-format stream-json --verbose` は1行に1つのJSONイベントを出力します。
+
+    {"type": "system", "subtype": "init", ...}
+    {"type": "assistant", "message": {"id": ..., "content": [...], "usage": {...}}}
+    {"type": "user", "message": {"content": [{"type": "tool_result", "tool_use_id": ...}]}}
+    {"type": "result", "duration_ms": ..., "num_turns": ..., "usage": {...}, "total_cost_usd": ...}
+
+StreamJsonDecoder はイベントを受け取るたびに、ターンごとのレイテンシ（モデルに制御が
+渡ってから応答が届くまで）、ツール呼び出しの所要時間（tool_use から tool_result まで）、
+トークン使用量を記録します。
+"""
+
+import json
+import time
+from typing import Any, Callable, Optional
+
+# トークン使用量として集計する項目
+USAGE_KEYS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+)
+
+# ログに出力するツール入力・結果の最大文字数
+MAX_PREVIEW_CHARS = 200
+
+
+def _preview(value: Any) -> str:
+    """ログ用に値を1行に縮める"""
+    text = value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+    text = " ".join(text.split())
+    if len(text) > MAX_PREVIEW_CHARS:
+        text = text[:MAX_PREVIEW_CHARS] + "…"
+    return text
+
+
+def _result_text(content: Any) -> str:
+    """tool_result の content をテキストに変換"""
+    if isinstance(content, list):
+        return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return content if isinstance(content, str) else ""
+
+
+def _usage_counts(usage: Any) -> dict[str, int]:
+    """usage をトークン使用量の辞書に変換（想定外の値は0とみなす）"""
+    counts = dict.fromkeys(USAGE_KEYS, 0)
+    if isinstance(usage, dict):
+        for key in USAGE_KEYS:
+            try:
+                counts[key] = int(usage.get(key) or 0)
+            except (TypeError, ValueError):
+                pass
+    return counts
+
+
+class StreamJsonDecoder:
+    """stream-json のイベントを逐次デコードして実行の内訳を記録する
+
+    1つのプロセスの出力に対して1つのインスタンスを使います。
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """初期化
+
+        Args:
+            clock: 経過時間の計測に使う時計（秒）
+        """
+        self._clock = clock
+        self._turn_started_at = clock()
+        self._pending_tools: dict[str, tuple[str, float]] = {}
+        self._usage_by_message: dict[str, dict[str, int]] = {}
+
+        self.turns: list[dict[str, Any]] = []
+        self.tool_calls: list[dict[str, Any]] = []
+        self.result: Optional[dict[str, Any]] = None
+        self.session_id: Optional[str] = None
+        self.model: Optional[str] = None
+
+    def feed(self, line: str) -> list[str]:
+        """出力の1行をデコード
+
+        Args:
+            line: Claude Codeの標準出力の1行
+
+        Returns:
+            ログに出力する行のリスト（JSONでない行と、内訳の集計に使わないイベントはそのまま返す）
+        """
+        line = line.strip()
+        if not line:
+            return []
+        try:
+            event = json.loads(line)
+        except ValueError:
+            return [line]
+        if not isinstance(event, dict):
+            return [line]
+
+        now = self._clock()
+        handler = getattr(self, f"_on_{event.get('type')}", None)
+        if handler is None:
+            return [line]
+        return handler(event, now) or [line]
+
+    def _on_system(self, event: dict[str, Any], now: float) -> list[str]:
+        if event.get("subtype") != "init":
+            return []
+        self.session_id = event.get("session_id")
+        self.model = event.get("model")
+        self._turn_started_at = now
+        return [f"[session] {self.session_id} model={self.model}"]
+
+    def _on_assistant(self, event: dict[str, Any], now: float) -> list[str]:
+        message = event.get("message")
+        if not isinstance(message, dict):
+            return []
+        message_id = message.get("id") or f"turn-{len(self.turns)}"
+        lines = []
+
+        # 1つのメッセージの内容ブロックは別々のイベントとして届くので、最初のイベントで計測する
+        if message_id not in self._usage_by_message:
+            latency = now - self._turn_started_at
+            self.turns.append({"message_id": message_id, "latency": latency})
+            lines.append(f"[turn {len(self.turns)}] latency={latency:.2f}s")
+        self._usage_by_message[message_id] = _usage_counts(message.get("usage"))
+
+        content = message.get("content")
+        for block in content if isinstance(content, list) else []:
+            if not isinstance(block, dict):
+                continue
+            if block.get("type") == "text":
+                lines.extend(block.get("text", "").splitlines())
+            elif block.get("type") == "tool_use":
+                self._pending_tools[block.get("id")] = (block.get("name", "?"), now)
+                lines.append(f"[tool_use] {block.get('name')} {_preview(block.get('input', {}))}")
+
+        return lines
+
+    def _on_user(self, event: dict[str, Any], now: float) -> list[str]:
+        message = event.get("message")
+        content = message.get("content") if isinstance(message, dict) else None
+        if not isinstance(content, list):
+            return []
+
+        lines = []
+        for block in content:
+            if not isinstance(block, dict) or block.get("type") != "tool_result":
+                continue
+            name, started_at = self._pending_tools.pop(block.get("tool_use_id"), ("?", now))
+            duration = now - started_at
+            is_error = bool(block.get("is_error"))
+            self.tool_calls.append({"name": name, "duration": duration, "is_error": is_error})
+            status = "error" if is_error else "ok"
+            lines.append(
+                f"[tool_result] {name} {status} {duration:.2f}s {_preview(_result_text(block.get('content')))}"
+            )
+
+        # ツールの結果が返ると、次のターンのモデル呼び出しが始まる
+        self._turn_started_at = now
+        return lines
+
+    def _on_result(self, event: dict[str, Any], now: float) -> list[str]:
+        self.result = event
+        # 最終結果の本文は最後のアシスタントメッセージと同じなので、ログには出力しない
+        return [
+            f"[result] {event.get('subtype')} turns={event.get('num_turns')} "
+            f"duration_api={(event.get('duration_api_ms') or 0) / 1000:.2f}s"
+        ]
+
+    def usage(self) -> dict[str, int]:
+        """トークン使用量の合計を取得
+
+        result イベントに使用量が含まれていればそれを、なければメッセージごとの使用量の合計を返します。
+
+        Returns:
+            USAGE_KEYS をキーとする辞書
+        """
+        if self.result and isinstance(self.result.get("usage"), dict):
+            return _usage_counts(self.result["usage"])
+        totals = dict.fromkeys(USAGE_KEYS, 0)
+        for usage in self._usage_by_message.values():
+            for key in USAGE_KEYS:
+                totals[key] += usage[key]
+        return totals
+
+    def summary(self) -> dict[str, Any]:
+        """実行の内訳を集計
+
+        Returns:
+            {"turns", "model_time", "max_turn_latency", "tool_calls", "tool_time",
+             "tool_errors", "tools", "usage", "cost_usd"} の辞書。
+            tools はツール名ごとの {"count", "duration"}（所要時間の長い順）
+        """
+        tools: dict[str, dict[str, Any]] = {}
+        for call in self.tool_calls:
+            stats = tools.setdefault(call["name"], {"count": 0, "duration": 0.0})
+            stats["count"] += 1
+            stats["duration"] += call["duration"]
+
+        latencies = [turn["latency"] for turn in self.turns]
+        return {
+            "turns": len(self.turns),
+            "model_time": sum(latencies),
+            "max_turn_latency": max(latencies, default=0.0),
+            "tool_calls": len(self.tool_calls),
+            "tool_time": sum(call["duration"] for call in self.tool_calls),
+            "tool_errors": sum(1 for call in self.tool_calls if call["is_error"]),
+            "tools": dict(sorted(tools.items(), key=lambda item: -item[1]["duration"])),
+            "usage": self.usage(),
+            "cost_usd": (self.result or {}).get("total_cost_usd"),
+        }
@@ -2,26 +2,39 @@
 """チケットをClaude Codeに実行させるコマンド"""
 
 import argparse
+import asyncio
 import hashlib
 import json
 import subprocess
 import sys
 import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-
+from typing import Any, Callable, Optional
+
+import cassette
+import github_async
+import metrics
+import prompt_budget
+import rate_limit
+import scheduler
+import tracing
 from github import (
     get_git_remote_info,
-    get_issue_details,
-    post_issue_comment,
-    fetch_tickets,
-    get_pr_by_branch_name,
-    get_pr_comments,
+    fetch_tickets_iter,
+    fetch_ticket_context,
     update_ticket_status,
-    add_reaction_to_comment,
+    WriteBatch,
 )
+from claude_stream import StreamJsonDecoder
+import log_files
+from log_files import get_log_dir, maintain_logs, trace_path
 from logger import SimpleLogger
+from targets import Target, load_config
+from watcher import BACKLOG_STATUS, BoardWatcher
+from worktree import create_worktree, remove_worktree
 
 
 # プロンプトテンプレート（PR未作成の場合）
@@ -40,7 +53,7 @@ PROMPT_TEMPLATE = """# チケット #{issue_number}: {issue_title}
 ## 実行内容
 このチケットに基づいて、以下のタスクを実行してください：
 
-1. `feature/{issue_number}` ブランチに移動する。ブランチが存在しなければmasterへ移動し、最新版をpullしたあと新しくブランチを作成する。
+1. `feature/{issue_number}` ブランチで作業する。現在のブランチが `feature/{issue_number}` でなければ、`git fetch origin` のあと、ブランチが存在すればそれに切り替え、存在しなければ `origin/master` から新しく作成する（masterブランチはチェックアウトしない）。
 2. 上記の説明に従って実装を進める。
 3. 適切なテストを追加する。
 4. 必要に応じてドキュメントを更新する。
@@ -50,7 +63,7 @@ PROMPT_TEMPLATE = """# チケット #{issue_number}: {issue_title}
     - 本文末尾に "Close #{issue_number}" を追加し、チケットを自動でクローズできるようにする。
     - プルリクエストの自動マージを有効化する。
 
-6. masterブランチへ戻る。
+6. 作業開始時のブランチへ戻る（最初から `feature/{issue_number}` だった場合はそのままでよい）。
 
 コードの品質に注意し、プロジェクトの標準に従ってください。"""
 
@@ -77,25 +90,33 @@ PROMPT_TEMPLATE_WITH_PR = """# チケット #{issue_number}: {issue_title}
 {pr_comments_section}## 実行内容
 以下のタスクを実行してください：
 
-1. `feature/{issue_number}` ブランチに移動する。
+1. `feature/{issue_number}` ブランチで作業する。現在のブランチが `feature/{issue_number}` でなければ、`git fetch origin` のあと切り替える（masterブランチはチェックアウトしない）。
 2. 上記のコメントに対応するように実装を修正する。
 3. 変更をコミットしてプッシュする。
-4. masterブランチへ戻る。
+4. 作業開始時のブランチへ戻る（最初から `feature/{issue_number}` だった場合はそのままでよい）。
 
 **注意**: すでにプルリクエストが作成されているため、新たなプルリクエストは作成しないでください。既存PRに新しいコミットを追加します。
 
 コードの品質に注意し、プロジェクトの標準に従ってください。"""
 
 
+@tracing.traced("render_prompt")
 def render_prompt(
-    issue_details: dict, pr_info: dict = None, pr_comments: list = None
+    issue_details: dict,
+    pr_info: dict = None,
+    pr_comments: list = None,
+    comment_token_budget: Optional[int] = None,
 ) -> str:
     """チケット情報をプロンプトテンプレートに補完
 
+    PRコメントは executor 自身の結果コメントを除き、新しく対応が必要そうなものから
+    トークン予算に収まるだけ含めます（prompt_budget.select_comments）。
+
     Args:
         issue_details: get_issue_detailsの返り値
         pr_info: ブランチに対応するPR情報（オプション）
         pr_comments: PRのコメント情報リスト（オプション）
+        comment_token_budget: PRコメントに使うトークン数の上限（Noneの場合は設定値）
 
     Returns:
         レンダリング済みプロンプト
@@ -107,12 +128,13 @@ def render_prompt(
         # 既存PRがある場合
         pr_comments_section = ""
         if pr_comments:
-            pr_comments_section = "## PR に寄せられたコメント\n"
-            for comment in pr_comments:
-                pr_comments_section += (
-                    f"**{comment.get('author', 'unknown')}**: {comment.get('body', '')}\n\n"
+            selection = prompt_budget.select_comments(pr_comments, comment_token_budget)
+            pr_comments_section = selection.section
+            if selection.dropped:
+                print(
+                    f"✓ #{issue_details.get('number')} のPRコメント: {selection.describe()}",
+                    file=sys.stderr,
                 )
-            pr_comments_section += "\n"
 
         return PROMPT_TEMPLATE_WITH_PR.format(
             issue_number=issue_details.get("number"),
@@ -142,25 +164,67 @@ def render_prompt(
         )
 
 
-def create_comment_body(masked_url: str, summary: dict[str, str]) -> str:
+# Claude Codeの出力形式（stream-json の場合は実行の内訳を記録して報告する）
+CLAUDE_OUTPUT_FORMATS = ("text", "stream-json")
+
+# 実行の内訳に表示するツールの数
+MAX_REPORTED_TOOLS = 5
+
+
+def format_claude_breakdown(breakdown: dict) -> list[str]:
+    """Claude Code実行の内訳を箇条書きの行に変換
+
+    Args:
+        breakdown: StreamJsonDecoder.summary() の返り値
+
+    Returns:
+        Markdownの箇条書きの行のリスト
+    """
+    usage = breakdown["usage"]
+    lines = [
+        f"- Turns: {breakdown['turns']}"
+        f"（モデル応答待ち {breakdown['model_time']:.1f}s、最大 {breakdown['max_turn_latency']:.1f}s）",
+        f"- Tool calls: {breakdown['tool_calls']}"
+        f"（実行時間 {breakdown['tool_time']:.1f}s、エラー {breakdown['tool_errors']}）",
+    ]
+    for name, stats in list(breakdown["tools"].items())[:MAX_REPORTED_TOOLS]:
+        lines.append(f"  - {name}: {stats['count']}回 / {stats['duration']:.1f}s")
+    lines.append(
+        f"- Tokens: input {usage['input_tokens']:,} / output {usage['output_tokens']:,}"
+        f" / cache read {usage['cache_read_input_tokens']:,}"
+        f" / cache write {usage['cache_creation_input_tokens']:,}"
+    )
+    if breakdown.get("cost_usd") is not None:
+        lines.append(f"- Cost: ${breakdown['cost_usd']:.4f}")
+    return lines
+
+
+def create_comment_body(
+    masked_url: str, summary: dict[str, str], breakdown: Optional[dict] = None
+) -> str:
     """コメント本文を生成（マスクURLを含む）
 
     Args:
         masked_url: マスクされたログファイルURL
         summary: 実行結果のサマリー
+        breakdown: Claude Code実行の内訳（StreamJsonDecoder.summary() の返り値、オプション）
 
     Returns:
         コメント本文
     """
     status_emoji = "✅" if summary["status"] == "SUCCESS" else "❌"
 
-    return f"""{status_emoji} **Claude Code 実行完了**
+    breakdown_section = ""
+    if breakdown:
+        breakdown_section = "\n**実行の内訳:**\n" + "\n".join(format_claude_breakdown(breakdown)) + "\n"
+
+    return f"""{status_emoji} **{prompt_budget.EXECUTOR_COMMENT_MARKER}**
 
 **実行結果:**
 - Status: {summary["status"]}
 - Exit Code: {summary["exit_code"]}
 - Duration: {summary["duration"]}
-
+{breakdown_section}
 📎 **ログファイル:** {masked_url}
 
 詳細はログファイルを参照してください。
@@ -186,14 +250,24 @@ def log_summary(logger: SimpleLogger, issue_number: int, exit_code: int, duratio
     logger.info("=" * 80)
 
 
-def execute_with_claude(logger: SimpleLogger, prompt: str) -> int:
+@tracing.traced("execute_with_claude", "claude")
+def execute_with_claude(
+    logger: SimpleLogger,
+    prompt: str,
+    cwd: Optional[str] = None,
+    decoder: Optional[StreamJsonDecoder] = None,
+) -> int:
     """プロンプトをClaude Codeで実行
 
     Claude Codeをヘッドレスモードで呼び出し、stdout/stderrをリアルタイムでloggerに書き込みます。
+    decoder を指定した場合は stream-json 形式で出力させ、イベントを逐次デコードして
+    ターンごとのレイテンシ、ツール呼び出しの所要時間、トークン使用量を記録します。
 
     Args:
         logger: SimpleLogger インスタンス
         prompt: 実行するプロンプト
+        cwd: 実行ディレクトリ（Noneの場合はカレントディレクトリ）
+        decoder: stream-json のデコーダー（Noneの場合は text 形式で出力させる）
 
     Returns:
         終了コード
@@ -205,7 +279,7 @@ def execute_with_claude(logger: SimpleLogger, prompt: str) -> int:
             [
                 "claude",
                 "-p", prompt,
-                "--output-format", "text",
+                "--output-format", "stream-json" if decoder else "text",
                 "--verbose",
                 "--allowedTools", "Read,Grep,WebSearch",
                 "--permission-mode", "acceptEdits"
@@ -215,6 +289,7 @@ def execute_with_claude(logger: SimpleLogger, prompt: str) -> int:
             stderr=subprocess.PIPE,
             text=True,
             bufsize=1,
+            cwd=cwd,
         )
 
         # stdout と stderr を別スレッドで読み込む
@@ -222,9 +297,18 @@ def execute_with_claude(logger: SimpleLogger, prompt: str) -> int:
             for line in iter(stream.readline, ""):
                 if line:
                     if is_stderr:
-                        logger.error(line.rstrip())
+                        logger.error(line.rstrip(), stream="stderr")
+                    elif decoder:
+                        # デコードに失敗しても読み込みは止めない（止めるとパイプが詰まりClaude Codeが停止する）
+                        try:
+                            decoded_lines = decoder.feed(line)
+                        except Exception as e:
+                            logger.warning(f"stream-jsonのデコードに失敗しました: {e!r}", stream="stdout")
+                            decoded_lines = [line.rstrip()]
+                        for decoded in decoded_lines:
+                            logger.info(decoded, stream="stdout")
                     else:
-                        logger.info(line.rstrip())
+                        logger.info(line.rstrip(), stream="stdout")
 
         stdout_thread = threading.Thread(target=read_stream, args=(process.stdout,))
         stderr_thread = threading.Thread(target=read_stream, args=(process.stderr, True))
@@ -261,8 +345,515 @@ def execute_with_claude(logger: SimpleLogger, prompt: str) -> int:
         return 1
 
 
+@tracing.traced("prepare_ticket")
+def prepare_ticket(
+    owner: str, repo: str, issue_number: int, output_format: str = "prompt"
+) -> tuple[str, Optional[dict]]:
+    """チケット情報を取得して出力（プロンプトまたはJSON）を生成
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        issue_number: Issue番号
+        output_format: 出力形式（"prompt" または "json"）
+
+    Returns:
+        (出力, 既存PR情報またはNone)のタプル
+    """
+    # チケット詳細・既存PR・PRコメントを1回のリクエストで取得
+    context = fetch_ticket_context(owner, repo, issue_number)
+    return render_ticket_output(context, output_format)
+
+
+def render_ticket_output(
+    context: dict, output_format: str = "prompt"
+) -> tuple[str, Optional[dict]]:
+    """fetch_ticket_contextの結果から出力（プロンプトまたはJSON）を生成
+
+    Args:
+        context: fetch_ticket_contextの返り値
+        output_format: 出力形式（"prompt" または "json"）
+
+    Returns:
+        (出力, 既存PR情報またはNone)のタプル。既存PR情報の latest_comment_id は
+        リアクションを付ける最新の（executor自身のものを除く）コメントのID
+    """
+    issue_details = context["issue"]
+    pr_info = context["pr"]
+    pr_comments = context["pr_comments"]
+
+    if pr_info is not None:
+        # 実行後にコメントを取得し直さずに済むよう、対応するコメントをここで決めておく
+        feedback = [
+            comment for comment in pr_comments or []
+            if not prompt_budget.is_executor_comment(comment)
+        ]
+        pr_info = {**pr_info, "latest_comment_id": feedback[-1].get("id") if feedback else None}
+
+    if output_format == "json":
+        output = json.dumps(issue_details, indent=2, ensure_ascii=False)
+    else:
+        output = render_prompt(issue_details, pr_info, pr_comments)
+
+    return output, pr_info
+
+
+@tracing.traced("run_ticket")
+def run_ticket(
+    owner: str,
+    repo: str,
+    project_number: int,
+    issue_number: int,
+    prompt: str,
+    pr_info: Optional[dict] = None,
+    cwd: Optional[str] = None,
+    claude_output_format: str = "text",
+) -> int:
+    """チケットをClaude Codeで実行し、結果をIssueに報告
+
+    ステータスを "In progress" に更新し、ログを記録しながらClaude Codeを実行した後、
+    結果コメントの投稿と既存PRの最新コメントへのリアクション追加を行います。
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        project_number: プロジェクト番号
+        issue_number: Issue番号
+        prompt: 実行するプロンプト
+        pr_info: 既存PR情報（オプション）
+        cwd: Claude Codeを実行するディレクトリ（Noneの場合はカレントディレクトリ）
+        claude_output_format: Claude Codeの出力形式（"text" または "stream-json"）
+
+    Returns:
+        Claude Codeの終了コード
+    """
+    # チケットのステータスを "In progress" に更新
+    try:
+        update_ticket_status(owner, repo, project_number, issue_number, "In progress")
+        print(f"✓ チケット #{issue_number} のステータスを 'In progress' に更新しました")
+    except RuntimeError as e:
+        print(f"⚠ ステータス更新中にエラーが発生しました: {e}", file=sys.stderr)
+        # ステータス更新に失敗しても処理を続行
+        pass
+
+    # ユニークなログファイル名を生成
+    log_dir = get_log_dir()
+    hash_value = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+    structured = log_files.get_log_format() == log_files.JSONL_FORMAT
+    suffix = ".jsonl" if structured else ".log"
+    log_filename = f"issue_{issue_number}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash_value}{suffix}"
+    log_file_path = log_dir / log_filename
+
+    # ロガーをセットアップ（Claude Codeの出力は行数が多いため、まとめて書き込む）
+    logger = SimpleLogger(
+        str(log_file_path),
+        dummy_dir_seed=str(log_dir),
+        buffered=True,
+        compress=log_files.is_compression_enabled(),
+        structured=structured,
+        issue_number=issue_number,
+    )
+
+    # トレース中の場合は、トレースをログファイルの隣に書き出す
+    tracer = tracing.current_tracer()
+    if tracer is not None:
+        tracer.export_path = trace_path(logger.log_file)
+
+    try:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        logger.info(f"[{timestamp}] ✓ Claude Codeで実行開始")
+        print(f"[{timestamp}] ✓ Claude Codeで実行開始")
+
+        # Claude Codeで実行（リアルタイムでログに出力）
+        decoder = StreamJsonDecoder() if claude_output_format == "stream-json" else None
+        start_time = time.time()
+        exit_code = execute_with_claude(logger, prompt, cwd=cwd, decoder=decoder)
+        duration = time.time() - start_time
+        metrics.CLAUDE_RUN_SECONDS.observe(duration, exit_code=str(exit_code))
+        # 失敗を繰り返すチケットは次回以降の優先度を下げる
+        scheduler.record_result(owner, repo, issue_number, exit_code == 0)
+
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        logger.info(f"[{timestamp}] ✓ Claude Codeで実行完了")
+        print(f"[{timestamp}] ✓ Claude Codeで実行完了")
+
+        # サマリーをログに記録
+        log_summary(logger, issue_number, exit_code, duration)
+        breakdown = decoder.summary() if decoder else None
+        if breakdown:
+            for line in format_claude_breakdown(breakdown):
+                logger.info(line)
+
+        # サマリーを作成
+        summary = {
+            "status": "SUCCESS" if exit_code == 0 else "FAILED",
+            "exit_code": str(exit_code),
+            "duration": f"{duration:.2f} seconds",
+        }
+
+        # 結果の報告は書き込みなので、ボードのスキャンなどより優先する
+        with rate_limit.priority(rate_limit.HIGH), tracing.span("report_result", issue=issue_number):
+            # マスクURLを生成
+            masked_url = logger.get_url()
+
+            # コメント本文を生成
+            comment_body = create_comment_body(masked_url, summary, breakdown)
+
+            # コメントの投稿と、PRが存在する場合は対応した最新コメントへの :+1: リアクションを
+            # 1回のリクエストにまとめる
+            batch = WriteBatch(owner, repo)
+            batch.add_comment(issue_number, comment_body)
+            comment_id = (pr_info or {}).get("latest_comment_id")
+            if comment_id:
+                batch.add_reaction(comment_id, "+1")
+            results = batch.execute()
+
+            if not results[0].ok:
+                raise RuntimeError(f"Failed to post comment: {results[0].error}")
+            logger.info(f"✓ コメントをIssue #{issue_number} にポストしました")
+            print(f"✓ コメントをIssue #{issue_number} にポストしました")
+
+            for result in results[1:]:
+                if result.ok:
+                    logger.info(f"✓ 最新コメントに :+1: リアクションを追加しました")
+                    print(f"✓ 最新コメントに :+1: リアクションを追加しました")
+                else:
+                    logger.warning(f"⚠ リアクション追加中にエラーが発生しました: {result.error}")
+                    print(f"⚠ リアクション追加中にエラーが発生しました: {result.error}", file=sys.stderr)
+
+        print(f"ログファイル: {logger.get_file_path()}")
+        if tracer is not None:
+            print(f"トレース: {tracer.export_path}")
+        print(f"マスクURL: {masked_url}")
+        print(f"終了コード: {exit_code}")
+        return exit_code
+
+    except Exception as e:
+        logger.error(f"Error: {e}")
+        raise
+    finally:
+        logger.close()
+        # 古いログの圧縮と保持期間を超えたログの削除
+        try:
+            maintain_logs(log_dir, keep={logger.log_file})
+        except OSError as e:
+            print(f"⚠ ログの整理中にエラーが発生しました: {e}", file=sys.stderr)
+
+
+async def fetch_ticket_contexts(owner: str, repo: str, issue_numbers: list[int]) -> list[dict]:
+    """複数チケットのfetch_ticket_contextを並行して取得
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        issue_numbers: Issue番号のリスト
+
+    Returns:
+        issue_numbersと同じ順序のfetch_ticket_contextの返り値のリスト
+    """
+    return await asyncio.gather(*(
+        github_async.fetch_ticket_context(owner, repo, issue_number)
+        for issue_number in issue_numbers
+    ))
+
+
+def execute_ticket(
+    owner: str,
+    repo: str,
+    project_number: int,
+    issue_number: int,
+    output_format: str,
+    use_worktree: bool = True,
+    claude_output_format: str = "text",
+    repo_dir: Optional[Path] = None,
+    worktree_namespace: Optional[str] = None,
+) -> int:
+    """チケット情報の取得から実行・報告までを行う（並行実行・監視モード用）
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        project_number: プロジェクト番号
+        issue_number: Issue番号
+        output_format: 出力形式（"prompt" または "json"）
+        use_worktree: Trueの場合はチケット専用のworktreeで実行する
+        claude_output_format: Claude Codeの出力形式（"text" または "stream-json"）
+        repo_dir: リポジトリのローカルのチェックアウト（Noneの場合はカレントディレクトリ）
+        worktree_namespace: worktreeの作成先を分けるための名前（Target.key）
+
+    Returns:
+        Claude Codeの終了コード（エラーの場合は1）
+    """
+    # チケット情報の取得からトレースを記録する（run_ticket がログの隣に書き出す）
+    with tracing.trace_scope(f"issue #{issue_number}"):
+        try:
+            output, pr_info = prepare_ticket(owner, repo, issue_number, output_format)
+            if not use_worktree:
+                return run_ticket(
+                    owner, repo, project_number, issue_number, output, pr_info,
+                    cwd=str(repo_dir) if repo_dir else None,
+                    claude_output_format=claude_output_format,
+                )
+
+            with tracing.span("create_worktree"):
+                worktree_path = create_worktree(issue_number, repo_dir, worktree_namespace)
+            try:
+                return run_ticket(
+                    owner, repo, project_number, issue_number, output, pr_info, cwd=str(worktree_path),
+                    claude_output_format=claude_output_format,
+                )
+            finally:
+                remove_worktree(worktree_path, repo_dir)
+        except Exception as e:
+            print(f"Error: #{issue_number}: {e}", file=sys.stderr)
+            return 1
+
+
+def submit_ticket(pool: ThreadPoolExecutor, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """チケットの実行をプールに投入し、実行待ち・実行中の数をメトリクスに記録
+
+    Args:
+        pool: 実行に使うスレッドプール
+        func: 実行する関数
+        *args: func の引数
+        **kwargs: func のキーワード引数
+
+    Returns:
+        実行結果の Future
+    """
+    metrics.QUEUE_DEPTH.inc()
+
+    def run() -> Any:
+        metrics.QUEUE_DEPTH.dec()
+        metrics.ACTIVE_WORKERS.inc()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            metrics.ACTIVE_WORKERS.dec()
+
+    future = pool.submit(run)
+    # 実行前にキャンセルされた場合は実行待ちから外す
+    future.add_done_callback(lambda f: metrics.QUEUE_DEPTH.dec() if f.cancelled() else None)
+    return future
+
+
+def watch(
+    owner: str,
+    repo: str,
+    project_number: int,
+    interval: float,
+    concurrency: int,
+    output_format: str,
+    execute: bool,
+    claude_output_format: str = "text",
+) -> None:
+    """ボードを監視し、新しいBacklogのチケットやPRコメントを検出するたびに実行
+
+    ボード状態はプロセス内に保持し、ポーリングのたびに更新のあったアイテムだけを取得します。
+    検出したチケットは優先度付きキュー（scheduler.TicketQueue）で待機させ、同期のたびに
+    優先度を更新して、実行枠が空くたびに優先度の最も高いものから実行します。
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        project_number: プロジェクト番号
+        interval: ポーリング間隔（秒）
+        concurrency: 同時に実行するチケット数
+        output_format: 出力形式（"prompt" または "json"）
+        execute: Falseの場合は実行せずに出力を表示する
+        claude_output_format: Claude Codeの出力形式（"text" または "stream-json"）
+    """
+    serve_targets(
+        [Target(owner, repo, project_number, concurrency)], concurrency, output_format, execute,
+        claude_output_format, interval=interval,
+    )
+
+
+def serve_targets(
+    targets: list[Target],
+    concurrency: int,
+    output_format: str,
+    execute: bool,
+    claude_output_format: str = "text",
+    interval: Optional[float] = None,
+) -> list[int]:
+    """複数のリポジトリ・プロジェクトのチケットを、共有のワーカーで公平に実行
+
+    GitHubクライアントとレート制限の残量はプロセス全体で共有します。チケットはターゲットごとの
+    優先度付きキューで待機させ、ターゲットごとの同時実行数の上限を守りながら、
+    scheduler.FairScheduler でターゲットを順に巡回して取り出します。
+
+    interval を指定した場合は常駐してボードを監視し、新しいBacklogのチケットやPRコメントを
+    検出するたびに実行します。指定しない場合は、各ターゲットのBacklogから優先度の高い
+    チケットをターゲットの同時実行数の上限まで選び、すべて実行し終えたら戻ります。
+
+    Args:
+        targets: 処理対象のリポジトリとプロジェクト
+        concurrency: 全体で同時に実行するチケット数
+        output_format: 出力形式（"prompt" または "json"）
+        execute: Falseの場合は実行せずに出力を表示する
+        claude_output_format: Claude Codeの出力形式（"text" または "stream-json"）
+        interval: ポーリング間隔（秒、Noneの場合は常駐せずに一度だけ実行する）
+
+    Returns:
+        実行したチケットの終了コードのリスト
+    """
+    targets_by_key = {target.key: target for target in targets}
+    fair = scheduler.FairScheduler({target.key: target.concurrency for target in targets})
+    running: set[tuple[str, int]] = set()
+    # 新しいPRコメントによって実行待ちになったチケット（Backlog 以外のStatusでも実行する）
+    queued_for_pr: set[tuple[str, int]] = set()
+    exit_codes: list[int] = []
+    lock = threading.Lock()
+    changed = threading.Condition(lock)
+    stopping = threading.Event()
+
+    def name(target: Target, issue_number: int) -> str:
+        """ログ出力用のチケット名（複数のターゲットを扱う場合はリポジトリ名を含める）"""
+        if len(targets) > 1:
+            return f"{target.owner}/{target.repo}#{issue_number}"
+        return f"#{issue_number}"
+
+    def dispatch(key: str, issue_number: int) -> None:
+        target = targets_by_key[key]
+        exit_code = 1
+        try:
+            if execute:
+                exit_code = execute_ticket(
+                    target.owner, target.repo, target.project, issue_number, output_format,
+                    use_worktree=concurrency > 1,
+                    claude_output_format=claude_output_format,
+                    repo_dir=target.path,
+                    worktree_namespace=target.key,
+                )
+            else:
+                output, _ = prepare_ticket(target.owner, target.repo, issue_number, output_format)
+                print(output)
+                exit_code = 0
+        except Exception as e:
+            print(f"Error: {name(target, issue_number)}: {e}", file=sys.stderr)
+        finally:
+            fair.release(key)
+            with lock:
+                running.discard((key, issue_number))
+                exit_codes.append(exit_code)
+            fill()
+
+    def fill() -> None:
+        """実行枠が空いている分だけ、ターゲットを順に巡回して優先度の高いチケットから実行を始める"""
+        with lock:
+            while not stopping.is_set() and len(running) < concurrency:
+                picked = fair.acquire()
+                if picked is None:
+                    break
+                metrics.QUEUE_DEPTH.dec()
+                running.add(picked)
+                queued_for_pr.discard(picked)
+                submit_ticket(pool, dispatch, *picked)
+            changed.notify_all()
+
+    def prioritize(
+        target: Target,
+        issue_number: int,
+        ticket: Optional[dict[str, Any]],
+        failures: dict[int, int],
+        pr_activity: bool = False,
+    ) -> None:
+        """チケットを実行待ちに追加、または最新のボードの状態で優先度を更新"""
+        queue = fair.queues[target.key]
+        key = (target.key, issue_number)
+        with lock:
+            if pr_activity:
+                queued_for_pr.add(key)
+            moved = ticket is not None and ticket.get("status") != BACKLOG_STATUS and key not in queued_for_pr
+        if ticket is None or moved:
+            # ボードから削除されたチケットや、実行を待つ間に Backlog から移動されたチケットは実行しない
+            if queue.discard(issue_number):
+                metrics.QUEUE_DEPTH.dec()
+                if moved:
+                    print(
+                        f"✓ チケット {name(target, issue_number)} は {ticket.get('status')} に"
+                        "移動されたため実行キューから外しました"
+                    )
+            with lock:
+                queued_for_pr.discard(key)
+            return
+        priority = scheduler.ticket_priority(ticket, failures.get(issue_number, 0))
+        if queue.push(issue_number, priority):
+            metrics.QUEUE_DEPTH.inc()
+            print(f"✓ チケット {name(target, issue_number)} を実行キューに追加しました（{priority.describe()}）")
+
+    def sync(target: Target, watcher: BoardWatcher) -> None:
+        """ボードを同期し、実行待ちのチケットを追加・並べ直す"""
+        candidates = watcher.sync()
+        failures = scheduler.get_failure_counts(target.owner, target.repo)
+        for issue_number in candidates:
+            with lock:
+                if (target.key, issue_number) in running:
+                    continue
+            prioritize(
+                target, issue_number, watcher.tickets.get(issue_number), failures,
+                pr_activity=issue_number in watcher.pr_activity,
+            )
+        # 実行待ちのチケットも Status・Priority・ラベルの変更を反映して並べ直す
+        for issue_number in fair.queues[target.key]:
+            prioritize(target, issue_number, watcher.tickets.get(issue_number), failures)
+
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    try:
+        if interval is None:
+            for target in targets:
+                failures = scheduler.get_failure_counts(target.owner, target.repo)
+                try:
+                    tickets = scheduler.select_tickets(
+                        fetch_tickets_iter(target.owner, target.repo, target.project, "Backlog"),
+                        target.concurrency,
+                        failures,
+                    )
+                except RuntimeError as e:
+                    # 他のターゲットのチケットは実行する
+                    print(f"Error: {target.key}: {e}", file=sys.stderr)
+                    exit_codes.append(1)
+                    continue
+                for ticket in tickets:
+                    prioritize(target, ticket["number"], ticket, failures)
+            fill()
+            with lock:
+                changed.wait_for(lambda: not running and not len(fair))
+            return exit_codes
+
+        watchers = {target.key: BoardWatcher(target.owner, target.repo, target.project) for target in targets}
+        if len(targets) > 1:
+            print(f"✓ {len(targets)}件のターゲットのボードの監視を開始しました（{interval:g}秒間隔）")
+        else:
+            print(f"✓ ボードの監視を開始しました（{interval:g}秒間隔）")
+        while True:
+            for target in targets:
+                try:
+                    sync(target, watchers[target.key])
+                except RuntimeError as e:
+                    # 一時的なエラーでは監視を止めず、次のポーリングで再試行する
+                    where = f"（{target.key}）" if len(targets) > 1 else ""
+                    print(f"⚠ ボードの同期中にエラーが発生しました{where}: {e}", file=sys.stderr)
+            fill()
+
+            # レート制限の残量が少なくなったら、上限に達する前にポーリング間隔を広げる
+            time.sleep(rate_limit.get_limiter().recommended_interval(interval))
+    except KeyboardInterrupt:
+        if interval is None:
+            raise
+        print("監視を終了します（実行中のチケットの完了を待機します）")
+        return exit_codes
+    finally:
+        # fill() は lock を保持したまま stopping を確認して投入するため、lock の中で設定すれば
+        # shutdown の開始後に実行を終えたワーカーが新しいチケットを投入することはない
+        with lock:
+            stopping.set()
+        metrics.QUEUE_DEPTH.dec(len(fair))
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
 def main() -> None:
-    logger = None
     default_owner, default_repo = get_git_remote_info()
 
     parser = argparse.ArgumentParser(
@@ -284,8 +875,14 @@ def main() -> None:
         "-p",
         "--project",
         type=int,
-        required=True,
-        help="プロジェクト番号 (e.g., 1)",
+        help="プロジェクト番号 (e.g., 1)。--config を指定しない場合は必須",
+    )
+    parser.add_argument(
+        "--config",
+        metavar="PATH",
+        help="複数のリポジトリ・プロジェクトを1つのプロセスで処理する設定ファイル（JSON）。"
+        "GitHubクライアントとレート制限の残量を共有し、ターゲットごとの同時実行数の上限を守りながら"
+        "ターゲットを順に巡回して実行する（-o/-r/-p と --concurrency の代わりに設定ファイルの値を使う）",
     )
     parser.add_argument(
         "--format",
@@ -298,137 +895,210 @@ def main() -> None:
         action="store_true",
         help="Claude Codeで実際に実行する（ログが保存されます）",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="同時に実行するチケット数。2以上の場合はチケットごとにgit worktreeを作成する (デフォルト: 1)",
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="常駐してボードを監視し、新しいBacklogのチケットやPRコメントを検出するたびに実行する",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=60,
+        help="--watch 時のポーリング間隔（秒） (デフォルト: 60)",
+    )
+    parser.add_argument(
+        "--claude-output-format",
+        choices=CLAUDE_OUTPUT_FORMATS,
+        default="text",
+        help="Claude Codeの出力形式。stream-json の場合はターンごとのレイテンシ、"
+        "ツール呼び出しの所要時間、トークン使用量を記録して結果コメントに含める (デフォルト: text)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="指定したポートでPrometheus形式のメトリクスを /metrics に公開する (e.g., 9464)",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default="127.0.0.1",
+        help="--metrics-port で待ち受けるアドレス (デフォルト: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--log-format",
+        choices=log_files.LOG_FORMATS,
+        default=log_files.get_log_format(),
+        help="実行ログの形式。jsonl の場合は1行1レコードのJSONLで書き込み、時間帯・レベルで"
+        f"絞り込むためのインデックスを作成する (デフォルト: {log_files.get_log_format()})",
+    )
+    parser.add_argument(
+        "--compress-logs",
+        action="store_true",
+        default=log_files.is_compression_enabled(),
+        help="実行ログをgzipで圧縮しながら書き込み、古い未圧縮のログも圧縮する "
+        "(デフォルト: 圧縮しない。EXECUTOR_LOG_COMPRESS=1 で有効)",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="実行ごとにGitHub API呼び出しやClaude Codeの実行時間をChromeトレース形式で"
+        "ログファイルの隣に書き出す (chrome://tracing や Perfetto で表示できる)",
+    )
+    parser.add_argument(
+        "--prompt-comment-tokens",
+        type=int,
+        default=prompt_budget.get_comment_token_budget(),
+        help="プロンプトに含めるPRコメントのトークン数の上限。executorの結果コメントを除き、"
+        f"新しいコメントから上限まで含める (デフォルト: {prompt_budget.get_comment_token_budget()})",
+    )
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument(
+        "--record-github",
+        metavar="PATH",
+        help="GitHub APIのリクエストと応答をカセットファイルに記録する",
+    )
+    cassette_group.add_argument(
+        "--replay-github",
+        metavar="PATH",
+        help="ネットワークに接続せず、カセットファイルに記録された応答を使う "
+        "(e.g., --format prompt で実行時のプロンプトを再現する)",
+    )
 
     args = parser.parse_args()
 
-    if not args.owner or not args.repo:
+    config = None
+    if args.config:
+        try:
+            config = load_config(Path(args.config))
+        except RuntimeError as e:
+            parser.error(str(e))
+    elif args.project is None:
+        parser.error("-p/--project または --config を指定してください")
+    elif not args.owner or not args.repo:
         parser.error(
             "リポジトリのオーナーとリポジトリ名を特定できません。"
             "git remote originを確認するか、-o/--owner と -r/--repo を明示的に指定してください。"
         )
+    if args.concurrency < 1:
+        parser.error("--concurrency には1以上を指定してください")
+    if args.prompt_comment_tokens < 0:
+        parser.error("--prompt-comment-tokens には0以上を指定してください")
+    prompt_budget.set_comment_token_budget(args.prompt_comment_tokens)
+    log_files.set_log_format(args.log_format)
+    log_files.set_compression(args.compress_logs)
+    if args.trace:
+        tracing.set_enabled(True)
+    if args.record_github or args.replay_github:
+        try:
+            if args.record_github:
+                cassette.set_cassette(cassette.Cassette(Path(args.record_github), cassette.RECORD))
+                print(f"✓ GitHub APIのやり取りを記録します: {args.record_github}")
+            else:
+                cassette.set_cassette(cassette.Cassette(Path(args.replay_github), cassette.REPLAY))
+                print(f"✓ 記録済みのGitHub APIの応答を使います: {args.replay_github}")
+        except RuntimeError as e:
+            parser.error(str(e))
+    if args.metrics_port is not None:
+        server = metrics.start_http_server(args.metrics_port, args.metrics_host)
+        host, port = server.server_address[:2]
+        print(f"✓ メトリクスを公開しました: http://{host}:{port}/metrics")
+
+    if config is not None:
+        print(f"✓ 設定ファイルから{len(config.targets)}件のターゲットを読み込みました（同時実行数: {config.concurrency}）")
+        try:
+            exit_codes = serve_targets(
+                config.targets, config.concurrency, args.format, args.execute, args.claude_output_format,
+                interval=args.interval if args.watch else None,
+            )
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        if not args.watch and not exit_codes:
+            print("Error: Backlogにチケットがありません", file=sys.stderr)
+            sys.exit(1)
+        failed = [code for code in exit_codes if code != 0]
+        if failed and not args.watch:
+            sys.exit(failed[0])
+        return
+
+    if args.watch:
+        watch(
+            args.owner, args.repo, args.project, args.interval,
+            args.concurrency, args.format, args.execute, args.claude_output_format,
+        )
+        return
 
     try:
-        # Backlogから最初のチケットを取得
-        tickets = fetch_tickets(args.owner, args.repo, args.project, "Backlog")
+        # Backlogのチケットから優先度の高いものを選ぶ（すべてのページを取得して比較する）
+        tickets = scheduler.select_tickets(
+            fetch_tickets_iter(args.owner, args.repo, args.project, "Backlog"),
+            args.concurrency,
+            scheduler.get_failure_counts(args.owner, args.repo),
+        )
 
         if not tickets:
             print("Error: Backlogにチケットがありません", file=sys.stderr)
             sys.exit(1)
 
-        # 最初のチケットを選ぶ
-        first_ticket = tickets[0]
-        issue_number = first_ticket.get("number")
+        issue_numbers = [ticket.get("number") for ticket in tickets]
 
-        if not issue_number:
+        if not all(issue_numbers):
             print("Error: チケット番号を取得できません", file=sys.stderr)
             sys.exit(1)
 
-        print(f"✓ Backlogから最初のチケットを取得しました: #{issue_number}")
-
-        # チケット詳細を取得
-        issue_details = get_issue_details(args.owner, args.repo, issue_number)
-
-        # ブランチ名から既存PRを確認
-        branch_name = f"feature/{issue_number}"
-        pr_info = None
-        pr_comments = None
-        try:
-            pr_info = get_pr_by_branch_name(args.owner, args.repo, branch_name)
-            if pr_info:
-                # PRが存在する場合、コメントを取得
-                pr_comments = get_pr_comments(args.owner, args.repo, pr_info.get("number"))
-        except RuntimeError as e:
-            # PRが見つからないのはエラーではないので、ログに出すが続行する
-            print(f"⚠ PRの検索中にエラーが発生しました: {e}", file=sys.stderr)
-
-        if args.format == "json":
-            output = json.dumps(issue_details, indent=2, ensure_ascii=False)
-        else:
-            output = render_prompt(issue_details, pr_info, pr_comments)
-
-        if args.execute:
-            # チケットのステータスを "In progress" に更新
-            try:
-                update_ticket_status(args.owner, args.repo, args.project, issue_number, "In progress")
-                print(f"✓ チケット #{issue_number} のステータスを 'In progress' に更新しました")
-            except RuntimeError as e:
-                print(f"⚠ ステータス更新中にエラーが発生しました: {e}", file=sys.stderr)
-                # ステータス更新に失敗しても処理を続行
-                pass
-
-            # ユニークなログファイル名を生成
-            log_dir = Path(__file__).parent / "logs"
-            hash_value = hashlib.sha256(output.encode()).hexdigest()[:8]
-            log_filename = f"issue_{issue_number}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash_value}.log"
-            log_file_path = log_dir / log_filename
-
-            # ロガーをセットアップ
-            logger = SimpleLogger(str(log_file_path), dummy_dir_seed=str(log_dir))
-
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            logger.info(f"[{timestamp}] ✓ Claude Codeで実行開始")
-            print(f"[{timestamp}] ✓ Claude Codeで実行開始")
-
-            # Claude Codeで実行（リアルタイムでログに出力）
-            start_time = time.time()
-            exit_code = execute_with_claude(logger, output)
-            duration = time.time() - start_time
-
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            logger.info(f"[{timestamp}] ✓ Claude Codeで実行完了")
-            print(f"[{timestamp}] ✓ Claude Codeで実行完了")
-
-            # サマリーをログに記録
-            log_summary(logger, issue_number, exit_code, duration)
-
-            # サマリーを作成
-            summary = {
-                "status": "SUCCESS" if exit_code == 0 else "FAILED",
-                "exit_code": str(exit_code),
-                "duration": f"{duration:.2f} seconds",
-            }
-
-            # マスクURLを生成
-            masked_url = logger.get_url()
-
-            # コメント本文を生成
-            comment_body = create_comment_body(masked_url, summary)
-
-            # コメントを投稿
-            post_issue_comment(args.owner, args.repo, issue_number, comment_body)
-            logger.info(f"✓ コメントをIssue #{issue_number} にポストしました")
-            print(f"✓ コメントをIssue #{issue_number} にポストしました")
+        if args.concurrency > 1:
+            print(f"✓ Backlogから優先度の高いチケットを取得しました: {', '.join(f'#{n}' for n in issue_numbers)}")
+
+            if not args.execute:
+                # チケット情報の取得は並行して行う
+                contexts = asyncio.run(fetch_ticket_contexts(args.owner, args.repo, issue_numbers))
+                for context in contexts:
+                    output, _ = render_ticket_output(context, args.format)
+                    print(output)
+                return
+
+            # チケットごとに専用のworktreeで並行実行
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                futures = [
+                    submit_ticket(
+                        pool, execute_ticket, args.owner, args.repo, args.project, n, args.format,
+                        claude_output_format=args.claude_output_format,
+                    )
+                    for n in issue_numbers
+                ]
+                exit_codes = [future.result() for future in futures]
+
+            failed = [code for code in exit_codes if code != 0]
+            if failed:
+                sys.exit(failed[0])
+            return
+
+        issue_number = issue_numbers[0]
+        print(f"✓ Backlogから優先度の最も高いチケットを取得しました: #{issue_number}")
+
+        with tracing.trace_scope(f"issue #{issue_number}"):
+            output, pr_info = prepare_ticket(args.owner, args.repo, issue_number, args.format)
+
+            if args.execute:
+                exit_code = run_ticket(
+                    args.owner, args.repo, args.project, issue_number, output, pr_info,
+                    claude_output_format=args.claude_output_format,
+                )
+            else:
+                print(output)
 
-            # PRが存在する場合、最新コメントに :+1: リアクションを追加
-            if pr_info:
-                try:
-                    # 最新のコメント情報を取得（投稿したコメントを含める）
-                    updated_pr_comments = get_pr_comments(args.owner, args.repo, pr_info.get("number"))
-                    if updated_pr_comments:
-                        # 最後のコメントを取得
-                        latest_comment = updated_pr_comments[-1]
-                        comment_id = latest_comment.get("id")
-                        if comment_id:
-                            add_reaction_to_comment(args.owner, args.repo, comment_id, "+1")
-                            logger.info(f"✓ 最新コメントに :+1: リアクションを追加しました")
-                            print(f"✓ 最新コメントに :+1: リアクションを追加しました")
-                except RuntimeError as e:
-                    logger.warning(f"⚠ リアクション追加中にエラーが発生しました: {e}")
-                    print(f"⚠ リアクション追加中にエラーが発生しました: {e}", file=sys.stderr)
-
-            print(f"ログファイル: {logger.get_file_path()}")
-            print(f"マスクURL: {masked_url}")
-            print(f"終了コード: {exit_code}")
-            if exit_code != 0:
-                sys.exit(exit_code)
-        else:
-            print(output)
+        if args.execute and exit_code != 0:
+            sys.exit(exit_code)
 
     except Exception as e:
         error_msg = f"Error: {e}"
         print(error_msg, file=sys.stderr)
-        if logger is not None:
-            logger.error(error_msg)
         sys.exit(1)
 
 
@@ -5,7 +5,7 @@ import argparse
 import json
 import sys
 
-from github import fetch_tickets, get_git_remote_info
+from github import fetch_tickets_iter, get_git_remote_info
 
 
 def main() -> None:
@@ -48,9 +48,13 @@ def main() -> None:
         )
 
     try:
-        tickets = fetch_tickets(args.owner, args.repo, args.project, args.status)
-        output = json.dumps(tickets, indent=2, ensure_ascii=False)
-        print(output)
+        # ページが届くたびに出力する（出力全体は json.dumps(tickets, indent=2) と同じ形式）
+        count = 0
+        for ticket in fetch_tickets_iter(args.owner, args.repo, args.project, args.status):
+            item = json.dumps(ticket, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+            print("[\n  " + item if count == 0 else ",\n  " + item, end="", flush=True)
+            count += 1
+        print("\n]" if count else "[]")
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -1,9 +1,59 @@
 """GitHub API関連のコア機能"""
 
+import functools
 import json
 import re
 import subprocess
-from typing import Any, Optional
+import time
+from typing import Any, Callable, ContextManager, Iterator, NamedTuple, Optional, TypeVar
+
+import metrics
+import rate_limit
+import tracing
+from cache import JsonFileCache
+from cassette import get_cassette
+from github_client import (
+    TRANSIENT_STATUSES,
+    GitHubAPIError,
+    get_client,
+    is_rate_limit_message,
+    is_transient_graphql_error,
+    use_gh_transport,
+)
+from rate_limit import get_limiter
+from retry import get_retry_policy
+
+T = TypeVar("T")
+
+metrics.GITHUB_RATE_LIMIT_REMAINING.set_function(lambda: get_limiter().remaining)
+
+
+def _operation(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """GitHub APIの操作をトレースのスパンとメトリクスとして記録するデコレータ
+
+    Args:
+        name: 操作名（メトリクスの operation ラベル）
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        traced = tracing.traced(f"github.{name}", "github")(func)
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = traced(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                metrics.GITHUB_OPERATION_SECONDS.observe(
+                    time.perf_counter() - start, operation=name, outcome=outcome
+                )
+
+        return wrapper
+
+    return decorator
 
 
 def _clean_github_error(error_msg: str) -> str:
@@ -24,33 +74,18 @@ def _clean_github_error(error_msg: str) -> str:
     return lines[0] if lines else error_msg
 
 
-def _call_github_graphql(
-    query_or_mutation: str, variables: dict[str, str] | None = None
-) -> dict[str, Any]:
-    """GitHub GraphQL APIを呼び出す共通関数
+def _run_gh(cmd: list[str]) -> Any:
+    """gh コマンドを実行してJSONレスポンスを返す
 
     Args:
-        query_or_mutation: GraphQL クエリまたはミューテーション
-        variables: クエリのパラメータ（オプション）
+        cmd: gh に渡す引数を含むコマンド
 
     Returns:
-        APIレスポンスのdata部分
+        デコード済みのレスポンス
 
     Raises:
-        RuntimeError: API呼び出しが失敗した場合
-    """
-    cmd = [
-        "gh",
-        "api",
-        "graphql",
-        "-f",
-        f"query={query_or_mutation}",
-    ]
-
-    if variables:
-        for key, value in variables.items():
-            cmd.extend(["-F", f"{key}={value}"])
-
+        GitHubAPIError: gh コマンドが失敗した場合
+    """
     result = subprocess.run(
         cmd,
         capture_output=True,
@@ -59,20 +94,209 @@ def _call_github_graphql(
     )
 
     if result.returncode != 0:
+        # GraphQLの応答に errors が含まれる場合も gh は失敗するため、
+        # data を含む応答はそのまま返してフィールドごとの結果を呼び出し元で扱う
+        try:
+            response = json.loads(result.stdout)
+        except ValueError:
+            response = None
+        if isinstance(response, dict) and "data" in response:
+            return response
+
         # gh コマンド自体が失敗した場合
         error_msg = result.stderr.strip() if result.stderr else result.stdout.strip()
-        raise RuntimeError(f"GitHub API error: {_clean_github_error(error_msg)}")
+        match = re.search(r"HTTP (\d{3})", error_msg)
+        status = int(match.group(1)) if match else None
+        lowered = error_msg.lower()
+        raise GitHubAPIError(
+            f"GitHub API error: {_clean_github_error(error_msg)}",
+            status=status,
+            transient=status in TRANSIENT_STATUSES or "timeout" in lowered or "connect" in lowered,
+            sent="error connecting" not in lowered,
+            rate_limited=status in (403, 429) and is_rate_limit_message(error_msg),
+        )
+
+    return json.loads(result.stdout) if result.stdout.strip() else {}
+
+
+def _exchange(
+    kind: str, target: str, variables: dict[str, Any] | None, transport: Callable[[], Any]
+) -> Any:
+    """リクエストを送信（カセットが設定されている場合は記録または再生）
+
+    Args:
+        kind: "graphql" または "rest"
+        target: GraphQLのクエリ文書、またはRESTの "METHOD path"
+        variables: GraphQLの変数、またはRESTのリクエストボディ
+        transport: 実際にリクエストを送信する関数
+
+    Returns:
+        デコード済みの応答
+    """
+    cassette = get_cassette()
+    if cassette is None:
+        return transport()
+    return cassette.play(kind, target, variables, transport)
+
+
+# クエリに追加してレート制限の残量を取得するフィールド
+RATE_LIMIT_SELECTION = "rateLimit { cost remaining resetAt limit }"
+
+
+def _with_rate_limit(query: str) -> str:
+    """クエリのトップレベルに rateLimit フィールドを追加
+
+    Args:
+        query: GraphQL クエリ
+
+    Returns:
+        rateLimit を含むクエリ（ミューテーションや追加済みの場合はそのまま）
+    """
+    if not query.lstrip().startswith("query") or "rateLimit" in query:
+        return query
+    index = query.index("{") + 1
+    return f"{query[:index]}\n      {RATE_LIMIT_SELECTION}{query[index:]}"
+
+
+def _call_github_graphql(
+    query_or_mutation: str,
+    variables: dict[str, Any] | None = None,
+    idempotent: Optional[bool] = None,
+    partial: bool = False,
+) -> dict[str, Any]:
+    """GitHub GraphQL APIを呼び出す共通関数
+
+    通常は永続接続のHTTPクライアントを使用し、EXECUTOR_GITHUB_TRANSPORT=gh の場合は
+    gh コマンド経由で呼び出します。カセット（cassette.py）が設定されている場合は、
+    やり取りを記録するか、送信せずに記録済みの応答を返します。
+    クエリには rateLimit を追加してレート制限の残量を追跡し、ミューテーションは高優先度、
+    クエリは低優先度としてRateLimiterの許可を待ってから送信します。
+    一時的な障害は再試行します。ミューテーションは idempotent=True の場合を除き、
+    サーバーで処理されていないことが確実な場合のみ再試行します。
+
+    Args:
+        query_or_mutation: GraphQL クエリまたはミューテーション
+        variables: クエリのパラメータ（オプション）
+        idempotent: 繰り返し実行しても安全かどうか（Noneの場合はクエリならTrue）
+        partial: Trueの場合、一部のフィールドだけが失敗したときは例外にせず
+            {"data": data部分, "errors": エラーのリスト} を返す
+
+    Returns:
+        APIレスポンスのdata部分（partial=True の場合は data と errors の辞書）
+
+    Raises:
+        GitHubAPIError: API呼び出しが失敗した場合
+    """
+    is_mutation = query_or_mutation.lstrip().startswith("mutation")
+    query_or_mutation = _with_rate_limit(query_or_mutation)
+    limiter = get_limiter()
+    priority = rate_limit.current_priority(rate_limit.HIGH if is_mutation else rate_limit.LOW)
+
+    def transport() -> dict[str, Any]:
+        with tracing.span("rate_limit.acquire", "github", priority=priority):
+            limiter.acquire(priority, rate_limit.MUTATION_POINTS if is_mutation else 1)
+
+        if use_gh_transport():
+            cmd = [
+                "gh",
+                "api",
+                "graphql",
+                "-f",
+                f"query={query_or_mutation}",
+            ]
+
+            if variables:
+                for key, value in variables.items():
+                    # null は変数を省略することで表現する
+                    if value is None:
+                        continue
+                    # -F は "123" や "true" を型変換し、"@" で始まる値をファイルとして読むため、
+                    # 文字列は -f で渡す
+                    if isinstance(value, str):
+                        cmd.extend(["-f", f"{key}={value}"])
+                    elif isinstance(value, bool):
+                        cmd.extend(["-F", f"{key}={'true' if value else 'false'}"])
+                    else:
+                        cmd.extend(["-F", f"{key}={value}"])
+
+            return _run_gh(cmd)
+        return get_client().graphql(query_or_mutation, variables)
+
+    def send() -> dict[str, Any]:
+        data = _exchange("graphql", query_or_mutation, variables, transport)
+        limiter.record((data.get("data") or {}).pop("rateLimit", None))
+
+        if "errors" in data:
+            errors = data["errors"]
+            rate_limited = any(e.get("type") == "RATE_LIMITED" for e in errors)
+            # HTTP 200 で返される内部エラーやタイムアウトも一時的な障害として再試行の対象にする
+            # （書き込みは処理された可能性があるため、idempotent でなければ再試行しない）
+            transient = any(is_transient_graphql_error(e) for e in errors)
+            # フィールドごとの結果を返す場合も、レート制限と読み込みの一時的な障害は
+            # 再試行できるよう例外にする
+            if not partial or rate_limited or (transient and not is_mutation):
+                error_msg = ", ".join(e.get("message", str(e)) for e in errors)
+                raise GitHubAPIError(
+                    f"GitHub API error: {error_msg}", transient=transient, rate_limited=rate_limited
+                )
+
+        if partial:
+            return {"data": data.get("data") or {}, "errors": data.get("errors") or []}
+        return data.get("data") or {}
+
+    if idempotent is None:
+        idempotent = not is_mutation
+    with tracing.span("github.graphql", "github", mutation=is_mutation):
+        return get_retry_policy().call(send, idempotent=idempotent)
+
+
+def _call_github_rest(
+    method: str,
+    path: str,
+    fields: dict[str, Any] | None = None,
+    idempotent: Optional[bool] = None,
+) -> Any:
+    """GitHub REST APIを呼び出す共通関数
+
+    Args:
+        method: HTTPメソッド
+        path: APIのパス（例: "repos/owner/repo/issues/1/comments"）
+        fields: リクエストボディのフィールド（オプション）
+        idempotent: 繰り返し実行しても安全かどうか（Noneの場合はGETならTrue）
+
+    Returns:
+        デコード済みのレスポンス
+
+    Raises:
+        GitHubAPIError: API呼び出しが失敗した場合
+    """
+    def transport() -> Any:
+        # REST の書き込みは結果コメントの投稿などに使われるため高優先度とする
+        with tracing.span("rate_limit.acquire", "github"):
+            if method == "GET":
+                get_limiter().acquire(rate_limit.current_priority(rate_limit.LOW))
+            else:
+                get_limiter().acquire(rate_limit.HIGH, rate_limit.MUTATION_POINTS)
+
+        if use_gh_transport():
+            cmd = ["gh", "api", "-X", method, path]
+            if fields:
+                for key, value in fields.items():
+                    cmd.extend(["-f", f"{key}={value}"])
+            return _run_gh(cmd)
 
-    data = json.loads(result.stdout)
+        return get_client().request(method, f"/{path}", fields)
 
-    if "errors" in data:
-        errors = data["errors"]
-        error_msg = ", ".join(e.get("message", str(e)) for e in errors)
-        raise RuntimeError(f"GitHub API error: {error_msg}")
+    def send() -> Any:
+        return _exchange("rest", f"{method} {path}", fields, transport)
 
-    return data.get("data", {})
+    if idempotent is None:
+        idempotent = method == "GET"
+    with tracing.span("github.rest", "github", method=method):
+        return get_retry_policy().call(send, idempotent=idempotent)
 
 
+@tracing.traced("github.get_git_remote_info", "github")
 def get_git_remote_info() -> tuple[Optional[str], Optional[str]]:
     """Gitのremote originからオーナーとリポジトリ名を取得
 
@@ -97,15 +321,33 @@ def get_git_remote_info() -> tuple[Optional[str], Optional[str]]:
         return None, None
 
 
+# Project V2 アイテム取得時の1ページあたりの件数（GitHub APIの上限は100）
+PROJECT_ITEMS_PAGE_SIZE = 100
+
+# サーバー側でのStatusフィルタリング（items の query 引数）が使えるかどうか
+_server_side_filter_supported = True
+
+
+@_operation("query_github_project")
 def query_github_project(
-    owner: str, repo: str, project_number: int
+    owner: str,
+    repo: str,
+    project_number: int,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    page_size: int = PROJECT_ITEMS_PAGE_SIZE,
+    updated_since: Optional[str] = None,
 ) -> dict[str, Any]:
-    """GitHub Project V2のアイテムをGraphQL APIで取得
+    """GitHub Project V2のアイテムを1ページ分GraphQL APIで取得
 
     Args:
         owner: リポジトリオーナー
         repo: リポジトリ名
         project_number: プロジェクト番号
+        cursor: 前ページの pageInfo.endCursor（Noneの場合は先頭ページ）
+        status: サーバー側でフィルタリングするStatus（Noneの場合はフィルタリングしない）
+        page_size: 1ページあたりの件数
+        updated_since: この日時（ISO 8601）以降に更新されたアイテムにサーバー側で絞り込む
 
     Returns:
         APIレスポンスのデータ部分
@@ -114,24 +356,45 @@ def query_github_project(
         RuntimeError: APIがエラーを返した場合
     """
     query = """
-    query($owner:String!, $repo:String!, $number:Int!) {
+    query($owner:String!, $repo:String!, $number:Int!, $first:Int!, $after:String, $filter:String) {
       repository(owner: $owner, name: $repo) {
         projectV2(number: $number) {
-          items(first: 100) {
+          items(first: $first, after: $after, query: $filter) {
+            pageInfo {
+              hasNextPage
+              endCursor
+            }
             nodes {
               id
+              updatedAt
               content {
+                __typename
                 ... on Issue {
+                  repository {
+                    nameWithOwner
+                  }
                   number
                   title
                   url
                   state
+                  createdAt
+                  labels(first: 20) {
+                    nodes {
+                      name
+                    }
+                  }
                 }
                 ... on PullRequest {
                   number
                   title
                   url
                   state
+                  createdAt
+                  labels(first: 20) {
+                    nodes {
+                      name
+                    }
+                  }
                 }
               }
               fieldValueByName(name: "Status") {
@@ -139,6 +402,11 @@ def query_github_project(
                   name
                 }
               }
+              priority: fieldValueByName(name: "Priority") {
+                ... on ProjectV2ItemFieldSingleSelectValue {
+                  name
+                }
+              }
             }
           }
         }
@@ -146,15 +414,37 @@ def query_github_project(
     }
     """
 
-    data = _call_github_graphql(
-        query,
-        {
-            "owner": owner,
-            "repo": repo,
-            "number": str(project_number),
-        }
-    )
-    return data
+    filters = []
+    if status:
+        filters.append(f'status:"{status}"')
+    if updated_since:
+        # プロジェクトのフィルタは日付単位のため、厳密な比較はクライアント側で行う
+        filters.append(f"updated:>={updated_since[:10]}")
+
+    variables: dict[str, Any] = {
+        "owner": owner,
+        "repo": repo,
+        "number": project_number,
+        "first": page_size,
+        "after": cursor,
+        "filter": " ".join(filters) or None,
+    }
+
+    if variables["filter"] is None:
+        return _call_github_graphql(query, variables)
+
+    global _server_side_filter_supported
+    if _server_side_filter_supported:
+        try:
+            return _call_github_graphql(query, variables)
+        except RuntimeError as e:
+            # query 引数に未対応のAPIの場合はクライアント側フィルタリングへ切り替える
+            if "argument 'query'" not in str(e):
+                raise
+            _server_side_filter_supported = False
+
+    variables["filter"] = None
+    return _call_github_graphql(query, variables)
 
 
 def extract_tickets(api_data: dict[str, Any]) -> list[dict[str, Any]]:
@@ -181,6 +471,8 @@ def extract_tickets(api_data: dict[str, Any]) -> list[dict[str, Any]]:
 
         field_value_by_name = item.get("fieldValueByName", {})
         item_status = field_value_by_name.get("name") if field_value_by_name else None
+        # Priority フィールドがないプロジェクトでは null になる
+        priority = (item.get("priority") or {}).get("name")
 
         ticket = {
             "number": content.get("number"),
@@ -188,6 +480,10 @@ def extract_tickets(api_data: dict[str, Any]) -> list[dict[str, Any]]:
             "url": content.get("url"),
             "state": content.get("state"),
             "status": item_status,
+            "priority": priority,
+            "labels": [label["name"] for label in (content.get("labels") or {}).get("nodes", [])],
+            "created_at": content.get("createdAt"),
+            "updated_at": item.get("updatedAt"),
         }
         tickets.append(ticket)
 
@@ -212,6 +508,52 @@ def filter_by_status(
     return [ticket for ticket in tickets if ticket.get("status") == status]
 
 
+def fetch_tickets_iter(
+    owner: str,
+    repo: str,
+    project_number: int,
+    status: Optional[str] = None,
+    updated_since: Optional[str] = None,
+) -> Iterator[dict[str, Any]]:
+    """GitHub Projectから指定されたStatusのチケットをページ単位で順次取得
+
+    pageInfo.endCursor をたどってすべてのページを取得し、ページが届くたびに
+    チケットをyieldします。Statusのフィルタリングは可能な限りサーバー側で行い、
+    念のためクライアント側でも同じ条件で絞り込みます。
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        project_number: プロジェクト番号
+        status: フィルタリング対象のStatus（Noneの場合はすべて取得）
+        updated_since: この日時（ISO 8601）以降に更新されたチケットのみ取得する
+
+    Yields:
+        チケット情報
+    """
+    cursor = None
+    while True:
+        api_data = query_github_project(
+            owner, repo, project_number, cursor, status, updated_since=updated_since
+        )
+        _index_project_items(owner, repo, project_number, api_data)
+        for ticket in filter_by_status(extract_tickets(api_data), status):
+            if updated_since and (ticket.get("updated_at") or "") < updated_since:
+                continue
+            yield ticket
+
+        page_info = (
+            api_data.get("repository", {})
+            .get("projectV2", {})
+            .get("items", {})
+            .get("pageInfo", {})
+        )
+        cursor = page_info.get("endCursor")
+        if not page_info.get("hasNextPage") or not cursor:
+            return
+
+
+@_operation("fetch_tickets")
 def fetch_tickets(
     owner: str, repo: str, project_number: int, status: Optional[str] = None
 ) -> list[dict[str, Any]]:
@@ -226,11 +568,10 @@ def fetch_tickets(
     Returns:
         チケット情報のリスト
     """
-    api_data = query_github_project(owner, repo, project_number)
-    tickets = extract_tickets(api_data)
-    return filter_by_status(tickets, status)
+    return list(fetch_tickets_iter(owner, repo, project_number, status))
 
 
+@_operation("get_project_info")
 def get_project_info(
     owner: str, repo: str, project_number: int
 ) -> dict[str, Any]:
@@ -274,17 +615,155 @@ def get_project_info(
         {
             "owner": owner,
             "repo": repo,
-            "number": str(project_number),
+            "number": project_number,
         }
     )
     return data.get("repository", {}).get("projectV2", {})
 
 
+# プロジェクトのメタデータ（プロジェクトID、Statusフィールド、選択肢ID）のキャッシュ
+# これらの値はほとんど変わらないため、1日間はディスク上のキャッシュを使う
+PROJECT_METADATA_TTL = 24 * 60 * 60
+
+_project_metadata_cache = JsonFileCache("project_metadata", ttl=PROJECT_METADATA_TTL)
+
+
+def _project_cache_key(owner: str, repo: str, project_number: int) -> str:
+    """プロジェクト単位のキャッシュキーを生成"""
+    return f"{owner}/{repo}/{project_number}"
+
+
+@_operation("get_project_metadata")
+def get_project_metadata(
+    owner: str, repo: str, project_number: int, refresh: bool = False
+) -> dict[str, Any]:
+    """Status更新に必要なプロジェクトのメタデータを取得（キャッシュ付き）
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        project_number: プロジェクト番号
+        refresh: Trueの場合はキャッシュを使わずに取得し直す
+
+    Returns:
+        {"project_id": プロジェクトID, "status_field_id": StatusフィールドID,
+         "options": {Status名: 選択肢ID}} の辞書
+
+    Raises:
+        RuntimeError: APIがエラーを返した場合またはプロジェクト・Statusフィールドが見つからない場合
+    """
+    key = _project_cache_key(owner, repo, project_number)
+    if not refresh:
+        metadata = _project_metadata_cache.get(key)
+        if metadata is not None:
+            return metadata
+
+    # プロジェクト情報を取得
+    project_info = get_project_info(owner, repo, project_number)
+    project_id = project_info.get("id")
+
+    if not project_id:
+        raise RuntimeError("プロジェクトが見つかりません")
+
+    # Statusフィールド情報を取得
+    status_field = None
+    fields = project_info.get("fields", {}).get("nodes", [])
+    for field in fields:
+        if field.get("name") == "Status":
+            status_field = field
+            break
+
+    if not status_field:
+        raise RuntimeError("Statusフィールドが見つかりません")
+
+    metadata = {
+        "project_id": project_id,
+        "status_field_id": status_field.get("id"),
+        "options": {
+            option.get("name"): option.get("id")
+            for option in status_field.get("options", [])
+        },
+    }
+    _project_metadata_cache.set(key, metadata)
+    return metadata
+
+
+def invalidate_project_metadata(owner: str, repo: str, project_number: int) -> None:
+    """プロジェクトのメタデータのキャッシュを破棄
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        project_number: プロジェクト番号
+    """
+    _project_metadata_cache.delete(_project_cache_key(owner, repo, project_number))
+
+
+def _is_unknown_id_error(error: RuntimeError) -> bool:
+    """ノードIDが解決できなかったことを示すエラーかどうかを判定"""
+    message = str(error)
+    return "Could not resolve to a node" in message or "NOT_FOUND" in message
+
+
+# Issue（"owner/repo#番号"）からProjectV2 ItemのIDへの索引（プロジェクトのスキャンのたびに更新）
+# ボードには他のリポジトリのIssueやPRも載るため、リポジトリを含めたキーでIssueだけを記録する
+_project_item_index = JsonFileCache("project_items")
+
+
+def _item_index_key(name_with_owner: str, issue_number: int) -> str:
+    """索引のキー（GitHubのowner/repoは大文字・小文字を区別しない）"""
+    return f"{name_with_owner}#{issue_number}".lower()
+
+
+def _index_project_items(
+    owner: str, repo: str, project_number: int, api_data: dict[str, Any]
+) -> None:
+    """query_github_projectの結果からIssue番号とItem IDの対応を索引に記録"""
+    items = (
+        api_data.get("repository", {})
+        .get("projectV2", {})
+        .get("items", {})
+        .get("nodes", [])
+    )
+
+    entries = {}
+    for item in items:
+        content = item.get("content") or {}
+        name_with_owner = (content.get("repository") or {}).get("nameWithOwner")
+        if content.get("__typename") != "Issue" or not name_with_owner or not item.get("id"):
+            continue
+        if content.get("number") is not None:
+            entries[_item_index_key(name_with_owner, content["number"])] = item["id"]
+    if entries:
+        _project_item_index.update(_project_cache_key(owner, repo, project_number), entries)
+
+
+def forget_issue_item_id(
+    owner: str, repo: str, project_number: int, issue_number: int
+) -> None:
+    """索引からIssueのItem IDを削除
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        project_number: プロジェクト番号
+        issue_number: Issue番号
+    """
+    _project_item_index.update(
+        _project_cache_key(owner, repo, project_number),
+        {_item_index_key(f"{owner}/{repo}", issue_number): None},
+    )
+
+
+@_operation("get_issue_item_id")
 def get_issue_item_id(
     owner: str, repo: str, project_number: int, issue_number: int
 ) -> Optional[str]:
     """Issueに対応するProjectV2 ItemのIDを取得
 
+    まず索引を参照し、見つからない場合はIssueの projectItems から対象プロジェクトの
+    Itemを探します。ボード全体をスキャンしないため、プロジェクトの規模によらず動作します。
+
     Args:
         owner: リポジトリオーナー
         repo: リポジトリ名
@@ -297,17 +776,26 @@ def get_issue_item_id(
     Raises:
         RuntimeError: APIがエラーを返した場合
     """
+    key = _project_cache_key(owner, repo, project_number)
+    item_id = (_project_item_index.get(key) or {}).get(_item_index_key(f"{owner}/{repo}", issue_number))
+    if item_id:
+        return item_id
+
+    project_id = get_project_metadata(owner, repo, project_number)["project_id"]
+
     query = """
-    query($owner:String!, $repo:String!, $number:Int!) {
+    query($owner:String!, $repo:String!, $number:Int!, $after:String) {
       repository(owner: $owner, name: $repo) {
-        projectV2(number: $number) {
-          items(first: 100) {
+        issue(number: $number) {
+          projectItems(first: 50, after: $after, includeArchived: true) {
+            pageInfo {
+              hasNextPage
+              endCursor
+            }
             nodes {
               id
-              content {
-                ... on Issue {
-                  number
-                }
+              project {
+                id
               }
             }
           }
@@ -316,30 +804,343 @@ def get_issue_item_id(
     }
     """
 
+    cursor = None
+    while True:
+        data = _call_github_graphql(
+            query,
+            {
+                "owner": owner,
+                "repo": repo,
+                "number": issue_number,
+                "after": cursor,
+            }
+        )
+
+        project_items = (
+            (data.get("repository", {}).get("issue") or {})
+            .get("projectItems", {})
+        )
+
+        for item in project_items.get("nodes", []):
+            if (item.get("project") or {}).get("id") == project_id:
+                _project_item_index.update(
+                    key, {_item_index_key(f"{owner}/{repo}", issue_number): item.get("id")}
+                )
+                return item.get("id")
+
+        page_info = project_items.get("pageInfo", {})
+        cursor = page_info.get("endCursor")
+        if not page_info.get("hasNextPage") or not cursor:
+            return None
+
+
+# チケット関連のクエリで共通して使うフラグメント
+ISSUE_FIELDS_FRAGMENT = """
+fragment IssueFields on Issue {
+  id
+  number
+  title
+  body
+  state
+  createdAt
+  updatedAt
+  author {
+    login
+  }
+  labels(first: 10) {
+    nodes {
+      name
+    }
+  }
+}
+"""
+
+PULL_REQUEST_FIELDS_FRAGMENT = """
+fragment PullRequestFields on PullRequest {
+  number
+  title
+  url
+  state
+  headRefName
+}
+"""
+
+COMMENT_FIELDS_FRAGMENT = """
+fragment CommentFields on IssueComment {
+  id
+  author {
+    __typename
+    login
+  }
+  body
+  createdAt
+}
+"""
+
+
+def _parse_issue(issue: dict[str, Any]) -> dict[str, Any]:
+    """IssueFields フラグメントの結果をIssue詳細情報に変換"""
+    return {
+        "id": issue.get("id"),
+        "number": issue.get("number"),
+        "title": issue.get("title"),
+        "body": issue.get("body", ""),
+        "state": issue.get("state"),
+        "created_at": issue.get("createdAt"),
+        "updated_at": issue.get("updatedAt"),
+        "author": (issue.get("author") or {}).get("login"),
+        "labels": [label.get("name") for label in issue.get("labels", {}).get("nodes", [])],
+    }
+
+
+def _parse_pull_request(pr: dict[str, Any]) -> dict[str, Any]:
+    """PullRequestFields フラグメントの結果をPR情報に変換"""
+    return {
+        "number": pr.get("number"),
+        "title": pr.get("title"),
+        "url": pr.get("url"),
+        "state": pr.get("state"),
+        "headRefName": pr.get("headRefName"),
+    }
+
+
+def _parse_comments(comments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """CommentFields フラグメントの結果をコメント情報のリストに変換"""
+    return [
+        {
+            "id": comment.get("id", ""),
+            "author": (comment.get("author") or {}).get("login", "unknown"),
+            # GraphQLではBotのloginに "[bot]" が付かないため、種類で判定する
+            "author_type": (comment.get("author") or {}).get("__typename"),
+            "body": comment.get("body", ""),
+            "created_at": comment.get("createdAt"),
+        }
+        for comment in comments
+    ]
+
+
+# PRコメントを1リクエストで取得する件数
+PR_COMMENTS_PAGE_SIZE = 100
+
+# PRごとにキャッシュに保持する最新のコメント数（プロンプトに含める候補）
+MAX_CACHED_PR_COMMENTS = 100
+
+# 過去のコメントの編集・削除を取り込むため、この秒数が経過したらコメントを取得し直す
+PR_COMMENTS_TTL = 7 * 24 * 60 * 60
+
+# PRごとのコメントのカーソルと最新のコメント（{"cursor": 最新コメントのカーソル, "comments": [...]}）、
+# およびブランチ名からPR番号への対応
+_pr_comment_state = JsonFileCache("pr_comments", ttl=PR_COMMENTS_TTL)
+
+
+def _pr_comments_key(owner: str, repo: str, pr_number: int) -> str:
+    """PRごとのコメントの状態のキャッシュキーを生成"""
+    return f"{owner}/{repo}#{pr_number}"
+
+
+def _branch_pr_key(owner: str, repo: str, branch: str) -> str:
+    """ブランチ名からPR番号への対応のキャッシュキーを生成"""
+    return f"{owner}/{repo}@{branch}"
+
+
+def _store_comment_state(
+    owner: str, repo: str, pr_number: int, cursor: Optional[str], comments: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """PRの最新コメントのカーソルと最新のコメントをキャッシュに保存
+
+    Returns:
+        保存した最新 MAX_CACHED_PR_COMMENTS 件のコメント情報のリスト（古い順）
+    """
+    comments = comments[-MAX_CACHED_PR_COMMENTS:]
+    _pr_comment_state.set(
+        _pr_comments_key(owner, repo, pr_number), {"cursor": cursor, "comments": comments}
+    )
+    return comments
+
+
+def _merge_comment_page(
+    owner: str,
+    repo: str,
+    pr_number: int,
+    state: Optional[dict[str, Any]],
+    connection: dict[str, Any],
+) -> list[dict[str, Any]]:
+    """取得したコメントのページをキャッシュ済みのコメントに統合して保存
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        pr_number: PR番号
+        state: キャッシュ済みの状態（Noneの場合は connection が最新のページ）
+        connection: comments コネクション（pageInfo と nodes）
+
+    Returns:
+        最新 MAX_CACHED_PR_COMMENTS 件のコメント情報のリスト（古い順）
+    """
+    page_info = connection.get("pageInfo") or {}
+    comments = (state or {}).get("comments", []) + _parse_comments(connection.get("nodes", []))
+    # 新しいコメントがなければ endCursor は null になるので、前回のカーソルを使い続ける
+    cursor = page_info.get("endCursor") or (state or {}).get("cursor")
+    return _store_comment_state(owner, repo, pr_number, cursor, comments)
+
+
+# Issue番号からIssueのノードIDへの索引（addComment の対象の解決に使う、IDは変わらない）
+_issue_node_ids = JsonFileCache("issue_ids")
+
+
+def _index_issue_ids(owner: str, repo: str, issues: list[dict[str, Any]]) -> None:
+    """IssueFields フラグメントの結果からIssue番号とノードIDの対応を索引に記録"""
+    entries = {
+        str(issue["number"]): issue["id"]
+        for issue in issues
+        if issue.get("id") and issue.get("number") is not None
+    }
+    if entries:
+        _issue_node_ids.update(f"{owner}/{repo}", entries)
+
+
+@_operation("get_issue_node_id")
+def get_issue_node_id(owner: str, repo: str, issue_number: int) -> str:
+    """IssueのノードID（GraphQL ID）を取得
+
+    fetch_ticket_context などで取得済みのIssueは索引から返し、API呼び出しを行いません。
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        issue_number: Issue番号
+
+    Returns:
+        ノードID
+
+    Raises:
+        RuntimeError: APIがエラーを返した場合またはIssueが見つからない場合
+    """
+    node_id = (_issue_node_ids.get(f"{owner}/{repo}") or {}).get(str(issue_number))
+    if node_id:
+        return node_id
+
+    query = """
+    query($owner:String!, $repo:String!, $number:Int!) {
+      repository(owner: $owner, name: $repo) {
+        issue(number: $number) {
+          id
+          number
+        }
+      }
+    }
+    """
+
+    data = _call_github_graphql(query, {"owner": owner, "repo": repo, "number": issue_number})
+    issue = (data.get("repository") or {}).get("issue")
+    if not issue or not issue.get("id"):
+        raise RuntimeError(f"Issue #{issue_number} が見つかりません")
+    _index_issue_ids(owner, repo, [issue])
+    return issue["id"]
+
+
+@_operation("fetch_ticket_context")
+def fetch_ticket_context(
+    owner: str, repo: str, issue_number: int
+) -> dict[str, Any]:
+    """チケットの実行に必要な情報を1回のリクエストでまとめて取得
+
+    Issue詳細、`feature/{issue_number}` ブランチのオープンなPR、そのPRのコメントを
+    1つのGraphQLドキュメントで取得します。前回の実行でPRのコメントを取得済みの場合は
+    保存したカーソル以降のコメントだけを取得し、初めての場合は最新のページを取得します。
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        issue_number: Issue番号
+
+    Returns:
+        {"issue": Issue詳細情報, "pr": PR情報またはNone, "pr_comments": コメント情報のリストまたはNone}
+
+    Raises:
+        RuntimeError: APIがエラーを返した場合またはIssueが見つからない場合
+    """
+    query = """
+    query($owner:String!, $repo:String!, $number:Int!, $branch:String!,
+          $commentsFirst:Int, $commentsAfter:String, $commentsLast:Int) {
+      repository(owner: $owner, name: $repo) {
+        issue(number: $number) {
+          ...IssueFields
+        }
+        pullRequests(first: 1, headRefName: $branch, states: OPEN) {
+          nodes {
+            ...PullRequestFields
+            comments(first: $commentsFirst, after: $commentsAfter, last: $commentsLast) {
+              pageInfo {
+                hasNextPage
+                endCursor
+              }
+              nodes {
+                ...CommentFields
+              }
+            }
+          }
+        }
+      }
+    }
+    """ + ISSUE_FIELDS_FRAGMENT + PULL_REQUEST_FIELDS_FRAGMENT + COMMENT_FIELDS_FRAGMENT
+
+    branch = f"feature/{issue_number}"
+    known_pr_number = _pr_comment_state.get(_branch_pr_key(owner, repo, branch))
+    state = (
+        _pr_comment_state.get(_pr_comments_key(owner, repo, known_pr_number))
+        if known_pr_number else None
+    )
+    if state and state.get("cursor"):
+        comment_args = {"commentsFirst": PR_COMMENTS_PAGE_SIZE, "commentsAfter": state["cursor"]}
+    else:
+        state = None
+        comment_args = {"commentsLast": PR_COMMENTS_PAGE_SIZE}
+
     data = _call_github_graphql(
         query,
         {
             "owner": owner,
             "repo": repo,
-            "number": str(project_number),
+            "number": issue_number,
+            "branch": branch,
+            **comment_args,
         }
     )
 
-    items = (
-        data.get("repository", {})
-        .get("projectV2", {})
-        .get("items", {})
-        .get("nodes", [])
-    )
+    repository = data.get("repository") or {}
+    issue = repository.get("issue")
 
-    for item in items:
-        content = item.get("content", {})
-        if content.get("number") == issue_number:
-            return item.get("id")
+    if not issue:
+        raise RuntimeError(f"Issue #{issue_number} が見つかりません")
+    _index_issue_ids(owner, repo, [issue])
+
+    prs = (repository.get("pullRequests") or {}).get("nodes", [])
+    pr = prs[0] if prs else None
+    if not pr:
+        return {"issue": _parse_issue(issue), "pr": None, "pr_comments": None}
+
+    pr_number = pr.get("number")
+    connection = pr.get("comments") or {}
+    if state is not None and pr_number != known_pr_number:
+        # ブランチのPRが作り直されていた場合、前のPRのカーソルは使えないので取得し直す
+        comments = get_pr_comments(owner, repo, pr_number, refresh=True)
+    else:
+        comments = _merge_comment_page(owner, repo, pr_number, state, connection)
+        if state is not None and (connection.get("pageInfo") or {}).get("hasNextPage"):
+            # 前回以降のコメントが1ページに収まらなかった場合は、続きを取得する
+            comments = get_pr_comments(owner, repo, pr_number)
+    if pr_number != known_pr_number:
+        _pr_comment_state.set(_branch_pr_key(owner, repo, branch), pr_number)
 
-    return None
+    return {
+        "issue": _parse_issue(issue),
+        "pr": _parse_pull_request(pr),
+        "pr_comments": comments,
+    }
 
 
+@_operation("get_issue_details")
 def get_issue_details(owner: str, repo: str, issue_number: int) -> dict[str, Any]:
     """Issue詳細情報を取得
 
@@ -358,31 +1159,18 @@ def get_issue_details(owner: str, repo: str, issue_number: int) -> dict[str, Any
     query($owner:String!, $repo:String!, $number:Int!) {
       repository(owner: $owner, name: $repo) {
         issue(number: $number) {
-          number
-          title
-          body
-          state
-          createdAt
-          updatedAt
-          author {
-            login
-          }
-          labels(first: 10) {
-            nodes {
-              name
-            }
-          }
+          ...IssueFields
         }
       }
     }
-    """
+    """ + ISSUE_FIELDS_FRAGMENT
 
     data = _call_github_graphql(
         query,
         {
             "owner": owner,
             "repo": repo,
-            "number": str(issue_number),
+            "number": issue_number,
         }
     )
 
@@ -390,19 +1178,95 @@ def get_issue_details(owner: str, repo: str, issue_number: int) -> dict[str, Any
 
     if not issue:
         raise RuntimeError(f"Issue #{issue_number} が見つかりません")
+    _index_issue_ids(owner, repo, [issue])
+
+    return _parse_issue(issue)
 
-    return {
-        "number": issue.get("number"),
-        "title": issue.get("title"),
-        "body": issue.get("body", ""),
-        "state": issue.get("state"),
-        "created_at": issue.get("createdAt"),
-        "updated_at": issue.get("updatedAt"),
-        "author": issue.get("author", {}).get("login"),
-        "labels": [label.get("name") for label in issue.get("labels", {}).get("nodes", [])],
-    }
 
+# 一括取得時に1リクエストへまとめるIssue数
+# （labels(first: 10) と合わせてGitHubのノード数・複雑度の上限に収まる件数）
+ISSUE_DETAILS_CHUNK_SIZE = 100
 
+
+class IssueDetailsBulk(NamedTuple):
+    """get_issue_details_bulk の結果"""
+
+    details: dict[int, dict[str, Any]]
+    missing: list[int]
+
+
+@_operation("get_issue_details_bulk")
+def get_issue_details_bulk(
+    owner: str,
+    repo: str,
+    issue_numbers: list[int],
+    chunk_size: int = ISSUE_DETAILS_CHUNK_SIZE,
+) -> IssueDetailsBulk:
+    """複数のIssue詳細情報をエイリアス付きクエリでまとめて取得
+
+    `i123: issue(number: 123) {...}` の形で複数のIssueを1つのクエリにまとめ、
+    chunk_size件ごとに1リクエストで取得します。
+    削除・移管されたIssueがあっても、残りのIssueは取得します。
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        issue_numbers: Issue番号のリスト
+        chunk_size: 1リクエストあたりのIssue数
+
+    Returns:
+        IssueDetailsBulk。details はIssue番号をキー、get_issue_detailsと同じ形式の
+        Issue詳細情報を値とする辞書で、missing は見つからなかったIssue番号のリスト
+
+    Raises:
+        RuntimeError: リポジトリを取得できなかった場合
+    """
+    numbers = list(dict.fromkeys(int(number) for number in issue_numbers))
+    details: dict[int, dict[str, Any]] = {}
+    missing: list[int] = []
+
+    for start in range(0, len(numbers), chunk_size):
+        chunk = numbers[start:start + chunk_size]
+        selections = "\n".join(
+            f"i{number}: issue(number: {number}) {{ ...IssueFields }}" for number in chunk
+        )
+        query = f"""
+        query($owner:String!, $repo:String!) {{
+          repository(owner: $owner, name: $repo) {{
+            {selections}
+          }}
+        }}
+        """ + ISSUE_FIELDS_FRAGMENT
+
+        # 一部のIssueが見つからなくても、残りのIssueは取得できるようにする
+        result = _call_github_graphql(query, {"owner": owner, "repo": repo}, partial=True)
+        repository = result["data"].get("repository")
+        if repository is None:
+            error_msg = ", ".join(e.get("message", str(e)) for e in result["errors"])
+            raise RuntimeError(f"Issueを取得できません: {error_msg}")
+
+        issues = []
+        for number in chunk:
+            issue = repository.get(f"i{number}")
+            if not issue:
+                missing.append(number)
+                continue
+            details[number] = _parse_issue(issue)
+            issues.append(issue)
+        _index_issue_ids(owner, repo, issues)
+
+    return IssueDetailsBulk(details, missing)
+
+
+def _write_priority() -> ContextManager[None]:
+    """書き込みのブロックの優先度を指定
+
+    ID解決のための読み込みも含めて、書き込みと同じ高優先度で扱います。
+    """
+    return rate_limit.priority(rate_limit.HIGH)
+
+
+@_operation("update_ticket_status")
 def update_ticket_status(
     owner: str,
     repo: str,
@@ -422,90 +1286,79 @@ def update_ticket_status(
     Raises:
         RuntimeError: APIがエラーを返した場合またはアイテムが見つからない場合
     """
-    # プロジェクト情報を取得
-    project_info = get_project_info(owner, repo, project_number)
-    project_id = project_info.get("id")
+    with _write_priority():
+        _update_ticket_status(owner, repo, project_number, issue_number, new_status)
 
-    if not project_id:
-        raise RuntimeError("プロジェクトが見つかりません")
-
-    # Statusフィールド情報を取得
-    status_field = None
-    fields = project_info.get("fields", {}).get("nodes", [])
-    for field in fields:
-        if field.get("name") == "Status":
-            status_field = field
-            break
-
-    if not status_field:
-        raise RuntimeError("Statusフィールドが見つかりません")
-
-    field_id = status_field.get("id")
-    options = status_field.get("options", [])
-
-    # 指定されたStatusのオプションIDを取得
-    option_id = None
-    for option in options:
-        if option.get("name") == new_status:
-            option_id = option.get("id")
-            break
-
-    if not option_id:
-        raise RuntimeError(
-            f"Status '{new_status}' が見つかりません。"
-            f"利用可能: {', '.join(opt.get('name', '') for opt in options)}"
-        )
-
-    # Issueのアイテムを取得
-    item_id = get_issue_item_id(owner, repo, project_number, issue_number)
-
-    if not item_id:
-        raise RuntimeError(f"Issue #{issue_number} がプロジェクトで見つかりません")
 
+def _update_ticket_status(
+    owner: str,
+    repo: str,
+    project_number: int,
+    issue_number: int,
+    new_status: str,
+) -> None:
+    """update_ticket_statusの本体"""
     # Statusを更新
-    mutation = f"""
-    mutation {{
+    mutation = """
+    mutation($projectId:ID!, $itemId:ID!, $fieldId:ID!, $optionId:String!) {
       updateProjectV2ItemFieldValue(
-        input: {{
-          projectId: "{project_id}"
-          itemId: "{item_id}"
-          fieldId: "{field_id}"
-          value: {{singleSelectOptionId: "{option_id}"}}
-        }}
-      ) {{
-        projectV2Item {{
+        input: {
+          projectId: $projectId
+          itemId: $itemId
+          fieldId: $fieldId
+          value: {singleSelectOptionId: $optionId}
+        }
+      ) {
+        projectV2Item {
           id
-        }}
-      }}
-    }}
+        }
+      }
+    }
     """
 
-    result = subprocess.run(
-        [
-            "gh",
-            "api",
-            "graphql",
-            "-f",
-            f"query={mutation}",
-        ],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-
-    if result.returncode != 0:
-        raise RuntimeError(
-            f"GitHub API error: {result.stderr if result.stderr else result.stdout}"
-        )
-
-    data = json.loads(result.stdout)
-
-    if "errors" in data:
-        errors = data["errors"]
-        error_msg = ", ".join(e.get("message", str(e)) for e in errors)
-        raise RuntimeError(f"GitHub API error: {error_msg}")
-
-
+    # キャッシュが古い可能性がある場合は、メタデータとItem IDを取得し直して一度だけやり直す
+    for attempt in range(2):
+        metadata = get_project_metadata(owner, repo, project_number, refresh=attempt > 0)
+        options = metadata["options"]
+
+        # Issueのアイテムを取得
+        item_id = get_issue_item_id(owner, repo, project_number, issue_number)
+
+        if not item_id:
+            raise RuntimeError(f"Issue #{issue_number} がプロジェクトで見つかりません")
+
+        # 指定されたStatusのオプションIDを取得
+        option_id = options.get(new_status)
+
+        if not option_id:
+            if attempt == 0:
+                continue
+            raise RuntimeError(
+                f"Status '{new_status}' が見つかりません。"
+                f"利用可能: {', '.join(options)}"
+            )
+
+        try:
+            _call_github_graphql(
+                mutation,
+                {
+                    "projectId": metadata["project_id"],
+                    "itemId": item_id,
+                    "fieldId": metadata["status_field_id"],
+                    "optionId": option_id,
+                },
+                # 同じ値を設定し直すだけなので、何度実行しても結果は変わらない
+                idempotent=True,
+            )
+            return
+        except RuntimeError as e:
+            if attempt > 0 or not _is_unknown_id_error(e):
+                raise
+            invalidate_project_metadata(owner, repo, project_number)
+            forget_issue_item_id(owner, repo, project_number, issue_number)
+
+
+@_operation("get_pr_by_branch_name")
 def get_pr_by_branch_name(
     owner: str, repo: str, branch_name: str
 ) -> Optional[dict[str, Any]]:
@@ -525,18 +1378,14 @@ def get_pr_by_branch_name(
     query = """
     query($owner:String!, $repo:String!, $branch:String!) {
       repository(owner: $owner, name: $repo) {
-        pullRequests(first: 10, headRefName: $branch, states: OPEN) {
+        pullRequests(first: 1, headRefName: $branch, states: OPEN) {
           nodes {
-            number
-            title
-            url
-            state
-            headRefName
+            ...PullRequestFields
           }
         }
       }
     }
-    """
+    """ + PULL_REQUEST_FIELDS_FRAGMENT
 
     data = _call_github_graphql(
         query,
@@ -553,69 +1402,169 @@ def get_pr_by_branch_name(
         .get("nodes", [])
     )
 
-    return prs[0] if prs else None
+    return _parse_pull_request(prs[0]) if prs else None
 
 
+@_operation("get_pr_comments")
 def get_pr_comments(
-    owner: str, repo: str, pr_number: int
+    owner: str, repo: str, pr_number: int, refresh: bool = False
 ) -> list[dict[str, Any]]:
-    """プルリクエストのコメントを取得
+    """プルリクエストの最新のコメントを取得
+
+    初回は最新のコメントから古い方へページをたどり、最新 MAX_CACHED_PR_COMMENTS 件を
+    取得します。最新コメントのカーソルをPRごとにディスクへ保存し、2回目以降は
+    そのカーソル以降に追加されたコメントだけを取得してキャッシュ済みのコメントに統合します。
 
     Args:
         owner: リポジトリオーナー
         repo: リポジトリ名
         pr_number: PR番号
+        refresh: Trueの場合は保存したカーソルを使わずに取得し直す
 
     Returns:
-        コメント情報のリスト（各要素は{id, author, body}の辞書）
+        コメント情報のリスト（古い順、各要素は{id, author, author_type, body, created_at}の辞書）
 
     Raises:
         RuntimeError: APIがエラーを返した場合
     """
     query = """
-    query($owner:String!, $repo:String!, $number:Int!) {
+    query($owner:String!, $repo:String!, $number:Int!,
+          $first:Int, $after:String, $last:Int, $before:String) {
       repository(owner: $owner, name: $repo) {
         pullRequest(number: $number) {
-          comments(first: 100) {
+          comments(first: $first, after: $after, last: $last, before: $before) {
+            pageInfo {
+              hasNextPage
+              hasPreviousPage
+              startCursor
+              endCursor
+            }
             nodes {
-              id
-              author {
-                login
-              }
-              body
+              ...CommentFields
             }
           }
         }
       }
     }
+    """ + COMMENT_FIELDS_FRAGMENT
+
+    def fetch_page(**page_args: Any) -> dict[str, Any]:
+        data = _call_github_graphql(
+            query, {"owner": owner, "repo": repo, "number": pr_number, **page_args}
+        )
+        return ((data.get("repository") or {}).get("pullRequest") or {}).get("comments") or {}
+
+    state = None if refresh else _pr_comment_state.get(_pr_comments_key(owner, repo, pr_number))
+
+    if state and state.get("cursor"):
+        # 前回以降に追加されたコメントを古い順にたどる
+        comments = state.get("comments", [])
+        cursor = state["cursor"]
+        try:
+            while True:
+                connection = fetch_page(first=PR_COMMENTS_PAGE_SIZE, after=cursor)
+                page_info = connection.get("pageInfo") or {}
+                comments = comments + _parse_comments(connection.get("nodes", []))
+                cursor = page_info.get("endCursor") or cursor
+                if not page_info.get("hasNextPage"):
+                    return _store_comment_state(owner, repo, pr_number, cursor, comments)
+        except GitHubAPIError as e:
+            # カーソルが無効になった場合（コメントの削除など）は取得し直す
+            if e.transient:
+                raise
+            return get_pr_comments(owner, repo, pr_number, refresh=True)
+
+    # 最新のコメントから古い方へたどる
+    comments: list[dict[str, Any]] = []
+    newest_cursor = None
+    before = None
+    while len(comments) < MAX_CACHED_PR_COMMENTS:
+        connection = fetch_page(last=PR_COMMENTS_PAGE_SIZE, before=before)
+        page_info = connection.get("pageInfo") or {}
+        if newest_cursor is None:
+            newest_cursor = page_info.get("endCursor")
+        comments = _parse_comments(connection.get("nodes", [])) + comments
+        before = page_info.get("startCursor")
+        if not page_info.get("hasPreviousPage") or not before:
+            break
+
+    return _store_comment_state(owner, repo, pr_number, newest_cursor, comments)
+
+
+# get_open_pr_activity でPRごとに取得する最近のコメントの件数
+# （人間のコメントの直後にbotやCIのコメントが続いても見落とさないため、最新の1件だけにしない）
+PR_ACTIVITY_COMMENTS = 5
+
+
+@_operation("get_open_pr_activity")
+def get_open_pr_activity(
+    owner: str, repo: str, limit: int = 50, comments: int = PR_ACTIVITY_COMMENTS
+) -> list[dict[str, Any]]:
+    """最近更新されたオープンなプルリクエストと最近のコメントを取得
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        limit: 取得するPRの件数（更新日時の新しい順）
+        comments: PRごとに取得する最近のコメントの件数
+
+    Returns:
+        PR情報のリスト（各要素は{number, head_ref_name, updated_at, recent_comments, last_comment}の辞書。
+        recent_comments は古い順、last_comment はコメントがない場合None）
+
+    Raises:
+        RuntimeError: APIがエラーを返した場合
     """
+    query = """
+    query($owner:String!, $repo:String!, $first:Int!, $comments:Int!) {
+      repository(owner: $owner, name: $repo) {
+        pullRequests(first: $first, states: OPEN, orderBy: {field: UPDATED_AT, direction: DESC}) {
+          nodes {
+            number
+            headRefName
+            updatedAt
+            comments(last: $comments) {
+              nodes {
+                ...CommentFields
+              }
+            }
+          }
+        }
+      }
+    }
+    """ + COMMENT_FIELDS_FRAGMENT
 
     data = _call_github_graphql(
         query,
         {
             "owner": owner,
             "repo": repo,
-            "number": str(pr_number),
+            "first": limit,
+            "comments": comments,
         }
     )
 
-    comments = (
+    prs = (
         data.get("repository", {})
-        .get("pullRequest", {})
-        .get("comments", {})
+        .get("pullRequests", {})
         .get("nodes", [])
     )
 
-    return [
-        {
-            "id": comment.get("id", ""),
-            "author": comment.get("author", {}).get("login", "unknown"),
-            "body": comment.get("body", ""),
-        }
-        for comment in comments
-    ]
+    activity = []
+    for pr in prs:
+        recent = _parse_comments(pr.get("comments", {}).get("nodes", []))
+        activity.append({
+            "number": pr.get("number"),
+            "head_ref_name": pr.get("headRefName"),
+            "updated_at": pr.get("updatedAt"),
+            "recent_comments": recent,
+            "last_comment": recent[-1] if recent else None,
+        })
+
+    return activity
 
 
+@_operation("post_issue_comment")
 def post_issue_comment(
     owner: str, repo: str, issue_number: int, body: str
 ) -> dict[str, Any]:
@@ -633,31 +1582,32 @@ def post_issue_comment(
     Raises:
         RuntimeError: APIがエラーを返した場合
     """
-    # gh CLI で直接コメントを投稿（より簡単）
-    result = subprocess.run(
-        [
-            "gh",
-            "issue",
-            "comment",
-            str(issue_number),
-            "--body",
-            body,
-            "--repo",
-            f"{owner}/{repo}",
-        ],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
-
-    if result.returncode != 0:
-        raise RuntimeError(
-            f"Failed to post comment: {result.stderr if result.stderr else result.stdout}"
+    try:
+        _call_github_rest(
+            "POST",
+            f"repos/{owner}/{repo}/issues/{issue_number}/comments",
+            {"body": body},
         )
+    except RuntimeError as e:
+        raise RuntimeError(f"Failed to post comment: {e}")
 
     return {"status": "success"}
 
 
+# REST形式のリアクション名とGraphQLのReactionContentの対応
+REACTION_CONTENTS = {
+    "+1": "THUMBS_UP",
+    "-1": "THUMBS_DOWN",
+    "laugh": "LAUGH",
+    "confused": "CONFUSED",
+    "heart": "HEART",
+    "hooray": "HOORAY",
+    "rocket": "ROCKET",
+    "eyes": "EYES",
+}
+
+
+@_operation("add_reaction_to_comment")
 def add_reaction_to_comment(
     owner: str, repo: str, comment_id: str, content: str = "+1"
 ) -> None:
@@ -673,19 +1623,234 @@ def add_reaction_to_comment(
     Raises:
         RuntimeError: APIがエラーを返した場合
     """
-    result = subprocess.run(
-        [
-            "gh",
-            "api",
-            f"repos/{owner}/{repo}/issues/comments/{comment_id}/reactions",
-            "-f",
-            f"content={content}",
-        ],
-        capture_output=True,
-        text=True,
-        check=False,
-    )
+    reaction = REACTION_CONTENTS.get(content)
+    if not reaction:
+        raise RuntimeError(f"Failed to add reaction: 未対応のリアクションです: {content}")
+
+    mutation = """
+    mutation($subjectId:ID!, $content:ReactionContent!) {
+      addReaction(input: {subjectId: $subjectId, content: $content}) {
+        reaction {
+          content
+        }
+      }
+    }
+    """
 
-    if result.returncode != 0:
-        error_msg = result.stderr.strip() if result.stderr else result.stdout.strip()
-        raise RuntimeError(f"Failed to add reaction: {error_msg}")
+    try:
+        # 同じリアクションは重複して追加されないため、再試行しても安全
+        _call_github_graphql(
+            mutation, {"subjectId": comment_id, "content": reaction}, idempotent=True
+        )
+    except RuntimeError as e:
+        raise RuntimeError(f"Failed to add reaction: {e}")
+
+
+# WriteBatch で扱う書き込みの種類ごとのミューテーションのフィールド名、input の引数、選択セット
+# （input の {名前} は操作ごとの変数に置き換える）
+_WRITE_MUTATIONS = {
+    "add_comment": (
+        "addComment",
+        "subjectId: {subjectId}, body: {body}",
+        "{ commentEdge { node { id url } } }",
+    ),
+    "add_reaction": (
+        "addReaction",
+        "subjectId: {subjectId}, content: {content}",
+        "{ reaction { content } }",
+    ),
+    "update_status": (
+        "updateProjectV2ItemFieldValue",
+        "projectId: {projectId}, itemId: {itemId}, fieldId: {fieldId}, "
+        "value: {{singleSelectOptionId: {optionId}}}",
+        "{ projectV2Item { id } }",
+    ),
+}
+
+
+class WriteResult(NamedTuple):
+    """WriteBatch の操作ごとの結果"""
+
+    operation: str
+    ok: bool
+    data: Optional[dict[str, Any]]
+    error: Optional[str]
+
+
+class WriteBatch:
+    """複数の書き込みを1つのエイリアス付きミューテーションにまとめて送信する
+
+    addComment、addReaction、updateProjectV2ItemFieldValue を追加した順に
+    `op0: addComment(...)`、`op1: addReaction(...)` の形で1つのドキュメントにまとめ、
+    1回のリクエストで送信します。結果は操作ごとに WriteResult で返し、一部の操作が
+    失敗しても他の操作の結果は失われません。
+
+    使用例:
+        batch = WriteBatch(owner, repo)
+        batch.add_comment(12, body)
+        batch.add_reaction(comment_id, "+1")
+        batch.update_status(project_number, 12, "Done")
+        comment, reaction, status = batch.execute()
+    """
+
+    def __init__(self, owner: str, repo: str):
+        """初期化
+
+        Args:
+            owner: リポジトリオーナー
+            repo: リポジトリ名
+        """
+        self.owner = owner
+        self.repo = repo
+        self._operations: list[tuple[str, dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self._operations)
+
+    def add_comment(self, issue_number: int, body: str) -> None:
+        """Issueへのコメントの投稿を追加
+
+        Args:
+            issue_number: Issue番号
+            body: コメント本文
+        """
+        self._operations.append(("add_comment", {"issue_number": issue_number, "body": body}))
+
+    def add_reaction(self, comment_id: str, content: str = "+1") -> None:
+        """コメントへのリアクションの追加を追加
+
+        Args:
+            comment_id: コメントID (GraphQL ID)
+            content: リアクションの種類（REACTION_CONTENTS のキー）
+
+        Raises:
+            RuntimeError: 未対応のリアクションの場合
+        """
+        reaction = REACTION_CONTENTS.get(content)
+        if not reaction:
+            raise RuntimeError(f"Failed to add reaction: 未対応のリアクションです: {content}")
+        self._operations.append(("add_reaction", {"comment_id": comment_id, "content": reaction}))
+
+    def update_status(self, project_number: int, issue_number: int, new_status: str) -> None:
+        """チケットのStatusの更新を追加
+
+        Args:
+            project_number: プロジェクト番号
+            issue_number: Issue番号
+            new_status: 新しいStatus
+        """
+        self._operations.append((
+            "update_status",
+            {"project_number": project_number, "issue_number": issue_number, "status": new_status},
+        ))
+
+    def _resolve(self, operation: str, params: dict[str, Any]) -> dict[str, tuple[str, Any]]:
+        """操作の変数（GraphQLの型と値）を解決（ノードIDの取得はキャッシュを優先）"""
+        if operation == "add_comment":
+            return {
+                "subjectId": ("ID!", get_issue_node_id(self.owner, self.repo, params["issue_number"])),
+                "body": ("String!", params["body"]),
+            }
+        if operation == "add_reaction":
+            return {
+                "subjectId": ("ID!", params["comment_id"]),
+                "content": ("ReactionContent!", params["content"]),
+            }
+
+        metadata = get_project_metadata(self.owner, self.repo, params["project_number"])
+        item_id = get_issue_item_id(
+            self.owner, self.repo, params["project_number"], params["issue_number"]
+        )
+        if not item_id:
+            raise RuntimeError(f"Issue #{params['issue_number']} がプロジェクトで見つかりません")
+        option_id = metadata["options"].get(params["status"])
+        if not option_id:
+            raise RuntimeError(
+                f"Status '{params['status']}' が見つかりません。"
+                f"利用可能: {', '.join(metadata['options'])}"
+            )
+        return {
+            "projectId": ("ID!", metadata["project_id"]),
+            "itemId": ("ID!", item_id),
+            "fieldId": ("ID!", metadata["status_field_id"]),
+            "optionId": ("String!", option_id),
+        }
+
+    @_operation("write_batch")
+    def execute(self) -> list[WriteResult]:
+        """追加した書き込みを1回のリクエストで送信
+
+        送信後、バッチは空になります。Statusの更新がノードIDの解決に失敗した場合は
+        （キャッシュが古い可能性があるため）IDを取得し直して個別にやり直します。
+
+        Returns:
+            追加した順の操作ごとの結果
+
+        Raises:
+            GitHubAPIError: リクエスト自体が失敗した場合（レート制限・通信エラーなど）
+        """
+        operations, self._operations = self._operations, []
+        results = [
+            WriteResult(operation, False, None, "送信されませんでした") for operation, _ in operations
+        ]
+        declarations: list[str] = []
+        fields: list[str] = []
+        variables: dict[str, Any] = {}
+        aliases: dict[str, int] = {}
+
+        with _write_priority():
+            for index, (operation, params) in enumerate(operations):
+                try:
+                    arguments = self._resolve(operation, params)
+                except RuntimeError as e:
+                    results[index] = WriteResult(operation, False, None, str(e))
+                    continue
+
+                alias = f"op{index}"
+                field, input_template, selection = _WRITE_MUTATIONS[operation]
+                for name, (graphql_type, value) in arguments.items():
+                    declarations.append(f"${alias}_{name}:{graphql_type}")
+                    variables[f"{alias}_{name}"] = value
+                input_text = input_template.format(**{name: f"${alias}_{name}" for name in arguments})
+                fields.append(f"  {alias}: {field}(input: {{{input_text}}}) {selection}")
+                aliases[alias] = index
+
+            if aliases:
+                mutation = f"mutation({', '.join(declarations)}) {{\n" + "\n".join(fields) + "\n}"
+                # コメントの投稿は二重に投稿されうるため、含まれる場合は再試行を限定する
+                idempotent = all(operations[index][0] != "add_comment" for index in aliases.values())
+                response = _call_github_graphql(mutation, variables, idempotent=idempotent, partial=True)
+
+                errors: dict[str, list[str]] = {}
+                batch_errors: list[str] = []
+                for error in response["errors"]:
+                    path = error.get("path") or []
+                    message = error.get("message", str(error))
+                    if path and path[0] in aliases:
+                        errors.setdefault(path[0], []).append(message)
+                    else:
+                        batch_errors.append(message)
+
+                for alias, index in aliases.items():
+                    data = response["data"].get(alias)
+                    # どの操作のものでもないエラーは、結果が返されなかった操作の失敗の理由としてだけ扱う
+                    messages = errors.get(alias) or ([] if data else batch_errors)
+                    error = ", ".join(messages) or (None if data else "結果が返されませんでした")
+                    results[index] = WriteResult(operations[index][0], data is not None and not error, data, error)
+
+            # 古いキャッシュのIDで失敗したStatusの更新は、IDを取得し直して個別にやり直す
+            for index, (operation, params) in enumerate(operations):
+                result = results[index]
+                if operation != "update_status" or result.ok or not _is_unknown_id_error(RuntimeError(result.error)):
+                    continue
+                invalidate_project_metadata(self.owner, self.repo, params["project_number"])
+                forget_issue_item_id(self.owner, self.repo, params["project_number"], params["issue_number"])
+                try:
+                    _update_ticket_status(
+                        self.owner, self.repo, params["project_number"], params["issue_number"], params["status"]
+                    )
+                    results[index] = WriteResult(operation, True, None, None)
+                except RuntimeError as e:
+                    results[index] = WriteResult(operation, False, None, str(e))
+
+        return results
@@ -0,0 +1,117 @@
+"""github.py の非同期版API
+
+各関数は github.py の同名関数をスレッド上で実行するコルーチンです。
+HTTP接続のプールやキャッシュは同期版と共有し、同時に実行するAPI呼び出しの数は
+セマフォで制限します。asyncio.gather で複数の読み込みを並行して発行できます。
+
+使用例:
+    details, comments = await asyncio.gather(
+        github_async.get_issue_details(owner, repo, 1),
+        github_async.get_pr_comments(owner, repo, 2),
+    )
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+import github
+
+T = TypeVar("T")
+
+# 同時に実行するAPI呼び出し数の既定値（EXECUTOR_GITHUB_CONCURRENCY で変更可能）
+DEFAULT_CONCURRENCY = 8
+
+_concurrency_limit = int(os.environ.get("EXECUTOR_GITHUB_CONCURRENCY") or DEFAULT_CONCURRENCY)
+_semaphores: dict[asyncio.AbstractEventLoop, asyncio.Semaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+def set_concurrency_limit(limit: int) -> None:
+    """同時に実行するAPI呼び出し数の上限を設定
+
+    Args:
+        limit: 上限（1以上）
+    """
+    global _concurrency_limit
+    if limit < 1:
+        raise ValueError("limit には1以上を指定してください")
+    _concurrency_limit = limit
+    with _semaphores_lock:
+        _semaphores.clear()
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    """実行中のイベントループ用のセマフォを取得"""
+    loop = asyncio.get_running_loop()
+    with _semaphores_lock:
+        semaphore = _semaphores.get(loop)
+        if semaphore is None:
+            # asyncio.run() ごとに作られて閉じられたイベントループのセマフォを捨てる
+            # （待機したことのあるセマフォはループを参照するため、WeakKeyDictionary では解放されない）
+            for closed in [other for other in _semaphores if other.is_closed()]:
+                del _semaphores[closed]
+            semaphore = asyncio.Semaphore(_concurrency_limit)
+            _semaphores[loop] = semaphore
+        return semaphore
+
+
+def _to_async(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """同期関数を、同時実行数を制限したコルーチン関数に変換"""
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        async with _get_semaphore():
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    return wrapper
+
+
+get_git_remote_info = _to_async(github.get_git_remote_info)
+query_github_project = _to_async(github.query_github_project)
+fetch_tickets = _to_async(github.fetch_tickets)
+get_project_info = _to_async(github.get_project_info)
+get_project_metadata = _to_async(github.get_project_metadata)
+get_issue_item_id = _to_async(github.get_issue_item_id)
+fetch_ticket_context = _to_async(github.fetch_ticket_context)
+get_issue_details = _to_async(github.get_issue_details)
+get_issue_details_bulk = _to_async(github.get_issue_details_bulk)
+update_ticket_status = _to_async(github.update_ticket_status)
+get_pr_by_branch_name = _to_async(github.get_pr_by_branch_name)
+get_pr_comments = _to_async(github.get_pr_comments)
+get_open_pr_activity = _to_async(github.get_open_pr_activity)
+post_issue_comment = _to_async(github.post_issue_comment)
+add_reaction_to_comment = _to_async(github.add_reaction_to_comment)
+
+
+async def fetch_tickets_iter(
+    owner: str,
+    repo: str,
+    project_number: int,
+    status: Optional[str] = None,
+    updated_since: Optional[str] = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """github.fetch_tickets_iter の非同期版
+
+    ページの取得はスレッド上で行い、届いたチケットから順にyieldします。
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        project_number: プロジェクト番号
+        status: フィルタリング対象のStatus（Noneの場合はすべて取得）
+        updated_since: この日時（ISO 8601）以降に更新されたチケットのみ取得する
+
+    Yields:
+        チケット情報
+    """
+    tickets = github.fetch_tickets_iter(owner, repo, project_number, status, updated_since)
+    done = object()
+    while True:
+        async with _get_semaphore():
+            ticket = await asyncio.to_thread(next, tickets, done)
+        if ticket is done:
+            return
+        yield ticket
@@ -0,0 +1,373 @@
+"""GitHub APIへの永続接続クライアント
+
+gh コマンドをAPI呼び出しごとに起動する代わりに、keep-alive接続をプールして
+HTTPで直接GitHub APIを呼び出します。
+
+環境変数:
+    GITHUB_API_URL: APIのベースURL（デフォルト: https://api.github.com）。
+        ローカルのスタンドインサーバーに向ける場合は http://127.0.0.1:8080 のように指定する
+    GH_TOKEN / GITHUB_TOKEN: 認証トークン。未設定の場合は `gh auth token` から取得する
+    EXECUTOR_GITHUB_TRANSPORT: "gh" を指定すると従来通り gh コマンド経由で呼び出す
+"""
+
+import http.client
+import json
+import os
+import select
+import subprocess
+import threading
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_API_URL = "https://api.github.com"
+
+# ghコマンドへフォールバックするための環境変数
+TRANSPORT_ENV = "EXECUTOR_GITHUB_TRANSPORT"
+
+
+# 一時的な障害として再試行の対象にするHTTPステータス
+TRANSIENT_STATUSES = {429, 500, 502, 503, 504}
+
+
+class GitHubAPIError(RuntimeError):
+    """GitHub API呼び出しのエラー
+
+    Attributes:
+        status: HTTPステータス（通信エラーの場合はNone）
+        transient: 一時的な障害で、再試行すれば成功する可能性がある場合はTrue
+        sent: リクエストがサーバーに届いた可能性がある場合はTrue
+        rate_limited: レート制限（セカンダリレート制限を含む）で拒否された場合はTrue
+        retry_after: サーバーが指定した再試行までの待ち時間（秒）
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        transient: bool = False,
+        sent: bool = True,
+        rate_limited: bool = False,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.status = status
+        self.transient = transient or rate_limited
+        self.sent = sent
+        self.rate_limited = rate_limited
+        self.retry_after = retry_after
+
+    @property
+    def safe_to_retry_write(self) -> bool:
+        """書き込みを再試行しても二重に適用されないかどうか
+
+        リクエストがサーバーに届いていないか、レート制限で処理前に拒否された場合のみTrue
+        """
+        return self.transient and (not self.sent or self.rate_limited)
+
+
+def is_rate_limit_message(message: str) -> bool:
+    """エラーメッセージがレート制限（不正利用検知を含む）を示すかどうかを判定
+
+    Args:
+        message: エラーメッセージ
+
+    Returns:
+        レート制限を示す場合はTrue
+    """
+    lowered = message.lower()
+    return "rate limit" in lowered or "abuse" in lowered
+
+
+# HTTP 200 の errors で返される、GitHub側の一時的な障害を示すメッセージ（小文字）
+TRANSIENT_GRAPHQL_MESSAGES = (
+    "something went wrong while executing your query",
+    "couldn't respond to your request in time",
+    "timeout",
+    "timed out",
+)
+
+# 一時的な障害を示すGraphQLのエラーの type
+TRANSIENT_GRAPHQL_TYPES = {"INTERNAL", "SERVICE_UNAVAILABLE", "TIMEOUT"}
+
+
+def is_transient_graphql_error(error: dict[str, Any]) -> bool:
+    """GraphQLの errors の要素が、GitHub側の一時的な障害を示すかどうかを判定
+
+    Args:
+        error: errors の要素
+
+    Returns:
+        再試行すれば成功する可能性がある場合はTrue
+    """
+    if error.get("type") in TRANSIENT_GRAPHQL_TYPES:
+        return True
+    message = str(error.get("message", "")).lower()
+    return any(pattern in message for pattern in TRANSIENT_GRAPHQL_MESSAGES)
+
+
+def use_gh_transport() -> bool:
+    """gh コマンド経由で呼び出すかどうかを判定
+
+    Returns:
+        EXECUTOR_GITHUB_TRANSPORT=gh が指定されている場合はTrue
+    """
+    return os.environ.get(TRANSPORT_ENV, "").lower() == "gh"
+
+
+def _resolve_token() -> str:
+    """認証トークンを取得
+
+    Returns:
+        GitHubの認証トークン
+
+    Raises:
+        RuntimeError: トークンを取得できない場合
+    """
+    for name in ("GH_TOKEN", "GITHUB_TOKEN"):
+        token = os.environ.get(name)
+        if token:
+            return token
+
+    try:
+        result = subprocess.run(
+            ["gh", "auth", "token"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except FileNotFoundError:
+        raise RuntimeError(
+            "GitHubトークンが見つかりません。GH_TOKEN を設定するか gh auth login を実行してください"
+        )
+
+    token = result.stdout.strip()
+    if result.returncode != 0 or not token:
+        raise RuntimeError(
+            "GitHubトークンが見つかりません。GH_TOKEN を設定するか gh auth login を実行してください"
+        )
+    return token
+
+
+class GitHubClient:
+    """keep-alive接続をプールするGitHub APIクライアント
+
+    トークンは初回リクエスト時に一度だけ解決し、以降は使い回します。
+    複数スレッドから同時に呼び出しても安全です。
+    """
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        token: Optional[str] = None,
+        timeout: float = 60.0,
+        max_idle_connections: int = 8,
+    ):
+        """初期化
+
+        Args:
+            api_url: APIのベースURL（Noneの場合は環境変数またはデフォルト値）
+            token: 認証トークン（Noneの場合は初回リクエスト時に解決）
+            timeout: ソケットのタイムアウト（秒）
+            max_idle_connections: プールに保持するアイドル接続の最大数
+        """
+        url = urlsplit(api_url or os.environ.get("GITHUB_API_URL") or DEFAULT_API_URL)
+        self.scheme = url.scheme or "https"
+        self.host = url.hostname or "api.github.com"
+        self.port = url.port
+        self.base_path = url.path.rstrip("/")
+        self.timeout = timeout
+        self.max_idle_connections = max_idle_connections
+
+        self._token = token
+        self._lock = threading.Lock()
+        self._idle: list[http.client.HTTPConnection] = []
+
+    def _get_token(self) -> str:
+        """トークンを取得（初回のみ解決）"""
+        with self._lock:
+            if self._token is None:
+                self._token = _resolve_token()
+            return self._token
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        """プールから接続を取得（なければ新規作成）
+
+        Returns:
+            (接続, プールから取得した接続かどうか) のタプル
+        """
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn = self._idle.pop()
+            # サーバー側で閉じられた接続は、送信する前に捨てる
+            if not _is_dropped(conn):
+                return conn, True
+            conn.close()
+
+        if self.scheme == "http":
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout), False
+        return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout), False
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        """接続をプールへ返却"""
+        with self._lock:
+            if len(self._idle) < self.max_idle_connections:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(
+        self, method: str, path: str, payload: Optional[dict[str, Any]] = None
+    ) -> Any:
+        """APIを呼び出す
+
+        Args:
+            method: HTTPメソッド
+            path: APIのパス（例: "/graphql"）
+            payload: JSONとして送信するリクエストボディ
+
+        Returns:
+            デコード済みレスポンスボディ
+
+        Raises:
+            GitHubAPIError: 通信に失敗した場合またはエラーステータスが返された場合
+        """
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {
+            "Authorization": f"bearer {self._get_token()}",
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "claude-code-executor",
+            "Connection": "keep-alive",
+        }
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+
+        # プール内の接続がサーバー側で閉じられていた場合だけ、新しい接続で一度だけ送り直す。
+        # 待機中の接続が閉じられると、送信できても応答が1バイトも返らずに切断される
+        # （RemoteDisconnected / BadStatusLine）ため、urllib3 と同じくこれも処理されていないとみなす。
+        # それ以外の送信後の失敗はサーバーで処理された可能性があるため、再試行するかは retry.py に任せる
+        for attempt in range(2):
+            conn, pooled = self._acquire()
+            sent = False
+            try:
+                conn.request(method, self.base_path + path, body=body, headers=headers)
+                sent = True
+                response = conn.getresponse()
+                raw = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                stale = isinstance(e, http.client.BadStatusLine) or (
+                    not sent and isinstance(e, ConnectionError)
+                )
+                if stale and pooled and attempt == 0:
+                    continue
+                raise GitHubAPIError(f"GitHub API error: {e}", transient=True, sent=sent)
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            break
+
+        try:
+            data = json.loads(raw) if raw else {}
+        except ValueError:
+            data = raw.decode("utf-8", errors="replace")
+
+        if response.status >= 400:
+            message = _error_message(data)
+            rate_limited = response.status == 429 or (
+                response.status == 403 and is_rate_limit_message(message)
+            )
+            retry_after = response.getheader("Retry-After")
+            raise GitHubAPIError(
+                f"GitHub API error: HTTP {response.status} {message}",
+                status=response.status,
+                transient=response.status in TRANSIENT_STATUSES,
+                rate_limited=rate_limited,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
+
+        return data
+
+    def graphql(
+        self, query: str, variables: Optional[dict[str, Any]] = None
+    ) -> dict[str, Any]:
+        """GraphQL APIを呼び出す
+
+        Args:
+            query: GraphQL クエリまたはミューテーション
+            variables: クエリのパラメータ（オプション）
+
+        Returns:
+            APIレスポンス全体（data と errors を含む）
+
+        Raises:
+            GitHubAPIError: HTTPレベルでエラーが返された場合
+        """
+        payload: dict[str, Any] = {"query": query}
+        if variables:
+            payload["variables"] = variables
+
+        return self.request("POST", "/graphql", payload)
+
+    def close(self) -> None:
+        """プール内の接続をすべて閉じる"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+def _is_dropped(conn: http.client.HTTPConnection) -> bool:
+    """待機中の接続がサーバー側で閉じられているかどうか
+
+    待機中の接続が読み込み可能な場合は、EOF（切断）か想定外のデータのどちらかなので再利用しない。
+    """
+    if conn.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+def _error_message(data: Any) -> str:
+    """エラーレスポンスからメッセージを取り出す"""
+    if isinstance(data, dict):
+        if data.get("errors"):
+            return ", ".join(str(e.get("message", e)) for e in data["errors"])
+        return str(data.get("message", ""))
+    return str(data)
+
+
+_client: Optional[GitHubClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> GitHubClient:
+    """プロセス共有のクライアントを取得
+
+    Returns:
+        GitHubClient インスタンス
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = GitHubClient()
+        return _client
+
+
+def set_client(client: Optional[GitHubClient]) -> None:
+    """プロセス共有のクライアントを差し替える
+
+    Args:
+        client: 新しいクライアント（Noneの場合は次回get_clientで再生成）
+    """
+    global _client
+    with _client_lock:
+        old, _client = _client, client
+    if old is not None and old is not client:
+        old.close()
@@ -0,0 +1,600 @@
+"""ログファイルの圧縮・保持期間の管理と読み込み
+
+ログの形式はテキスト（.log）と構造化形式（JSONL、.jsonl）から選べ、gzip（ストリーム形式で、
+追記や途中までの読み込みが可能）で圧縮して保存することもできます（既定はテキスト形式・圧縮なし）。
+読み込み側は open_log() を使うことで、形式や圧縮の有無を意識せずに扱えます。
+
+構造化ログ（JSONL）にはサイドカーのインデックス（<ログファイル名>.idx）が付き、
+時間バケットごとのバイトオフセットとレベル別の件数を記録します。iter_records() は
+インデックスを使って、対象の時間帯・レベルを含むバケットだけを読み込みます。
+
+環境変数:
+    EXECUTOR_LOG_FORMAT: "text" または "jsonl"（execute.py の --log-format と同じ、既定: text）
+    EXECUTOR_LOG_COMPRESS: "1" を指定するとgzipで圧縮して保存する（execute.py の --compress-logs と同じ）
+"""
+
+import gzip
+import io
+import json
+import os
+import shutil
+import re
+import time
+import zlib
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional
+
+# ログファイルの保存先（EXECUTOR_LOG_DIR で変更可能）
+DEFAULT_LOG_DIR = Path(__file__).parent / "logs"
+
+# ログファイルの拡張子（テキスト形式と構造化形式）
+LOG_SUFFIXES = (".log", ".jsonl")
+
+# ログの形式
+TEXT_FORMAT = "text"
+JSONL_FORMAT = "jsonl"
+LOG_FORMATS = (TEXT_FORMAT, JSONL_FORMAT)
+
+# 圧縮済みログの拡張子
+COMPRESSED_SUFFIX = ".gz"
+
+# サイドカーインデックスの拡張子
+INDEX_SUFFIX = ".idx"
+
+# 実行トレース（tracing.Tracer の出力）の拡張子
+TRACE_SUFFIX = ".trace.json"
+
+# インデックスの時間バケットの既定の幅（秒）
+DEFAULT_INDEX_BUCKET_SECONDS = 60
+
+# テキスト形式のログ行（[タイムスタンプ] [レベル] メッセージ）
+_TEXT_LINE_PATTERN = re.compile(r"^\[([^\]]+)\] (?:\[([A-Z]+)\] )?(.*)$")
+
+# 保持期間（日数）とログディレクトリの合計サイズの上限（MB）の既定値
+DEFAULT_MAX_AGE_DAYS = float(os.environ.get("EXECUTOR_LOG_MAX_AGE_DAYS") or 30)
+DEFAULT_MAX_TOTAL_MB = float(os.environ.get("EXECUTOR_LOG_MAX_TOTAL_MB") or 1024)
+
+# 書き込み中のログを圧縮しないよう、この秒数以上更新されていないログだけを圧縮する
+STALE_LOG_SECONDS = 60 * 60
+
+
+_log_format = os.environ.get("EXECUTOR_LOG_FORMAT") or TEXT_FORMAT
+_compress_logs = os.environ.get("EXECUTOR_LOG_COMPRESS") == "1"
+
+
+def set_log_format(log_format: str) -> None:
+    """実行ログの形式を設定
+
+    Args:
+        log_format: "text" または "jsonl"
+    """
+    global _log_format
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"ログの形式は {', '.join(LOG_FORMATS)} のいずれかです: {log_format}")
+    _log_format = log_format
+
+
+def get_log_format() -> str:
+    """実行ログの形式を取得"""
+    return _log_format
+
+
+def set_compression(enabled: bool) -> None:
+    """実行ログをgzipで圧縮して保存するかどうかを設定
+
+    Args:
+        enabled: Trueの場合は圧縮する
+    """
+    global _compress_logs
+    _compress_logs = enabled
+
+
+def is_compression_enabled() -> bool:
+    """実行ログをgzipで圧縮して保存するかどうか"""
+    return _compress_logs
+
+
+def get_log_dir() -> Path:
+    """ログディレクトリを取得
+
+    Returns:
+        ログディレクトリのパス
+    """
+    return Path(os.environ.get("EXECUTOR_LOG_DIR") or DEFAULT_LOG_DIR)
+
+
+def is_compressed(path: Path) -> bool:
+    """圧縮済みのログかどうかを判定
+
+    Args:
+        path: ログファイルのパス
+
+    Returns:
+        gzip圧縮されている場合はTrue
+    """
+    return path.name.endswith(COMPRESSED_SUFFIX)
+
+
+def is_structured(path: Path) -> bool:
+    """構造化形式（JSONL）のログかどうかを判定
+
+    Args:
+        path: ログファイルのパス
+
+    Returns:
+        構造化形式の場合はTrue（圧縮済みを含む）
+    """
+    name = path.name
+    if name.endswith(COMPRESSED_SUFFIX):
+        name = name[: -len(COMPRESSED_SUFFIX)]
+    return name.endswith(".jsonl")
+
+
+class _GzipStreamReader(io.RawIOBase):
+    """書き込み途中のgzipファイルも読めるストリーミング展開リーダー
+
+    gzip.open() は終端のないメンバーで EOFError を送出するため、実行中のログを
+    読めません。このリーダーはフラッシュ済みの部分までを返して終了します。
+    複数メンバーが連結されたファイル（追記されたログ）にも対応します。
+    """
+
+    def __init__(self, path: Path, start: int = 0, end: Optional[int] = None):
+        self._file = open(path, "rb")
+        self._file.seek(start)
+        self._remaining = None if end is None else end - start
+        self._decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            if self._decompressor.eof:
+                # 次のgzipメンバーを展開する（読み込み済みのデータに複数のメンバーが続くこともある）
+                chunk = self._decompressor.unused_data or self._read_raw()
+                self._decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+            else:
+                chunk = self._decompressor.unconsumed_tail or self._read_raw()
+            if not chunk:
+                return 0
+            self._pending = self._decompressor.decompress(chunk, 1024 * 1024)
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+    def _read_raw(self) -> bytes:
+        """圧縮データを読み込む（end までに制限）"""
+        size = 1024 * 1024
+        if self._remaining is not None:
+            size = min(size, self._remaining)
+            if size <= 0:
+                return b""
+        chunk = self._file.read(size)
+        if self._remaining is not None:
+            self._remaining -= len(chunk)
+        return chunk
+
+    def close(self) -> None:
+        self._file.close()
+        super().close()
+
+
+def open_log(path: Path, mode: str = "rt") -> IO:
+    """ログファイルを開く（圧縮済みの場合は透過的に展開）
+
+    圧縮済みのログを読む場合は、書き込み途中のファイルでもフラッシュ済みの部分まで読めます。
+
+    Args:
+        path: ログファイルのパス
+        mode: オープンモード（"rt"、"rb"、"at" など）
+
+    Returns:
+        ファイルオブジェクト
+    """
+    path = Path(path)
+    if is_compressed(path):
+        if mode in ("r", "rt", "rb"):
+            reader = io.BufferedReader(_GzipStreamReader(path))
+            if mode == "rb":
+                return reader
+            return io.TextIOWrapper(reader, encoding="utf-8", errors="replace")
+        if "t" in mode:
+            return gzip.open(path, mode, encoding="utf-8", errors="replace")
+        return gzip.open(path, mode)
+    if "b" in mode:
+        return open(path, mode)
+    return open(path, mode, encoding="utf-8", errors="replace")
+
+
+def is_log_file(path: Path) -> bool:
+    """ログファイル（圧縮済みを含む）かどうかを判定
+
+    Args:
+        path: ファイルのパス
+
+    Returns:
+        ログファイルの場合はTrue
+    """
+    name = path.name
+    if name.endswith(COMPRESSED_SUFFIX):
+        name = name[: -len(COMPRESSED_SUFFIX)]
+    return name.endswith(LOG_SUFFIXES)
+
+
+def index_path(log_path: Path) -> Path:
+    """ログファイルのサイドカーインデックスのパスを取得
+
+    Args:
+        log_path: ログファイルのパス
+
+    Returns:
+        インデックスファイルのパス
+    """
+    log_path = Path(log_path)
+    return log_path.with_name(log_path.name + INDEX_SUFFIX)
+
+
+def trace_path(log_path: Path) -> Path:
+    """ログファイルと同じ実行のトレースファイルのパスを取得
+
+    Args:
+        log_path: ログファイルのパス（例: issue_12_20240501_120000_abcd1234.jsonl.gz）
+
+    Returns:
+        トレースファイルのパス（例: issue_12_20240501_120000_abcd1234.trace.json）
+    """
+    log_path = Path(log_path)
+    name = log_path.name
+    if name.endswith(COMPRESSED_SUFFIX):
+        name = name[: -len(COMPRESSED_SUFFIX)]
+    for suffix in LOG_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+            break
+    return log_path.with_name(name + TRACE_SUFFIX)
+
+
+def remove_log(path: Path) -> None:
+    """ログファイルとそのインデックス・トレースを削除
+
+    Args:
+        path: ログファイルのパス
+    """
+    path.unlink(missing_ok=True)
+    index_path(path).unlink(missing_ok=True)
+    trace_path(path).unlink(missing_ok=True)
+
+
+def log_size(path: Path) -> int:
+    """ログファイルとそのインデックス・トレースの合計サイズを取得
+
+    Args:
+        path: ログファイルのパス
+
+    Returns:
+        合計サイズ（バイト、存在しないファイルは0として数える）
+    """
+    total = 0
+    for file in (path, index_path(path), trace_path(path)):
+        try:
+            total += file.stat().st_size
+        except OSError:
+            continue
+    return total
+
+
+def iter_log_files(log_dir: Path) -> list[Path]:
+    """ログディレクトリ内のログファイルを古い順に列挙
+
+    Args:
+        log_dir: ログディレクトリ
+
+    Returns:
+        ログファイルのパスのリスト（更新日時の古い順）
+    """
+    if not log_dir.is_dir():
+        return []
+    files = [path for path in log_dir.iterdir() if path.is_file() and is_log_file(path)]
+    return sorted(files, key=lambda path: path.stat().st_mtime)
+
+
+def compress_log(path: Path) -> Path:
+    """ログファイルをストリーミングでgzip圧縮し、元のファイルを削除
+
+    Args:
+        path: 圧縮するログファイルのパス
+
+    Returns:
+        圧縮後のファイルのパス
+    """
+    path = Path(path)
+    if is_compressed(path):
+        return path
+
+    compressed = path.with_name(path.name + COMPRESSED_SUFFIX)
+    tmp_path = compressed.with_name(compressed.name + ".tmp")
+    with open(path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+    # 更新日時を引き継いで、保持期間の判定がずれないようにする
+    stat = path.stat()
+    os.utime(tmp_path, (stat.st_atime, stat.st_mtime))
+    os.replace(tmp_path, compressed)
+    # インデックスのオフセットは圧縮前のファイルを指しているので使えなくなる。
+    # トレースは圧縮後のログと同じ実行のものなので残す
+    path.unlink(missing_ok=True)
+    index_path(path).unlink(missing_ok=True)
+    return compressed
+
+
+def apply_retention(
+    log_dir: Path,
+    max_age_days: Optional[float] = DEFAULT_MAX_AGE_DAYS,
+    max_total_mb: Optional[float] = DEFAULT_MAX_TOTAL_MB,
+    keep: Optional[set[Path]] = None,
+) -> list[Path]:
+    """保持期間と合計サイズの上限を超えた古いログを削除
+
+    Args:
+        log_dir: ログディレクトリ
+        max_age_days: 保持期間（日数、Noneの場合は制限なし）
+        max_total_mb: ログの合計サイズの上限（MB、インデックスとトレースを含む。Noneの場合は制限なし）
+        keep: 削除しないファイル（書き込み中のログなど）
+
+    Returns:
+        削除したファイルのパスのリスト
+    """
+    keep = {Path(path).absolute() for path in keep or set()}
+    files = [path for path in iter_log_files(log_dir) if path.absolute() not in keep]
+    removed = []
+
+    if max_age_days is not None:
+        cutoff = time.time() - max_age_days * 24 * 60 * 60
+        for path in list(files):
+            if path.stat().st_mtime < cutoff:
+                remove_log(path)
+                files.remove(path)
+                removed.append(path)
+
+    if max_total_mb is not None:
+        limit = max_total_mb * 1024 * 1024
+        total = sum(log_size(path) for path in iter_log_files(log_dir))
+        # 古いものから削除する
+        for path in files:
+            if total <= limit:
+                break
+            total -= log_size(path)
+            remove_log(path)
+            removed.append(path)
+
+    return removed
+
+
+def maintain_logs(
+    log_dir: Path, keep: Optional[set[Path]] = None, compress: Optional[bool] = None
+) -> None:
+    """未圧縮の古いログを圧縮し、保持期間を超えたログを削除
+
+    Args:
+        log_dir: ログディレクトリ
+        keep: 対象外とするファイル（書き込み中のログなど）
+        compress: Falseの場合は圧縮せず、保持期間の管理だけを行う（Noneの場合は設定値）
+    """
+    keep = {Path(path).absolute() for path in keep or set()}
+    if compress is None:
+        compress = _compress_logs
+    cutoff = time.time() - STALE_LOG_SECONDS
+    for path in iter_log_files(log_dir) if compress else []:
+        if is_compressed(path) or path.absolute() in keep or path.stat().st_mtime > cutoff:
+            continue
+        try:
+            compress_log(path)
+        except OSError:
+            # 他のプロセスが処理中の場合などは次回に回す
+            continue
+
+    apply_retention(log_dir, keep=keep)
+
+
+class LogIndexWriter:
+    """サイドカーインデックスの書き込み
+
+    1行目にヘッダー、以降は時間バケットごとに開始時と終了時の2行のJSONを追記します。
+
+        {"version": 1, "bucket_seconds": 60, "compressed": true, "issue": 12}
+        {"t": 720, "offset": 18432}
+        {"t": 720, "counts": {"INFO": 40, "ERROR": 3}}
+
+    t はバケットの開始時刻（ログ開始からの秒数）、offset はバケット最初のレコードの
+    バイトオフセットです。圧縮済みログではバケットごとにgzipメンバーを分けるため、
+    offset から独立して展開できます。counts はバケットが終わったとき（次のバケットの
+    開始時またはclose時）に書き込まれ、書き込み途中のバケットは counts なしで扱われます。
+    """
+
+    def __init__(
+        self,
+        log_path: Path,
+        bucket_seconds: float = DEFAULT_INDEX_BUCKET_SECONDS,
+        compressed: bool = False,
+        issue_number: Optional[int] = None,
+    ):
+        """初期化
+
+        Args:
+            log_path: ログファイルのパス
+            bucket_seconds: 時間バケットの幅（秒）
+            compressed: ログがgzip圧縮されている場合はTrue
+            issue_number: ログの対象のIssue番号
+        """
+        self.bucket_seconds = bucket_seconds
+        self.current_bucket: Optional[int] = None
+        self._counts: dict[str, int] = {}
+        self._file = open(index_path(log_path), "a", encoding="utf-8")
+        if self._file.tell() == 0:
+            self._write_line({
+                "version": 1,
+                "bucket_seconds": bucket_seconds,
+                "compressed": compressed,
+                "issue": issue_number,
+            })
+
+    def _write_line(self, entry: dict[str, Any]) -> None:
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self._file.flush()
+
+    def bucket_of(self, elapsed: float) -> int:
+        """ログ開始からの経過秒数が属するバケットを取得"""
+        return int(elapsed // self.bucket_seconds)
+
+    def begin(self, bucket: int, offset: int) -> None:
+        """新しいバケットを開始（前のバケットを書き込む）
+
+        Args:
+            bucket: バケット番号
+            offset: バケット最初のレコードのバイトオフセット
+        """
+        self._write_counts()
+        self.current_bucket = bucket
+        self._counts = {}
+        self._write_line({"t": bucket * self.bucket_seconds, "offset": offset})
+
+    def count(self, level: str) -> None:
+        """現在のバケットのレコード数を数える"""
+        self._counts[level] = self._counts.get(level, 0) + 1
+
+    def _write_counts(self) -> None:
+        if self.current_bucket is not None:
+            self._write_line({"t": self.current_bucket * self.bucket_seconds, "counts": self._counts})
+
+    def close(self) -> None:
+        """現在のバケットを書き込んで閉じる"""
+        self._write_counts()
+        self.current_bucket = None
+        self._file.close()
+
+
+def read_index(log_path: Path) -> Optional[dict[str, Any]]:
+    """サイドカーインデックスを読み込む
+
+    Args:
+        log_path: ログファイルのパス
+
+    Returns:
+        ヘッダーの内容に "buckets"（t, offset, end, counts のリスト）を加えた辞書。
+        書き込み途中のバケットの counts はNone。インデックスがない場合や読めない場合はNone
+    """
+    try:
+        with open(index_path(log_path), encoding="utf-8") as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError):
+        return None
+    if not lines or lines[0].get("version") != 1:
+        return None
+
+    header, buckets = lines[0], []
+    for entry in lines[1:]:
+        if "offset" in entry:
+            buckets.append({"t": entry["t"], "offset": entry["offset"], "counts": None})
+        elif buckets and buckets[-1]["t"] == entry["t"]:
+            buckets[-1]["counts"] = entry["counts"]
+
+    for bucket, following in zip(buckets, buckets[1:] + [None]):
+        # 最後のバケットは（インデックス化されていない追記分を含め）ファイル末尾まで
+        bucket["end"] = following["offset"] if following else None
+    header["buckets"] = buckets
+    return header
+
+
+def parse_record(line: str) -> Optional[dict[str, Any]]:
+    """ログ行をレコードに変換
+
+    構造化形式（JSONL）はそのまま、テキスト形式は ts, level, message に分解します。
+
+    Args:
+        line: ログの1行
+
+    Returns:
+        レコードの辞書（解析できない行の場合はNone）
+    """
+    line = line.rstrip("\n")
+    if line.startswith("{"):
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+    match = _TEXT_LINE_PATTERN.match(line)
+    if not match:
+        return None
+    ts, level, message = match.groups()
+    return {"ts": ts, "level": level, "message": message}
+
+
+def _open_range(log_path: Path, compressed: bool, start: int, end: Optional[int]) -> IO:
+    """ログファイルのバイト範囲をテキストとして開く"""
+    if compressed:
+        raw: IO = io.BufferedReader(_GzipStreamReader(log_path, start, end))
+    else:
+        raw = open(log_path, "rb")
+        raw.seek(start)
+        if end is not None:
+            with raw:
+                raw = io.BytesIO(raw.read(end - start))
+    return io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+
+
+def iter_records(
+    log_path: Path,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    levels: Optional[set[str]] = None,
+) -> Iterator[dict[str, Any]]:
+    """ログのレコードを読み込む
+
+    インデックスがある場合は、指定した時間帯とレベルを含むバケットだけを読み込みます。
+    例えば実行開始から12〜15分のエラーは iter_records(path, 720, 900, {"ERROR"}) で取得できます。
+
+    Args:
+        log_path: ログファイルのパス
+        start: ログ開始からの秒数でこの時刻以降のレコードのみ（構造化形式のみ有効）
+        end: ログ開始からの秒数でこの時刻より前のレコードのみ（構造化形式のみ有効）
+        levels: 対象のレベル（Noneの場合はすべて）
+
+    Yields:
+        レコードの辞書
+    """
+    log_path = Path(log_path)
+    index = read_index(log_path)
+
+    if index is None or not index["buckets"]:
+        ranges = [(0, None)]
+    else:
+        ranges = []
+        for bucket in index["buckets"]:
+            if start is not None and bucket["t"] + index["bucket_seconds"] <= start:
+                continue
+            if end is not None and bucket["t"] >= end:
+                continue
+            # 件数が確定しているバケットだけ、レベルで読み飛ばす
+            counts = bucket["counts"]
+            if levels is not None and counts is not None and bucket["end"] is not None and not levels & set(counts):
+                continue
+            ranges.append((bucket["offset"], bucket["end"]))
+
+    for range_start, range_end in ranges:
+        with _open_range(log_path, is_compressed(log_path), range_start, range_end) as f:
+            for line in f:
+                record = parse_record(line)
+                if record is None:
+                    continue
+                if levels is not None and record.get("level") not in levels:
+                    continue
+                offset = record.get("offset")
+                if offset is not None:
+                    if start is not None and offset < start:
+                        continue
+                    if end is not None and offset >= end:
+                        continue
+                yield record
@@ -1,22 +1,86 @@
 """シンプルなログ記録モジュール"""
 
+import atexit
+import gzip
 import hashlib
+import json
+import queue
+import sys
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import IO, NamedTuple, Optional
+
+from log_files import COMPRESSED_SUFFIX, DEFAULT_INDEX_BUCKET_SECONDS, LogIndexWriter
+
+# バックグラウンド書き込みスレッドへの終了指示
+_CLOSE = object()
+
+# 書き込みスレッドの状態を確認しながらキューの空きや書き込みの完了を待つ間隔（秒）
+_WRITER_CHECK_INTERVAL = 0.5
+
+
+class _Record(NamedTuple):
+    """書き込み待ちのログ行"""
+
+    text: str
+    level: str
+    elapsed: float
 
 
 class SimpleLogger:
-    """シンプルなファイルロガー"""
+    """シンプルなファイルロガー
 
-    def __init__(self, log_file_path: str, dummy_dir_seed: Optional[str] = None):
+    buffered=True の場合はファイルを開いたままにし、ログ行を上限付きのキューに積んで
+    1つのバックグラウンドスレッドからまとめて書き込みます。書き込みは一定間隔、
+    一定サイズ、close() 時（プロセス終了時を含む）にフラッシュされます。
+    書き込みに失敗した場合（ディスクフルなど）は標準エラー出力に警告し、以降のログ行は
+    破棄します（呼び出し元の出力の読み込みを止めないため）。
+    複数スレッドから同時に呼び出しても安全です。
+
+    compress=True の場合はgzipでストリーミング圧縮しながら書き込みます（ファイル名に
+    .gz を付加）。フラッシュ済みの部分は実行中でも zcat や log_files.open_log() で読めます。
+
+    structured=True の場合は1行1レコードのJSONL形式で書き込みます。
+
+        {"ts": "...", "offset": 12.5, "issue": 12, "level": "ERROR", "stream": "stderr", "message": "..."}
+
+    offset はロガー作成からの経過秒数（単調増加）です。あわせてサイドカーインデックス
+    （log_files.LogIndexWriter）に時間バケットごとのバイトオフセットとレベル別の件数を
+    記録し、log_files.iter_records() で必要な部分だけを読めるようにします。
+    """
+
+    def __init__(
+        self,
+        log_file_path: str,
+        dummy_dir_seed: Optional[str] = None,
+        buffered: bool = False,
+        flush_interval: float = 1.0,
+        flush_size: int = 64 * 1024,
+        max_queue_size: int = 10000,
+        compress: bool = False,
+        structured: bool = False,
+        issue_number: Optional[int] = None,
+        index_bucket_seconds: float = DEFAULT_INDEX_BUCKET_SECONDS,
+    ):
         """初期化
 
         Args:
             log_file_path: ログファイルのパス
             dummy_dir_seed: ダミーディレクトリ名の生成に使用するシード
+            buffered: Trueの場合はバックグラウンドスレッドでまとめて書き込む
+            flush_interval: バッファをフラッシュする間隔（秒）
+            flush_size: この文字数以上溜まったらフラッシュする
+            max_queue_size: キューに積めるログ行の上限（超えると書き込みを待つ）
+            compress: Trueの場合はgzipで圧縮しながら書き込む（buffered も有効になる）
+            structured: Trueの場合はJSONL形式で書き込み、サイドカーインデックスを作成する
+            issue_number: 構造化ログのレコードに記録するIssue番号
+            index_bucket_seconds: インデックスの時間バケットの幅（秒）
         """
         self.log_file = Path(log_file_path)
+        if compress and not self.log_file.name.endswith(COMPRESSED_SUFFIX):
+            self.log_file = self.log_file.with_name(self.log_file.name + COMPRESSED_SUFFIX)
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
 
         # ダミーディレクトリ名を生成
@@ -25,33 +89,327 @@ class SimpleLogger:
 
         self.dummy_dir_hash = hashlib.sha256(dummy_dir_seed.encode()).hexdigest()[:8]
 
-    def log(self, message: str) -> None:
+        self.compress = compress
+        self.structured = structured
+        self.issue_number = issue_number
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._started_at = time.monotonic()
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._close_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # キューに積んでいる途中の log() の数（close() はこれが0になるまでキューを空にし続ける）
+        self._puts_in_flight = 0
+        self._puts_done = threading.Condition(self._write_lock)
+        # close() がキューの残りを書き出している間はTrue（直接追記するログ行はそれを待つ）
+        self._draining = False
+        self._write_error: Optional[Exception] = None
+        self._dropped = 0
+        self._closing = False
+
+        self._raw: Optional[IO[bytes]] = None
+        self._stream: Optional[IO[bytes]] = None
+        self._member_start = 0
+        self._member_dirty = False
+        self._index: Optional[LogIndexWriter] = None
+        if structured:
+            self._index = LogIndexWriter(
+                self.log_file, index_bucket_seconds, compressed=compress, issue_number=issue_number
+            )
+
+        if buffered or compress:
+            # 行ごとにgzipメンバーを作らないよう、圧縮する場合は常にまとめて書き込む
+            self._open_stream()
+            self._queue = queue.Queue(maxsize=max_queue_size)
+            self._writer = threading.Thread(
+                target=self._write_loop, name=f"logger-{self.log_file.name}", daemon=True
+            )
+            self._writer.start()
+            atexit.register(self.close)
+
+    def _open_stream(self) -> None:
+        """ログファイルを追記用に開く"""
+        self._raw = open(self.log_file, "ab")
+        self._stream = self._raw
+        if self.compress:
+            self._start_member()
+
+    def _start_member(self) -> None:
+        """新しいgzipメンバーを開始（ヘッダーはこの時点で書き込まれる）"""
+        self._member_start = self._raw.tell()
+        self._stream = gzip.GzipFile(fileobj=self._raw, mode="ab")
+        self._member_dirty = False
+
+    def _close_stream(self) -> None:
+        """ログファイルを閉じる"""
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.close()
+        self._raw = self._stream = None
+
+    def _start_bucket(self, bucket: int) -> None:
+        """インデックスの新しい時間バケットを開始
+
+        圧縮する場合は、バケットの先頭から独立して展開できるようgzipメンバーを切り替えます。
+        """
+        if self.compress:
+            if self._member_dirty:
+                self._stream.close()
+                self._start_member()
+            offset = self._member_start
+        else:
+            self._stream.flush()
+            offset = self._raw.tell()
+        self._index.begin(bucket, offset)
+
+    def _write_records(self, records: list[_Record]) -> None:
+        """ログ行を書き込んでフラッシュ（インデックスも更新）"""
+        pending: list[str] = []
+
+        def write_pending() -> None:
+            if pending:
+                self._stream.write("".join(pending).encode("utf-8"))
+                self._member_dirty = True
+                pending.clear()
+
+        for record in records:
+            if self._index is not None:
+                # 複数スレッドからのログ行は前後することがあるので、バケットは戻さない
+                bucket = self._index.bucket_of(record.elapsed)
+                if self._index.current_bucket is None or bucket > self._index.current_bucket:
+                    write_pending()
+                    self._start_bucket(bucket)
+                self._index.count(record.level)
+            pending.append(record.text)
+
+        write_pending()
+        self._stream.flush()
+
+    def _write_loop(self) -> None:
+        """キューのログ行をまとめてファイルへ書き込む（バックグラウンドスレッド）"""
+        buffer: list[_Record] = []
+        size = 0
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, _Record):
+                buffer.append(item)
+                size += len(item.text)
+                # 溜まっている行はまとめて取り出す
+                while size < self.flush_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if not isinstance(item, _Record):
+                        break
+                    buffer.append(item)
+                    size += len(item.text)
+
+            now = time.monotonic()
+            if buffer and (size >= self.flush_size or now >= deadline or not isinstance(item, _Record)):
+                self._write_buffer(buffer)
+                buffer.clear()
+                size = 0
+            if now >= deadline:
+                deadline = now + self.flush_interval
+
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _CLOSE:
+                return
+
+    def _write_buffer(self, records: list[_Record]) -> None:
+        """ログ行を書き込む（失敗した場合は以降のログ行を破棄する）"""
+        if self._write_error is not None:
+            self._dropped += len(records)
+            return
+        try:
+            self._write_records(records)
+        except Exception as e:
+            self._write_error = e
+            self._dropped += len(records)
+            print(f"⚠ ログの書き込みに失敗しました（以降のログは破棄します）: {self.log_file}: {e}", file=sys.stderr)
+
+    def _put(self, log_queue: queue.Queue, item: object, until_closed: bool = False) -> bool:
+        """キューに積む（書き込みスレッドが終了している場合は積まずにFalseを返す）
+
+        until_closed が True の場合、close() による終了後はキューを空にする close() を待って積みます。
+        """
+        while True:
+            try:
+                log_queue.put(item, timeout=_WRITER_CHECK_INTERVAL)
+                return True
+            except queue.Full:
+                if until_closed and self._closing:
+                    continue
+                if not self._writer.is_alive():
+                    # close() の終了指示で書き込みスレッドが終了した場合は、書き込みの失敗として扱わない
+                    if self._write_error is None and not self._closing:
+                        self._write_error = RuntimeError("書き込みスレッドが終了しています")
+                        print(f"⚠ ログの書き込みスレッドが終了しています（以降のログは破棄します）: {self.log_file}",
+                              file=sys.stderr)
+                    return False
+
+    def _format(self, message: str, level: Optional[str], stream: Optional[str], elapsed: float) -> str:
+        """ログ行を生成"""
+        timestamp = datetime.now().isoformat()
+        if self.structured:
+            record = {
+                "ts": timestamp,
+                "offset": round(elapsed, 3),
+                "issue": self.issue_number,
+                "level": level or "INFO",
+                "stream": stream,
+                "message": message,
+            }
+            return json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        if level:
+            message = f"[{level}] {message}"
+        return f"[{timestamp}] {message}\n"
+
+    def log(self, message: str, level: Optional[str] = None, stream: Optional[str] = None) -> None:
         """ログメッセージをファイルに追記
 
         Args:
             message: ログメッセージ
+            level: ログレベル（"INFO"、"WARNING"、"ERROR"）
+            stream: 出力元のストリーム（"stdout" または "stderr"、構造化ログのみ記録）
         """
-        timestamp = datetime.now().isoformat()
-        log_line = f"[{timestamp}] {message}\n"
+        elapsed = time.monotonic() - self._started_at
+        record = _Record(self._format(message, level, stream, elapsed), level or "INFO", elapsed)
 
-        with open(self.log_file, "a", encoding="utf-8") as f:
-            f.write(log_line)
+        # キューが一杯の間も他のスレッドや close() を止めないよう、積むのはロックの外で行う。
+        # close() は _queue を None にした後、積んでいる途中のログ行がなくなるまでキューを空にするため、
+        # ここで積んだログ行は必ず書き出され、close() 後のログ行は書き出しの完了を待って直接追記される
+        with self._write_lock:
+            while self._draining:
+                self._puts_done.wait()
+            log_queue = self._queue
+            if log_queue is None:
+                self._open_stream()
+                try:
+                    self._write_records([record])
+                finally:
+                    self._close_stream()
+                return
+            if self._write_error is not None:
+                self._dropped += 1
+                return
+            self._puts_in_flight += 1
 
-    def info(self, message: str) -> None:
+        queued = False
+        try:
+            queued = self._put(log_queue, record, until_closed=True)
+        finally:
+            with self._write_lock:
+                self._puts_in_flight -= 1
+                if not queued:
+                    self._dropped += 1
+                self._puts_done.notify_all()
+
+    def flush(self) -> None:
+        """バッファ済みのログをファイルへ書き出すまで待機"""
+        log_queue = self._queue
+        if log_queue is None:
+            return
+        done = threading.Event()
+        if not self._put(log_queue, done):
+            return
+        # 書き込みスレッドが異常終了していた場合は待たない
+        while not done.wait(_WRITER_CHECK_INTERVAL):
+            if not self._writer.is_alive():
+                return
+
+    def close(self) -> None:
+        """バッファ済みのログを書き出してファイルを閉じる
+
+        close() 後のログは、バッファせずに直接ファイルへ追記されます（インデックスには含まれず、
+        インデックスの最後のバケットの範囲として読み込まれます）。
+        """
+        with self._close_lock:
+            log_queue = self._queue
+            if log_queue is None:
+                with self._write_lock:
+                    if self._index is not None:
+                        self._index.close()
+                        self._index = None
+                return
+            self._closing = True
+            self._put(log_queue, _CLOSE)
+            self._writer.join()
+
+            with self._write_lock:
+                self._queue = None
+                self._draining = True
+                try:
+                    # 終了指示の後に積まれたログ行も、積んでいる途中のものを含めて書き出す
+                    leftovers = []
+                    while True:
+                        while True:
+                            try:
+                                item = log_queue.get_nowait()
+                            except queue.Empty:
+                                break
+                            if isinstance(item, _Record):
+                                leftovers.append(item)
+                            elif isinstance(item, threading.Event):
+                                item.set()
+                        if not self._puts_in_flight:
+                            break
+                        self._puts_done.wait(_WRITER_CHECK_INTERVAL)
+                    if leftovers:
+                        self._write_buffer(leftovers)
+
+                    try:
+                        self._close_stream()
+                    except OSError as e:
+                        self._raw.close()
+                        if self._write_error is None:
+                            self._write_error = e
+                            print(f"⚠ ログファイルを閉じられませんでした: {self.log_file}: {e}", file=sys.stderr)
+                    if self._index is not None:
+                        self._index.close()
+                        self._index = None
+                finally:
+                    self._draining = False
+                    self._puts_done.notify_all()
+            if self._dropped:
+                print(f"⚠ 書き込めなかったログ {self._dropped}行を破棄しました: {self.log_file}", file=sys.stderr)
+            atexit.unregister(self.close)
+
+    def info(self, message: str, stream: Optional[str] = None) -> None:
         """INFOレベルのログメッセージをファイルに追記
 
         Args:
             message: ログメッセージ
+            stream: 出力元のストリーム（"stdout" または "stderr"）
+        """
+        self.log(message, "INFO", stream)
+
+    def warning(self, message: str, stream: Optional[str] = None) -> None:
+        """WARNINGレベルのログメッセージをファイルに追記
+
+        Args:
+            message: ログメッセージ
+            stream: 出力元のストリーム（"stdout" または "stderr"）
         """
-        self.log(f"[INFO] {message}")
+        self.log(message, "WARNING", stream)
 
-    def error(self, message: str) -> None:
+    def error(self, message: str, stream: Optional[str] = None) -> None:
         """ERRORレベルのログメッセージをファイルに追記
 
         Args:
             message: ログメッセージ
+            stream: 出力元のストリーム（"stdout" または "stderr"）
         """
-        self.log(f"[ERROR] {message}")
+        self.log(message, "ERROR", stream)
 
     def get_url(self) -> str:
         """マスクされたログファイルURLを取得
@@ -0,0 +1,319 @@
+"""Prometheus形式のメトリクス
+
+カウンター・ゲージ・ヒストグラムをプロセス内に保持し、ローカルのHTTPサーバーの
+/metrics で Prometheus のテキスト形式（version 0.0.4）として公開します。
+記録はロック付きの辞書の更新だけなので、GitHub API呼び出しやClaude Codeの実行に比べて
+オーバーヘッドは無視できます。
+
+使用例:
+    metrics.start_http_server(9464)
+    # curl http://127.0.0.1:9464/metrics
+"""
+
+import bisect
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Iterable, Optional
+
+# GitHub API呼び出しの所要時間のバケット（秒）
+GITHUB_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Claude Code実行の所要時間のバケット（秒、タイムアウトは30分）
+CLAUDE_BUCKETS = (30.0, 60.0, 120.0, 300.0, 600.0, 900.0, 1200.0, 1800.0, 3600.0)
+
+
+def _escape(value: str) -> str:
+    """ラベル値をエスケープ"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """値をPrometheusの数値表記に変換"""
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    """ラベルを {name="value",...} 形式に変換"""
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """メトリクスの共通部分"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        """ラベルを値のタプルに変換"""
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} のラベルは {self.labelnames} です: {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        """Prometheusのテキスト形式に変換"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """単調増加するカウンター"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """カウンターを増やす
+
+        Args:
+            amount: 増分
+            **labels: ラベル
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Gauge(_Metric):
+    """増減する値"""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], Optional[float]]] = None
+
+    def set(self, value: float, **labels: str) -> None:
+        """値を設定"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """値を増やす"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        """値を減らす"""
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], Optional[float]]) -> None:
+        """収集時に値を計算する関数を設定（ラベルなしのゲージのみ）
+
+        Args:
+            function: 値を返す関数（Noneを返した場合は出力しない）
+        """
+        self._function = function
+
+    def _samples(self) -> list[str]:
+        if self._function is not None:
+            value = self._function()
+            return [] if value is None else [f"{self.name} {_format_value(value)}"]
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+
+class Histogram(_Metric):
+    """値の分布（累積バケット、合計、件数）"""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = GITHUB_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # ラベルごとの [バケットごとの件数（+Infを含む）, 合計]
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """値を記録
+
+        Args:
+            value: 観測値
+            **labels: ラベル
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+
+        lines = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """メトリクスの登録先"""
+
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        """メトリクスを登録
+
+        Args:
+            metric: メトリクス
+
+        Returns:
+            登録したメトリクス
+        """
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """登録済みのすべてのメトリクスをPrometheusのテキスト形式に変換"""
+        with self._lock:
+            metrics = list(self._metrics)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# GitHub API
+GITHUB_OPERATION_SECONDS = REGISTRY.register(Histogram(
+    "executor_github_operation_duration_seconds",
+    "github.py の操作ごとの所要時間（再試行とレート制限の待機を含む）",
+    ("operation", "outcome"),
+))
+GITHUB_REQUESTS = REGISTRY.register(Counter(
+    "executor_github_requests_total",
+    "GitHub APIへのリクエスト数（再試行を含む）",
+    ("outcome",),
+))
+GITHUB_RETRIES = REGISTRY.register(Counter(
+    "executor_github_retries_total",
+    "一時的な障害による再試行の回数",
+    ("reason",),
+))
+GITHUB_FAILURES = REGISTRY.register(Counter(
+    "executor_github_failures_total",
+    "再試行しても成功しなかったGitHub API呼び出しの数",
+    ("reason",),
+))
+GITHUB_RATE_LIMIT_REMAINING = REGISTRY.register(Gauge(
+    "executor_github_rate_limit_remaining",
+    "GraphQL APIのレート制限の残りポイント",
+))
+
+# Claude Code の実行
+CLAUDE_RUN_SECONDS = REGISTRY.register(Histogram(
+    "executor_claude_run_duration_seconds",
+    "Claude Code の実行時間",
+    ("exit_code",),
+    buckets=CLAUDE_BUCKETS,
+))
+
+# チケットの実行キュー
+QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "executor_queue_depth",
+    "実行待ちのチケット数",
+))
+ACTIVE_WORKERS = REGISTRY.register(Gauge(
+    "executor_active_workers",
+    "実行中のチケット数",
+))
+
+
+def render() -> str:
+    """すべてのメトリクスをPrometheusのテキスト形式に変換
+
+    Returns:
+        /metrics のレスポンス本文
+    """
+    return REGISTRY.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """/metrics を返すHTTPハンドラ"""
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # スクレイプごとのアクセスログは出力しない
+        return
+
+
+def start_http_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """/metrics を公開するHTTPサーバーをバックグラウンドで起動
+
+    Args:
+        port: 待ち受けるポート（0の場合は空いているポート）
+        host: 待ち受けるアドレス
+
+    Returns:
+        起動したサーバー（server.server_address で実際のポートを取得できる）
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    return server
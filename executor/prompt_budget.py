@@ -0,0 +1,207 @@
+"""プロンプトに含めるPRコメントの選択（トークン予算付き）
+
+長いPRではコメントをすべて含めるとプロンプトが大きくなり、Claude Codeの応答が遅く、
+コストも高くなります。select_comments() は次の順でコメントを選び、予算内に収めます。
+
+1. executor自身の結果コメント（「Claude Code 実行完了」）とbotのコメントを除外する
+2. 人間のコメントのうち、短い相槌（「LGTM」「ありがとうございます」など）より
+   それ以外のコメントを優先し、それぞれ新しいものから予算に収まるだけ選ぶ
+3. 予算に収まらない最初のコメントは、残りの予算が十分あれば途中まで含める
+
+選んだコメントは新しい順に並べ、省略した件数とおおよそのトークン数を末尾に記載します。
+トークン数は文字種から見積もった概算です（ASCIIは約4文字、それ以外は約1文字で1トークン）。
+
+環境変数:
+    EXECUTOR_PROMPT_COMMENT_TOKENS: PRコメントに使うトークン数の上限（execute.py の
+        --prompt-comment-tokens と同じ、既定: 8000）
+"""
+
+import os
+from typing import Any, NamedTuple, Optional
+
+# executorが投稿する結果コメントの見出し（execute.create_comment_body）
+EXECUTOR_COMMENT_MARKER = "Claude Code 実行完了"
+
+# PRコメントに使うトークン数の上限の既定値
+DEFAULT_COMMENT_TOKEN_BUDGET = 8000
+
+# 予算の残りがこのトークン数以上の場合は、収まらないコメントを途中まで含める
+MIN_TRUNCATED_TOKENS = 200
+
+# このトークン数未満で、質問やコードを含まないコメントは相槌として優先度を下げる
+LOW_SIGNAL_TOKENS = 16
+
+_comment_token_budget = int(
+    os.environ.get("EXECUTOR_PROMPT_COMMENT_TOKENS") or DEFAULT_COMMENT_TOKEN_BUDGET
+)
+
+
+def set_comment_token_budget(budget: int) -> None:
+    """PRコメントに使うトークン数の上限を設定
+
+    Args:
+        budget: 上限（0の場合はコメントを含めない）
+    """
+    global _comment_token_budget
+    if budget < 0:
+        raise ValueError("budget には0以上を指定してください")
+    _comment_token_budget = budget
+
+
+def get_comment_token_budget() -> int:
+    """PRコメントに使うトークン数の上限を取得"""
+    return _comment_token_budget
+
+
+def estimate_tokens(text: str) -> int:
+    """テキストのトークン数を見積もる
+
+    Args:
+        text: テキスト
+
+    Returns:
+        おおよそのトークン数
+    """
+    # 非ASCII文字（日本語は主に3バイト）の数をUTF-8のバイト数の差から求める
+    non_ascii = (len(text.encode("utf-8")) - len(text)) // 2
+    ascii_chars = max(len(text) - non_ascii, 0)
+    return (ascii_chars + 3) // 4 + non_ascii
+
+
+def is_executor_comment(comment: dict[str, Any]) -> bool:
+    """executor自身の結果コメントやbotのコメントかどうかを判定
+
+    GraphQLの author.login はBotでも "[bot]" が付かないため author_type（__typename）で
+    判定し、author_type がない場合（RESTのコメントや以前のキャッシュ）はloginの接尾辞で判定します。
+
+    Args:
+        comment: コメント情報（{id, author, author_type, body, created_at}）
+
+    Returns:
+        プロンプトから除外するコメントの場合はTrue
+    """
+    author = comment.get("author") or ""
+    is_bot = comment.get("author_type") == "Bot" or author.endswith("[bot]")
+    return is_bot or EXECUTOR_COMMENT_MARKER in (comment.get("body") or "")
+
+
+def _is_low_signal(body: str) -> bool:
+    """短い相槌のような、対応の指示を含まないコメントかどうかを判定"""
+    if "?" in body or "？" in body or "```" in body:
+        return False
+    return estimate_tokens(body) < LOW_SIGNAL_TOKENS
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """テキストを指定したトークン数に収まるよう末尾を切り詰める"""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+
+class CommentSelection(NamedTuple):
+    """select_comments() の結果"""
+
+    section: str
+    total: int
+    included: int
+    truncated: int
+    dropped_executor: int
+    dropped_over_budget: int
+    dropped_tokens: int
+
+    @property
+    def dropped(self) -> bool:
+        """省略・除外したコメントがあるかどうか"""
+        return self.included < self.total or self.truncated > 0
+
+    def describe(self) -> str:
+        """選択結果の要約を生成（ログ出力用）"""
+        parts = [f"{self.total}件中 {self.included}件を掲載"]
+        if self.truncated:
+            parts.append(f"{self.truncated}件は途中まで")
+        if self.dropped_executor:
+            parts.append(f"executor・botのコメント {self.dropped_executor}件を除外")
+        if self.dropped_over_budget or self.truncated:
+            parts.append(
+                f"予算超過で {self.dropped_over_budget}件・約{self.dropped_tokens:,}トークンを省略"
+            )
+        return "、".join(parts)
+
+
+def _render_comment(comment: dict[str, Any], body: str) -> str:
+    return f"**{comment.get('author', 'unknown')}**: {body}\n\n"
+
+
+def select_comments(
+    comments: list[dict[str, Any]], budget: Optional[int] = None
+) -> CommentSelection:
+    """PRコメントを予算内で選んでプロンプトのセクションを生成
+
+    Args:
+        comments: コメント情報のリスト（古い順）
+        budget: コメントに使うトークン数の上限（Noneの場合は設定値）
+
+    Returns:
+        CommentSelection（section は含めるコメントがない場合は空文字列）
+    """
+    if budget is None:
+        budget = _comment_token_budget
+
+    human = [comment for comment in comments if not is_executor_comment(comment)]
+    # 新しい順に並べ、相槌でないコメントを優先する（sorted は安定なので新しい順は保たれる）
+    newest_first = sorted(
+        enumerate(human),
+        key=lambda entry: (entry[1].get("created_at") or "", entry[0]),
+        reverse=True,
+    )
+    candidates = sorted(newest_first, key=lambda entry: _is_low_signal(entry[1].get("body") or ""))
+
+    remaining = budget
+    chosen: dict[int, str] = {}
+    truncated = 0
+    dropped_tokens = 0
+    for index, comment in candidates:
+        body = comment.get("body") or ""
+        tokens = estimate_tokens(_render_comment(comment, body))
+        if tokens <= remaining:
+            chosen[index] = _render_comment(comment, body)
+            remaining -= tokens
+        elif not truncated and remaining >= MIN_TRUNCATED_TOKENS:
+            # 見出しと省略記号の分を残して本文を切り詰める
+            head = _truncate(body, remaining - estimate_tokens(_render_comment(comment, "…（以下省略）")))
+            chosen[index] = _render_comment(comment, head + "…（以下省略）")
+            dropped_tokens += tokens - estimate_tokens(chosen[index])
+            remaining = 0
+            truncated = 1
+        else:
+            dropped_tokens += tokens
+
+    dropped_over_budget = len(human) - len(chosen)
+    if not chosen:
+        section = ""
+    else:
+        parts = ["## PR に寄せられたコメント（新しい順）\n"]
+        parts.extend(chosen[index] for index, _ in newest_first if index in chosen)
+        if dropped_over_budget or truncated:
+            parts.append(
+                f"_（古いコメントなど {dropped_over_budget}件・約{dropped_tokens:,}トークン分を"
+                "省略しました）_\n\n"
+            )
+        parts.append("\n")
+        section = "".join(parts)
+
+    return CommentSelection(
+        section=section,
+        total=len(comments),
+        included=len(chosen),
+        truncated=truncated,
+        dropped_executor=len(comments) - len(human),
+        dropped_over_budget=dropped_over_budget,
+        dropped_tokens=dropped_tokens,
+    )
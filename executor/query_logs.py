@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""実行ログを検索・集計するコマンド
+
+logs ディレクトリの実行ログ（テキスト形式・構造化形式、圧縮の有無を問わない）から、
+Issue番号・実行日時・終了ステータス・メッセージのパターンで実行を絞り込み、
+実行回数、タイムアウト数、頻出するエラー行を集計します。
+
+未圧縮のテキスト形式のログは mmap で、圧縮済みのログは展開しながら読み込み、複数のログを
+プロセスプールで並列に処理します。構造化形式のログはレコードごとにデコードし、パターンは
+キーやエスケープを含む行全体ではなく message と照合します。サイドカーインデックスがある
+ログでパターン検索をしない場合は、エラーを含むバケットと、実行サマリーが見つかるまで
+末尾からさかのぼったバケットだけを読み込みます。
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from log_files import (
+    get_log_dir,
+    is_compressed,
+    is_structured,
+    iter_log_files,
+    iter_records,
+    open_log,
+    read_index,
+)
+
+LOG_DIR = get_log_dir()
+
+# ログファイル名（issue_<番号>_<日時>_<ハッシュ>.<拡張子>）
+_FILENAME_PATTERN = re.compile(r"^issue_(\d+)_(\d{8}_\d{6})_[0-9a-f]+\.")
+
+# 実行サマリー（execute.log_summary）とタイムアウトのメッセージ
+_EXIT_CODE_PATTERN = re.compile(rb"Exit Code: (-?\d+)")
+_DURATION_PATTERN = re.compile(rb"Duration: ([\d.]+)s")
+_TIMEOUT_MESSAGE = "Claude Codeの実行がタイムアウトしました"
+
+# エラー行（テキスト形式と構造化形式）
+_TEXT_ERROR_PATTERN = re.compile(rb"^\[[^\]]*\] \[ERROR\] (.*)$", re.MULTILINE)
+_JSON_ERROR_PATTERN = re.compile(rb'^\{.*"level":"ERROR".*$', re.MULTILINE)
+
+# パターンに一致した行として保持する件数の上限（1ログあたり）
+MAX_MATCH_LINES = 5
+
+STATUSES = ("success", "failed", "timeout", "unknown")
+
+
+def parse_log_name(path: Path) -> tuple[Optional[int], Optional[datetime]]:
+    """ログファイル名からIssue番号と実行開始日時を取得
+
+    Args:
+        path: ログファイルのパス
+
+    Returns:
+        (Issue番号, 実行開始日時)のタプル（取得できない場合はNone）
+    """
+    match = _FILENAME_PATTERN.match(path.name)
+    if not match:
+        return None, None
+    return int(match.group(1)), datetime.strptime(match.group(2), "%Y%m%d_%H%M%S")
+
+
+def _normalize_error(message: str) -> str:
+    """集計用にエラー行の数値を伏せる"""
+    return re.sub(r"\d+", "N", message.strip())[:200]
+
+
+def _line_at(data: Any, position: int) -> bytes:
+    """バッファ中の position を含む1行を取り出す"""
+    start = data.rfind(b"\n", 0, position) + 1
+    end = data.find(b"\n", position)
+    return data[start:end if end != -1 else len(data)]
+
+
+def _empty_summary() -> dict[str, Any]:
+    return {"exit_code": None, "duration": None, "errors": [], "matches": 0, "match_lines": []}
+
+
+def _analyze_buffer(data: Any, pattern: Optional[re.Pattern]) -> dict[str, Any]:
+    """ログ全体（mmapまたはbytes）を正規表現で走査"""
+    summary = _empty_summary()
+
+    for match in _EXIT_CODE_PATTERN.finditer(data):
+        summary["exit_code"] = int(match.group(1))
+    for match in _DURATION_PATTERN.finditer(data):
+        summary["duration"] = float(match.group(1))
+
+    for match in _TEXT_ERROR_PATTERN.finditer(data):
+        summary["errors"].append(match.group(1).decode("utf-8", errors="replace"))
+    for match in _JSON_ERROR_PATTERN.finditer(data):
+        try:
+            summary["errors"].append(json.loads(match.group(0)).get("message", ""))
+        except ValueError:
+            continue
+
+    if pattern is not None:
+        last_line_start = -1
+        for match in pattern.finditer(data):
+            line_start = data.rfind(b"\n", 0, match.start()) + 1
+            if line_start == last_line_start:
+                continue
+            last_line_start = line_start
+            summary["matches"] += 1
+            if len(summary["match_lines"]) < MAX_MATCH_LINES:
+                line = _line_at(data, match.start()).decode("utf-8", errors="replace")
+                summary["match_lines"].append(line)
+
+    return summary
+
+
+def _analyze_records(path: Path, pattern: Optional[re.Pattern]) -> dict[str, Any]:
+    """構造化形式のログをレコードごとにデコードして走査（パターンは message と照合）"""
+    summary = _empty_summary()
+
+    for record in iter_records(path):
+        message = record.get("message", "")
+        if record.get("level") == "ERROR":
+            summary["errors"].append(message)
+
+        encoded = message.encode("utf-8")
+        match = _EXIT_CODE_PATTERN.search(encoded)
+        if match:
+            summary["exit_code"] = int(match.group(1))
+        match = _DURATION_PATTERN.search(encoded)
+        if match:
+            summary["duration"] = float(match.group(1))
+
+        if pattern is not None and pattern.search(message):
+            summary["matches"] += 1
+            if len(summary["match_lines"]) < MAX_MATCH_LINES:
+                summary["match_lines"].append(message)
+
+    return summary
+
+
+def _analyze_indexed(path: Path, index: dict[str, Any]) -> dict[str, Any]:
+    """インデックスを使って、エラーを含むバケットと実行サマリーを含むバケットだけを読み込む
+
+    実行サマリーの後にも結果コメントの投稿などのログが続き、次のバケットにまたがることが
+    あるため、終了コードと所要時間が見つかるまで最後のバケットから順にさかのぼります。
+    """
+    summary = _empty_summary()
+
+    for record in iter_records(path, levels={"ERROR"}):
+        summary["errors"].append(record.get("message", ""))
+
+    buckets = index["buckets"]
+    for position in range(len(buckets) - 1, -1, -1):
+        start = buckets[position]["t"]
+        end = buckets[position + 1]["t"] if position + 1 < len(buckets) else None
+        exit_code = duration = None
+        for record in iter_records(path, start=start, end=end):
+            message = record.get("message", "").encode("utf-8")
+            match = _EXIT_CODE_PATTERN.search(message)
+            if match:
+                exit_code = int(match.group(1))
+            match = _DURATION_PATTERN.search(message)
+            if match:
+                duration = float(match.group(1))
+        # 後ろのバケットで見つかった値を優先する
+        if summary["exit_code"] is None:
+            summary["exit_code"] = exit_code
+        if summary["duration"] is None:
+            summary["duration"] = duration
+        if summary["exit_code"] is not None and summary["duration"] is not None:
+            break
+
+    return summary
+
+
+def scan_log(path: Path, pattern: Optional[str] = None) -> dict[str, Any]:
+    """1つのログを走査して実行の概要を取得
+
+    Args:
+        path: ログファイルのパス
+        pattern: 検索するメッセージの正規表現
+
+    Returns:
+        {"path", "issue", "started_at", "exit_code", "duration", "status",
+         "errors", "matches", "match_lines"} の辞書
+    """
+    issue_number, started_at = parse_log_name(path)
+    compiled = re.compile(pattern.encode("utf-8")) if pattern else None
+
+    index = read_index(path) if compiled is None else None
+    if index is not None and index["buckets"]:
+        summary = _analyze_indexed(path, index)
+        issue_number = issue_number if issue_number is not None else index.get("issue")
+    elif is_structured(path):
+        summary = _analyze_records(path, re.compile(pattern) if pattern else None)
+    elif is_compressed(path):
+        with open_log(path, "rb") as f:
+            summary = _analyze_buffer(f.read(), compiled)
+    elif path.stat().st_size == 0:
+        summary = _analyze_buffer(b"", compiled)
+    else:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            summary = _analyze_buffer(data, compiled)
+
+    timed_out = any(_TIMEOUT_MESSAGE in error for error in summary["errors"])
+    if timed_out:
+        status = "timeout"
+    elif summary["exit_code"] is None:
+        status = "unknown"
+    else:
+        status = "success" if summary["exit_code"] == 0 else "failed"
+
+    return {
+        "path": str(path),
+        "issue": issue_number,
+        "started_at": started_at.isoformat() if started_at else None,
+        "status": status,
+        **summary,
+    }
+
+
+def _parse_datetime(value: str) -> datetime:
+    """コマンドライン引数の日時（ISO 8601）を解析"""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日時の形式が不正です: {value}（例: 2024-05-01 または 2024-05-01T12:00）")
+
+
+def select_logs(
+    log_dir: Path,
+    issues: Optional[set[int]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> list[Path]:
+    """ファイル名から分かる条件（Issue番号・実行開始日時）でログを絞り込む
+
+    Args:
+        log_dir: ログディレクトリ
+        issues: 対象のIssue番号
+        since: この日時以降に開始した実行のみ
+        until: この日時より前に開始した実行のみ
+
+    Returns:
+        ログファイルのパスのリスト
+    """
+    selected = []
+    for path in iter_log_files(log_dir):
+        issue_number, started_at = parse_log_name(path)
+        if issues and issue_number not in issues:
+            continue
+        if started_at is None and (since or until):
+            continue
+        if since and started_at < since:
+            continue
+        if until and started_at >= until:
+            continue
+        selected.append(path)
+    return selected
+
+
+def scan_logs(paths: list[Path], pattern: Optional[str] = None, jobs: Optional[int] = None) -> list[dict[str, Any]]:
+    """複数のログを並列に走査
+
+    Args:
+        paths: ログファイルのパスのリスト
+        pattern: 検索するメッセージの正規表現
+        jobs: 並列数（Noneの場合はCPUコア数）
+
+    Returns:
+        scan_log の結果のリスト（paths と同じ順序）
+    """
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(paths) < 2:
+        return [scan_log(path, pattern) for path in paths]
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as pool:
+        chunksize = max(1, len(paths) // (jobs * 4))
+        return list(pool.map(scan_log, paths, [pattern] * len(paths), chunksize=chunksize))
+
+
+def aggregate(runs: Iterable[dict[str, Any]], top: int = 10) -> dict[str, Any]:
+    """実行結果を集計
+
+    Args:
+        runs: scan_log の結果
+        top: 頻出エラー行として出力する件数
+
+    Returns:
+        {"runs", "by_status", "by_issue", "timeouts", "top_errors"} の辞書
+    """
+    runs = list(runs)
+    by_status = Counter(run["status"] for run in runs)
+    by_issue = Counter(run["issue"] for run in runs if run["issue"] is not None)
+    errors = Counter()
+    for run in runs:
+        # 1回の実行で同じエラーが繰り返されても1回として数える
+        errors.update({_normalize_error(error) for error in run["errors"] if error.strip()})
+
+    return {
+        "runs": len(runs),
+        "by_status": {status: by_status.get(status, 0) for status in STATUSES},
+        "by_issue": dict(sorted(by_issue.items())),
+        "timeouts": by_status.get("timeout", 0),
+        "top_errors": errors.most_common(top),
+    }
+
+
+def print_report(runs: list[dict[str, Any]], report: dict[str, Any], show_runs: bool) -> None:
+    """集計結果をテキストで出力"""
+    if show_runs:
+        for run in runs:
+            duration = f"{run['duration']:.1f}s" if run["duration"] is not None else "-"
+            exit_code = run["exit_code"] if run["exit_code"] is not None else "-"
+            print(
+                f"#{run['issue'] or '?'}\t{run['started_at'] or '-'}\t{run['status']}"
+                f"\texit={exit_code}\t{duration}\t{Path(run['path']).name}"
+            )
+            for line in run["match_lines"]:
+                print(f"    {line}")
+        print()
+
+    print(f"実行回数: {report['runs']}")
+    print("ステータス: " + ", ".join(f"{status}={count}" for status, count in report["by_status"].items()))
+    print(f"タイムアウト: {report['timeouts']}")
+    if report["by_issue"]:
+        print("Issue別: " + ", ".join(f"#{issue}={count}" for issue, count in report["by_issue"].items()))
+    if report["top_errors"]:
+        print("頻出エラー:")
+        for message, count in report["top_errors"]:
+            print(f"  {count:>5}  {message}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="実行ログを検索・集計"
+    )
+    parser.add_argument(
+        "-d",
+        "--log-dir",
+        type=Path,
+        default=LOG_DIR,
+        help=f"ログディレクトリ (デフォルト: {LOG_DIR})",
+    )
+    parser.add_argument(
+        "-i",
+        "--issue",
+        type=int,
+        action="append",
+        help="対象のIssue番号 (複数指定可)",
+    )
+    parser.add_argument(
+        "--since",
+        type=_parse_datetime,
+        help="この日時以降に開始した実行のみ (e.g., 2024-05-01, 2024-05-01T12:00)",
+    )
+    parser.add_argument(
+        "--until",
+        type=_parse_datetime,
+        help="この日時より前に開始した実行のみ",
+    )
+    parser.add_argument(
+        "-s",
+        "--status",
+        choices=STATUSES,
+        action="append",
+        help="対象の終了ステータス (複数指定可)",
+    )
+    parser.add_argument(
+        "--exit-code",
+        type=int,
+        help="対象の終了コード",
+    )
+    parser.add_argument(
+        "-e",
+        "--pattern",
+        help="メッセージを検索する正規表現 (一致した行を含む実行のみ)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=10,
+        help="頻出エラー行の出力件数 (デフォルト: 10)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="並列に処理するプロセス数 (デフォルト: CPUコア数)",
+    )
+    parser.add_argument(
+        "--runs",
+        action="store_true",
+        help="集計に加えて、対象の実行を1件ずつ出力",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="結果をJSON形式で出力",
+    )
+
+    args = parser.parse_args()
+
+    if args.pattern:
+        try:
+            re.compile(args.pattern)
+        except re.error as e:
+            parser.error(f"正規表現が不正です: {e}")
+
+    try:
+        paths = select_logs(args.log_dir, set(args.issue or []), args.since, args.until)
+        runs = scan_logs(paths, args.pattern, args.jobs)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.status:
+        runs = [run for run in runs if run["status"] in args.status]
+    if args.exit_code is not None:
+        runs = [run for run in runs if run["exit_code"] == args.exit_code]
+    if args.pattern:
+        runs = [run for run in runs if run["matches"]]
+
+    report = aggregate(runs, args.top)
+    if args.json:
+        report["top_errors"] = [{"message": message, "count": count} for message, count in report["top_errors"]]
+        output: dict[str, Any] = {"summary": report}
+        if args.runs:
+            output["runs"] = runs
+        print(json.dumps(output, indent=2, ensure_ascii=False))
+    else:
+        print_report(runs, report, args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""GitHub APIのレート制限を考慮したリクエストスケジューラ
+
+GraphQLクエリと一緒に取得した `rateLimit { cost remaining resetAt }` から
+1時間あたりのポイント残量（プライマリレート制限）を追跡し、短時間のバーストは
+トークンバケットで平準化します（セカンダリレート制限対策）。
+
+優先度の低い読み込み（ボードのスキャンなど）は残量が予備分を下回ると待機し、
+Status更新や結果コメントなど優先度の高い書き込みのための残量を確保します。
+"""
+
+import contextlib
+import contextvars
+import threading
+import time
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+# 優先度
+HIGH = "high"
+LOW = "low"
+
+# セカンダリレート制限（GraphQLは1分あたり2,000ポイント）に対するバケットの補充量
+DEFAULT_POINTS_PER_MINUTE = 2000
+
+# 書き込み（ミューテーション）はセカンダリレート制限で5ポイントとして数えられる
+MUTATION_POINTS = 5
+
+# 優先度の低いリクエストが使わずに残しておくプライマリ残量の割合
+DEFAULT_RESERVE_RATIO = 0.1
+
+
+_priority: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "github_request_priority", default=None
+)
+
+
+@contextlib.contextmanager
+def priority(level: str) -> Iterator[None]:
+    """ブロック内のリクエストの優先度を指定
+
+    書き込みの前提となる読み込み（Status更新のためのID解決など）を
+    高優先度で扱うために使います。
+
+    Args:
+        level: HIGH または LOW
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority(default: str) -> str:
+    """現在のコンテキストの優先度を取得
+
+    Args:
+        default: priority() で指定されていない場合の優先度
+
+    Returns:
+        HIGH または LOW
+    """
+    return _priority.get() or default
+
+
+def _parse_reset_at(reset_at: Optional[str]) -> Optional[float]:
+    """resetAt（ISO 8601）をUNIX時刻に変換"""
+    if not reset_at:
+        return None
+    try:
+        return datetime.fromisoformat(reset_at.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """レート制限の残量を追跡し、優先度に応じてリクエストを待機させる
+
+    複数スレッドから同時に呼び出しても安全です。
+    """
+
+    def __init__(
+        self,
+        points_per_minute: float = DEFAULT_POINTS_PER_MINUTE,
+        reserve_ratio: float = DEFAULT_RESERVE_RATIO,
+    ):
+        """初期化
+
+        Args:
+            points_per_minute: トークンバケットの1分あたりの補充量（バケットの容量も同じ）
+            reserve_ratio: 優先度の低いリクエストが残しておくプライマリ残量の割合
+        """
+        self.capacity = float(points_per_minute)
+        self.refill_per_second = points_per_minute / 60.0
+        self.reserve_ratio = reserve_ratio
+
+        self._cond = threading.Condition()
+        self._tokens = self.capacity
+        self._refilled_at = time.monotonic()
+
+        # サーバーから報告されたプライマリレート制限の状態
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.last_cost: Optional[int] = None
+
+    def _refill(self) -> None:
+        """経過時間に応じてバケットを補充"""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._refilled_at) * self.refill_per_second
+        )
+        self._refilled_at = now
+
+    def _primary_wait(self, priority: str) -> float:
+        """プライマリレート制限のために待つべき秒数を計算"""
+        if self.remaining is None or self.reset_at is None:
+            return 0.0
+
+        reserve = (self.limit or 0) * self.reserve_ratio if priority == LOW else 0
+        if self.remaining > reserve:
+            return 0.0
+
+        wait = self.reset_at - time.time()
+        if wait <= 0:
+            # リセット時刻を過ぎていれば、次の応答で残量が更新されるまで制限しない
+            self.remaining = None
+            return 0.0
+        return wait
+
+    def acquire(self, priority: str = LOW, points: float = 1) -> None:
+        """リクエストを送ってよくなるまで待機
+
+        Args:
+            priority: HIGH または LOW
+            points: セカンダリレート制限で消費するポイント
+        """
+        with self._cond:
+            while True:
+                wait = self._primary_wait(priority)
+                if wait <= 0:
+                    self._refill()
+                    # 優先度の低いリクエストはバケットにも予備分を残す
+                    floor = self.capacity * self.reserve_ratio if priority == LOW else 0
+                    if self._tokens - points >= floor:
+                        self._tokens -= points
+                        return
+                    wait = (points + floor - self._tokens) / self.refill_per_second
+                self._cond.wait(timeout=min(wait, 60.0))
+
+    def record(self, rate_limit: Optional[dict[str, Any]]) -> None:
+        """GraphQLレスポンスの rateLimit を反映
+
+        Args:
+            rate_limit: `rateLimit { cost remaining resetAt limit }` の結果
+        """
+        if not rate_limit:
+            return
+        with self._cond:
+            self.limit = rate_limit.get("limit", self.limit)
+            self.remaining = rate_limit.get("remaining", self.remaining)
+            self.reset_at = _parse_reset_at(rate_limit.get("resetAt")) or self.reset_at
+            self.last_cost = rate_limit.get("cost", self.last_cost)
+            self._cond.notify_all()
+
+    def snapshot(self) -> dict[str, Any]:
+        """現在のレート制限の状態を取得
+
+        Returns:
+            {"limit", "remaining", "reset_at", "last_cost", "bucket_tokens"} の辞書
+        """
+        with self._cond:
+            self._refill()
+            return {
+                "limit": self.limit,
+                "remaining": self.remaining,
+                "reset_at": self.reset_at,
+                "last_cost": self.last_cost,
+                "bucket_tokens": self._tokens,
+            }
+
+    def recommended_interval(self, base_interval: float) -> float:
+        """残量に応じたポーリング間隔を計算
+
+        残量が半分を下回ると、リセットまでに使い切らないよう間隔を広げます。
+
+        Args:
+            base_interval: 通常時のポーリング間隔（秒）
+
+        Returns:
+            推奨するポーリング間隔（秒）
+        """
+        with self._cond:
+            if not self.limit or self.remaining is None:
+                return base_interval
+            ratio = self.remaining / self.limit
+            if ratio >= 0.5:
+                return base_interval
+
+            interval = base_interval * 0.5 / max(ratio, 0.01)
+            if self.reset_at is not None:
+                interval = min(interval, max(self.reset_at - time.time(), base_interval))
+            return interval
+
+
+_limiter = RateLimiter()
+
+
+def get_limiter() -> RateLimiter:
+    """プロセス共有のRateLimiterを取得
+
+    Returns:
+        RateLimiter インスタンス
+    """
+    return _limiter
+
+
+def set_limiter(limiter: RateLimiter) -> None:
+    """プロセス共有のRateLimiterを差し替える
+
+    Args:
+        limiter: 新しいRateLimiter
+    """
+    global _limiter
+    _limiter = limiter
@@ -0,0 +1,189 @@
+"""GitHub API呼び出しの再試行とサーキットブレーカー
+
+一時的な障害（502/503/504、タイムアウト、レート制限・不正利用検知による拒否）は
+上限付きのジッター入り指数バックオフで再試行します。障害が続いてGitHubが
+明らかに停止している場合は、サーキットブレーカーで以降の呼び出しを即座に失敗させます。
+"""
+
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+import metrics
+from github_client import GitHubAPIError
+
+T = TypeVar("T")
+
+
+class CircuitBreaker:
+    """連続した一時的な障害の回数に応じて呼び出しを遮断する
+
+    failure_threshold 回続けて失敗すると開き、cooldown 秒間は呼び出しを即座に失敗させます。
+    cooldown 経過後は1回だけ試行を許し（半開）、成功すれば閉じ、失敗すれば再び開きます。
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 60.0):
+        """初期化
+
+        Args:
+            failure_threshold: 開くまでの連続失敗回数
+            cooldown: 開いてから試行を再開するまでの秒数
+        """
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """呼び出しを許可するかどうか
+
+        Returns:
+            許可する場合はTrue
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        """成功を記録"""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """一時的な障害による失敗を記録"""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    def release_trial(self) -> None:
+        """成功とも失敗とも判定できなかった試行の半開の枠を解放（次の呼び出しで再び試行する）"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        """開いているかどうか"""
+        with self._lock:
+            return self._opened_at is not None
+
+
+class RetryPolicy:
+    """上限付きのジッター入り指数バックオフによる再試行ポリシー"""
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """初期化
+
+        Args:
+            max_attempts: 最大試行回数（初回を含む）
+            base_delay: バックオフの基準秒数
+            max_delay: 1回あたりの待ち時間の上限（秒）
+            breaker: 共有するサーキットブレーカー
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker()
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """待ち時間を計算（フルジッター）
+
+        Args:
+            attempt: 失敗した試行の番号（0始まり）
+            retry_after: サーバーが指定した待ち時間（秒）
+
+        Returns:
+            待ち時間（秒）
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay * 2))
+        return delay
+
+    def call(self, func: Callable[[], T], idempotent: bool = True) -> T:
+        """関数を再試行付きで呼び出す
+
+        Args:
+            func: 呼び出す関数
+            idempotent: 繰り返し実行しても結果が変わらない場合はTrue。
+                Falseの場合は、リクエストがサーバーで処理されていないことが確実な場合のみ再試行する
+
+        Returns:
+            関数の返り値
+
+        Raises:
+            GitHubAPIError: 再試行しても成功しなかった場合、
+                再試行できないエラーの場合、またはサーキットブレーカーが開いている場合
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                metrics.GITHUB_FAILURES.inc(reason="circuit_open")
+                raise GitHubAPIError(
+                    "GitHub API error: GitHubへの呼び出しが連続して失敗しているため一時的に停止しています",
+                    transient=True,
+                    sent=False,
+                )
+
+            try:
+                result = func()
+            except GitHubAPIError as e:
+                reason = "rate_limited" if e.rate_limited else "transient" if e.transient else "error"
+                metrics.GITHUB_REQUESTS.inc(outcome=reason)
+                if not e.transient:
+                    # 一時的でないエラーはGitHubが応答している証拠なので、障害としては数えない
+                    self.breaker.record_success()
+                    metrics.GITHUB_FAILURES.inc(reason=reason)
+                    raise
+                if e.rate_limited:
+                    # レート制限もGitHubは応答しているので、待ってから再試行するだけにする
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+
+                retryable = e.transient if idempotent else e.safe_to_retry_write
+                attempt += 1
+                if not retryable or attempt >= self.max_attempts or self.breaker.is_open:
+                    metrics.GITHUB_FAILURES.inc(reason=reason)
+                    raise
+                metrics.GITHUB_RETRIES.inc(reason=reason)
+                time.sleep(self.backoff(attempt - 1, e.retry_after))
+                continue
+            except Exception:
+                # GitHub API以外の原因（応答の解析やバグ）による失敗は、GitHubとのやり取りが
+                # 成功したかどうか分からないので、成功とも障害とも数えない
+                self.breaker.release_trial()
+                raise
+
+            self.breaker.record_success()
+            metrics.GITHUB_REQUESTS.inc(outcome="ok")
+            return result
+
+
+_policy = RetryPolicy()
+
+
+def get_retry_policy() -> RetryPolicy:
+    """プロセス共有の再試行ポリシーを取得
+
+    Returns:
+        RetryPolicy インスタンス
+    """
+    return _policy
@@ -0,0 +1,309 @@
+"""実行するチケットの優先順位付け
+
+Backlogのチケットを次の順に並べ、優先度の高いものから実行します。
+
+1. 順位: プロジェクトの Priority フィールド（"P0"〜"P9"、"Urgent"・"High"・"Medium"・"Low"
+   など）から決め、緊急を示すラベル（urgent、hotfix など）で1つ上げ、後回しを示すラベルで
+   1つ下げる。これまでの実行の失敗1回ごとに1つ下げる（最大 MAX_FAILURE_PENALTY まで）
+2. 同じ順位の中では、失敗回数の少ないもの、作成日時の古いものの順
+
+作成日時は同じ順位の中でしか比べないため、古いまま残っているチケットが緊急のチケットより
+先に実行されることはありません。
+
+監視モードでは TicketQueue（heapq による優先度付きキュー）に実行待ちのチケットを保持し、
+同期のたびに最新のボードの状態で優先度を更新します。更新は古いエントリを無効にして
+追加し直すだけなので、実行待ちの件数によらず1件あたり O(log n) で済みます。
+複数のリポジトリ・プロジェクトを処理する場合は、FairScheduler がターゲットごとの
+TicketQueue を順に巡回し、実行待ちの多いターゲットが他のターゲットを待たせないようにします。
+"""
+
+import heapq
+import itertools
+import re
+import threading
+from typing import Any, Iterable, Iterator, NamedTuple, Optional
+
+from cache import JsonFileCache
+
+# Priority フィールドの値に含まれる語と順位（小さいほど優先）
+PRIORITY_RANKS = {
+    "urgent": 0,
+    "critical": 0,
+    "highest": 0,
+    "high": 1,
+    "medium": 2,
+    "normal": 2,
+    "low": 3,
+    "lowest": 4,
+}
+
+# Priority が未設定、または解釈できない値のチケットの順位
+DEFAULT_PRIORITY_RANK = 2
+
+# 順位を1つ上げるラベル（大文字・小文字は区別しない）
+URGENT_LABELS = frozenset({"urgent", "critical", "hotfix", "security", "incident"})
+
+# 順位を1つ下げるラベル
+DEFERRED_LABELS = frozenset({"someday", "nice to have", "low priority"})
+
+# 失敗回数によって下げる順位の上限
+MAX_FAILURE_PENALTY = 3
+
+# "P0"・"P1 - High" のような Priority の値
+_PRIORITY_NUMBER_PATTERN = re.compile(r"\bp(\d)\b")
+
+# リポジトリごとのチケットの連続失敗回数（{Issue番号: 回数}）
+_failure_counts = JsonFileCache("ticket_failures")
+
+
+def _repo_key(owner: str, repo: str) -> str:
+    return f"{owner}/{repo}"
+
+
+def get_failure_counts(owner: str, repo: str) -> dict[int, int]:
+    """チケットごとの連続失敗回数を取得
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+
+    Returns:
+        {Issue番号: 連続失敗回数} の辞書（失敗していないチケットは含まない）
+    """
+    counts = _failure_counts.get(_repo_key(owner, repo)) or {}
+    return {int(number): count for number, count in counts.items() if count}
+
+
+def record_result(owner: str, repo: str, issue_number: int, succeeded: bool) -> None:
+    """チケットの実行結果を記録（成功した場合は失敗回数を0に戻す）
+
+    Args:
+        owner: リポジトリオーナー
+        repo: リポジトリ名
+        issue_number: Issue番号
+        succeeded: 実行が成功したかどうか
+    """
+    count = None if succeeded else get_failure_counts(owner, repo).get(issue_number, 0) + 1
+    _failure_counts.update(_repo_key(owner, repo), {str(issue_number): count})
+
+
+def priority_rank(priority: Optional[str]) -> int:
+    """Priority フィールドの値を順位に変換
+
+    Args:
+        priority: Priority フィールドの値（Noneの場合は未設定）
+
+    Returns:
+        順位（小さいほど優先）
+    """
+    if not priority:
+        return DEFAULT_PRIORITY_RANK
+    name = priority.lower()
+    match = _PRIORITY_NUMBER_PATTERN.search(name)
+    if match:
+        return int(match.group(1))
+    for word in re.findall(r"[a-z]+", name):
+        if word in PRIORITY_RANKS:
+            return PRIORITY_RANKS[word]
+    return DEFAULT_PRIORITY_RANK
+
+
+class TicketPriority(NamedTuple):
+    """チケットの優先度（タプルとして小さいほど先に実行する）"""
+
+    rank: int
+    failures: int
+    created_at: str
+    number: int
+
+    def describe(self) -> str:
+        """優先度の要約を生成（ログ出力用）"""
+        text = f"順位 {self.rank}"
+        if self.failures:
+            text += f"、失敗 {self.failures}回"
+        return text
+
+
+def ticket_priority(ticket: dict[str, Any], failures: int = 0) -> TicketPriority:
+    """チケットの優先度を計算
+
+    Args:
+        ticket: チケット情報（fetch_tickets_iter の要素）
+        failures: チケットの連続失敗回数
+
+    Returns:
+        TicketPriority
+    """
+    rank = priority_rank(ticket.get("priority"))
+    labels = {label.lower() for label in ticket.get("labels") or []}
+    if labels & URGENT_LABELS:
+        rank -= 1
+    if labels & DEFERRED_LABELS:
+        rank += 1
+    rank += min(failures, MAX_FAILURE_PENALTY)
+    # 作成日時がない場合は最後に回す
+    return TicketPriority(rank, failures, ticket.get("created_at") or "~", ticket.get("number") or 0)
+
+
+def select_tickets(
+    tickets: Iterable[dict[str, Any]],
+    count: int,
+    failures: Optional[dict[int, int]] = None,
+) -> list[dict[str, Any]]:
+    """優先度の高いチケットを選ぶ
+
+    Args:
+        tickets: 候補のチケット情報
+        count: 選ぶ件数
+        failures: {Issue番号: 連続失敗回数} の辞書
+
+    Returns:
+        優先度の高い順のチケット情報（最大 count 件）
+    """
+    failures = failures or {}
+    return heapq.nsmallest(
+        count,
+        tickets,
+        key=lambda ticket: ticket_priority(ticket, failures.get(ticket.get("number"), 0)),
+    )
+
+
+class TicketQueue:
+    """実行待ちのチケットを優先度順に取り出すキュー
+
+    同じチケットを push し直すと優先度を更新します。古いエントリはヒープに残したまま
+    無効にし、取り出す際に読み飛ばします。複数スレッドから同時に呼び出しても安全です。
+    """
+
+    def __init__(self):
+        self._heap: list[list[Any]] = []
+        self._entries: dict[int, list[Any]] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, issue_number: int) -> bool:
+        with self._lock:
+            return issue_number in self._entries
+
+    def __iter__(self) -> Iterator[int]:
+        """実行待ちのIssue番号（順不同、呼び出し時点の内容）"""
+        with self._lock:
+            return iter(list(self._entries))
+
+    def push(self, issue_number: int, priority: TicketPriority) -> bool:
+        """チケットを追加、または優先度を更新
+
+        Args:
+            issue_number: Issue番号
+            priority: 優先度
+
+        Returns:
+            新たに追加した場合はTrue（優先度の更新の場合はFalse）
+        """
+        with self._lock:
+            entry = self._entries.get(issue_number)
+            if entry is not None:
+                if entry[0] == priority:
+                    return False
+                entry[-1] = None
+            self._entries[issue_number] = [priority, next(self._counter), issue_number]
+            heapq.heappush(self._heap, self._entries[issue_number])
+            self._compact()
+            return entry is None
+
+    def discard(self, issue_number: int) -> bool:
+        """チケットを取り除く
+
+        Args:
+            issue_number: Issue番号
+
+        Returns:
+            取り除いた場合はTrue（キューになかった場合はFalse）
+        """
+        with self._lock:
+            entry = self._entries.pop(issue_number, None)
+            if entry is None:
+                return False
+            entry[-1] = None
+            self._compact()
+            return True
+
+    def pop(self) -> Optional[int]:
+        """優先度の最も高いチケットを取り出す
+
+        Returns:
+            Issue番号（キューが空の場合はNone）
+        """
+        with self._lock:
+            while self._heap:
+                _, _, issue_number = heapq.heappop(self._heap)
+                if issue_number is not None:
+                    del self._entries[issue_number]
+                    return issue_number
+            return None
+
+    def _compact(self) -> None:
+        """無効なエントリがたまったらヒープを作り直す（有効なエントリの2倍を超えた場合）"""
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._heap = [entry for entry in self._heap if entry[-1] is not None]
+            heapq.heapify(self._heap)
+
+
+class FairScheduler:
+    """複数のキュー（リポジトリ・プロジェクトごと）から公平にチケットを取り出す
+
+    キューごとに同時実行数の上限を設け、上限に達していないキューを順番に（ラウンドロビンで）
+    選んで、そのキューの優先度の最も高いチケットを返します。実行待ちの多いキューがあっても、
+    他のキューのチケットは順番が来れば実行されます。複数スレッドから同時に呼び出しても安全です。
+    """
+
+    def __init__(self, limits: dict[str, int]):
+        """初期化
+
+        Args:
+            limits: {キューの名前: 同時実行数の上限} の辞書（この順に巡回する）
+        """
+        self.queues = {key: TicketQueue() for key in limits}
+        self._limits = dict(limits)
+        self._active = dict.fromkeys(limits, 0)
+        self._order = list(limits)
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """実行待ちのチケット数（すべてのキューの合計）"""
+        return sum(len(queue) for queue in self.queues.values())
+
+    def acquire(self) -> Optional[tuple[str, int]]:
+        """次に実行するチケットを取り出し、そのキューの実行数に数える
+
+        Returns:
+            (キューの名前, Issue番号) のタプル（実行できるチケットがない場合はNone）
+        """
+        with self._lock:
+            for offset in range(len(self._order)):
+                index = (self._next + offset) % len(self._order)
+                key = self._order[index]
+                if self._active[key] >= self._limits[key]:
+                    continue
+                issue_number = self.queues[key].pop()
+                if issue_number is None:
+                    continue
+                self._active[key] += 1
+                # 次回は取り出したキューの次から探す
+                self._next = index + 1
+                return key, issue_number
+            return None
+
+    def release(self, key: str) -> None:
+        """acquire() で取り出したチケットの実行が終わったことを記録
+
+        Args:
+            key: キューの名前
+        """
+        with self._lock:
+            self._active[key] -= 1
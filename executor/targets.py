@@ -0,0 +1,137 @@
+"""複数のリポジトリ・プロジェクトを1つのプロセスで処理するための設定ファイル
+
+execute.py の --config で指定する設定ファイル（JSON）を読み込みます。
+
+設定ファイルの例:
+    {
+      "concurrency": 4,
+      "targets": [
+        {"owner": "octo", "repo": "web", "project": 1, "concurrency": 2, "path": "../web"},
+        {"owner": "octo", "repo": "api", "project": 3, "path": "/srv/checkouts/api"}
+      ]
+    }
+
+- concurrency: 全体で同時に実行するチケット数（省略時は各ターゲットの concurrency の合計）
+- targets[].concurrency: ターゲットごとの同時実行数の上限（省略時は1）
+- targets[].path: Claude Code を実行するリポジトリのローカルのチェックアウト
+  （設定ファイルからの相対パス。省略時はカレントディレクトリのリポジトリ）。
+  ターゲットが複数ある場合と、owner/repo がカレントディレクトリのリポジトリと異なる場合は必須
+"""
+
+import json
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+from github import get_git_remote_info
+
+
+class Target(NamedTuple):
+    """処理対象のリポジトリとプロジェクト"""
+
+    owner: str
+    repo: str
+    project: int
+    concurrency: int = 1
+    path: Optional[Path] = None
+
+    @property
+    def key(self) -> str:
+        """ターゲットを識別する文字列（ログ出力・スケジューリング用）"""
+        return f"{self.owner}/{self.repo}#{self.project}"
+
+
+class TargetsConfig(NamedTuple):
+    """設定ファイルの内容"""
+
+    targets: list[Target]
+    concurrency: int
+
+
+def _positive_int(value: Any, name: str) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise RuntimeError(f"{name} には1以上の整数を指定してください: {value!r}")
+    return value
+
+
+def _parse_target(entry: Any, index: int, base_dir: Path) -> Target:
+    """targets の1要素を Target に変換"""
+    name = f"targets[{index}]"
+    if not isinstance(entry, dict):
+        raise RuntimeError(f"{name} はオブジェクトで指定してください")
+    for field in ("owner", "repo"):
+        if not isinstance(entry.get(field), str) or not entry[field]:
+            raise RuntimeError(f"{name}.{field} を指定してください")
+    unknown = set(entry) - {"owner", "repo", "project", "concurrency", "path"}
+    if unknown:
+        raise RuntimeError(f"{name} に不明な項目があります: {', '.join(sorted(unknown))}")
+
+    path = entry.get("path")
+    return Target(
+        owner=entry["owner"],
+        repo=entry["repo"],
+        project=_positive_int(entry.get("project"), f"{name}.project"),
+        concurrency=_positive_int(entry.get("concurrency", 1), f"{name}.concurrency"),
+        path=(base_dir / path).resolve() if path else None,
+    )
+
+
+def _check_paths(targets: list[Target], remote: Optional[tuple[Optional[str], Optional[str]]]) -> None:
+    """path を省略したターゲットがカレントディレクトリのリポジトリで実行できるか確認"""
+    missing = [target for target in targets if target.path is None]
+    if not missing:
+        return
+    if len(targets) > 1:
+        raise RuntimeError(
+            f"ターゲットが複数ある場合は path を指定してください: {', '.join(t.key for t in missing)}"
+        )
+
+    target = missing[0]
+    owner, repo = remote if remote is not None else get_git_remote_info()
+    if (owner or "").lower() != target.owner.lower() or (repo or "").lower() != target.repo.lower():
+        where = f"{owner}/{repo}" if owner and repo else "不明"
+        raise RuntimeError(
+            f"{target.key} の path を指定してください"
+            f"（カレントディレクトリのリポジトリ: {where}）"
+        )
+
+
+def load_config(
+    path: Path, remote: Optional[tuple[Optional[str], Optional[str]]] = None
+) -> TargetsConfig:
+    """設定ファイルを読み込む
+
+    Args:
+        path: 設定ファイルのパス
+        remote: カレントディレクトリのリポジトリの (owner, repo)（Noneの場合は git remote origin から取得）
+
+    Returns:
+        TargetsConfig
+
+    Raises:
+        RuntimeError: 設定ファイルを読み込めない場合、または内容が不正な場合
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise RuntimeError(f"設定ファイルを読み込めません: {e}")
+
+    if not isinstance(data, dict) or not isinstance(data.get("targets"), list) or not data["targets"]:
+        raise RuntimeError(f"設定ファイルに targets を1件以上指定してください: {path}")
+
+    base_dir = Path(path).resolve().parent
+    targets = [_parse_target(entry, index, base_dir) for index, entry in enumerate(data["targets"])]
+
+    keys = [target.key for target in targets]
+    duplicates = sorted({key for key in keys if keys.count(key) > 1})
+    if duplicates:
+        raise RuntimeError(f"同じターゲットが重複しています: {', '.join(duplicates)}")
+    for target in targets:
+        if target.path is not None and not target.path.is_dir():
+            raise RuntimeError(f"{target.key} の path が見つかりません: {target.path}")
+    _check_paths(targets, remote)
+
+    concurrency = data.get("concurrency")
+    if concurrency is None:
+        concurrency = sum(target.concurrency for target in targets)
+    return TargetsConfig(targets, _positive_int(concurrency, "concurrency"))
@@ -0,0 +1,55 @@
+"""executor のテストの共通設定
+
+executor のモジュールは executor ディレクトリを基準に読み込まれるため、
+executor と benchmarks ディレクトリを読み込みパスに追加します。
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+EXECUTOR_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(EXECUTOR_DIR))
+sys.path.insert(0, str(EXECUTOR_DIR / "benchmarks"))
+
+import cache  # noqa: E402
+import cassette  # noqa: E402
+import github_client  # noqa: E402
+import rate_limit  # noqa: E402
+import retry  # noqa: E402
+from fake_github import FakeBoard, start_server  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_environment(tmp_path, monkeypatch):
+    """キャッシュ・レート制限・再試行をテストごとに初期化する"""
+    monkeypatch.setenv("EXECUTOR_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setenv("GH_TOKEN", "fake-token")
+    monkeypatch.delenv("EXECUTOR_GITHUB_TRANSPORT", raising=False)
+    monkeypatch.delenv(cassette.CASSETTE_ENV, raising=False)
+    cache.set_cache_dir(None)
+    cassette.set_cassette(None)
+    rate_limit.set_limiter(rate_limit.RateLimiter(points_per_minute=10 ** 9))
+    monkeypatch.setattr(retry, "_policy", retry.RetryPolicy(base_delay=0.0, max_delay=0.0))
+    yield
+    cassette.set_cassette(None)
+    github_client.set_client(None)
+
+
+@pytest.fixture
+def board():
+    """スタブサーバーが返すボード"""
+    return FakeBoard(items=30, comments=10, comment_bytes=40, body_bytes=40)
+
+
+@pytest.fixture
+def fake_github(board, monkeypatch):
+    """スタブのGitHub APIサーバーを起動して GITHUB_API_URL を向ける"""
+    server = start_server(board)
+    monkeypatch.setenv("GITHUB_API_URL", server.url)
+    github_client.set_client(None)
+    yield server
+    github_client.set_client(None)
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,42 @@
+"""cache.JsonFileCache のテスト"""
+
+import threading
+
+from cache import JsonFileCache
+
+
+def test_entries_from_other_processes_are_kept():
+    # 別々のインスタンスは、同じキャッシュを使う別のプロセスと同じ状態になる
+    daemon = JsonFileCache("shared")
+    one_shot = JsonFileCache("shared")
+    daemon.get("warm-up")
+    one_shot.get("warm-up")
+
+    daemon.set("a", 1)
+    one_shot.set("b", 2)
+    daemon.update("index", {"x": "1"})
+    one_shot.update("index", {"y": "2"})
+
+    assert daemon.get("b") == 2
+    assert JsonFileCache("shared").get("a") == 1
+    assert JsonFileCache("shared").get("index") == {"x": "1", "y": "2"}
+
+    one_shot.delete("a")
+    assert daemon.get("a") is None
+
+
+def test_concurrent_writers_do_not_lose_updates():
+    writers, updates = 4, 50
+
+    def write(writer: int) -> None:
+        cache = JsonFileCache("contended")
+        for number in range(updates):
+            cache.update("index", {f"{writer}-{number}": number})
+
+    threads = [threading.Thread(target=write, args=(writer,)) for writer in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(JsonFileCache("contended").get("index")) == writers * updates
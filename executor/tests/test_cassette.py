@@ -0,0 +1,27 @@
+"""cassette.py の記録・再生のテスト"""
+
+import cache
+import cassette
+import github
+
+
+def test_replay_reproduces_recording_regardless_of_cache(fake_github, tmp_path):
+    # 記録前のキャッシュにプロジェクトのメタデータがあっても、記録にはメタデータの取得が含まれる
+    github.get_project_metadata("fake", "fake", 1)
+    path = tmp_path / "github.jsonl"
+
+    cassette.set_cassette(cassette.Cassette(path, cassette.RECORD))
+    recorded = github.fetch_ticket_context("fake", "fake", 3)
+    recorded_metadata = github.get_project_metadata("fake", "fake", 1)
+    cassette.set_cassette(None)
+    assert recorded["pr_comments"]
+
+    # 記録でPRコメントのカーソルが保存されていれば、再生時に別のクエリが送信されてしまう
+    for _ in range(2):
+        cassette.set_cassette(cassette.Cassette(path, cassette.REPLAY))
+        assert github.fetch_ticket_context("fake", "fake", 3) == recorded
+        assert github.get_project_metadata("fake", "fake", 1) == recorded_metadata
+        cassette.set_cassette(None)
+
+    assert cache.get_cache_dir() == tmp_path / "cache"
+    assert not (tmp_path / "cache" / "pr_comments.json").exists()
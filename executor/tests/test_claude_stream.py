@@ -0,0 +1,61 @@
+"""stream-json のデコードと、Claude Codeの出力の読み込みのテスト"""
+
+import json
+import os
+import sys
+
+import execute
+from claude_stream import StreamJsonDecoder
+from log_files import iter_records
+from logger import SimpleLogger
+
+
+def test_unexpected_event_shapes_are_logged_raw():
+    decoder = StreamJsonDecoder(clock=lambda: 0.0)
+    events = [
+        {"type": "assistant", "message": {"id": "m1", "content": ["text"], "usage": "n/a"}},
+        {"type": "assistant", "message": "hello"},
+        {"type": "user", "message": None},
+        {"type": "rate_limit_event", "retry_after": 3},
+        {"type": "result", "subtype": "success", "usage": [1, 2]},
+    ]
+    lines = [decoder.feed(json.dumps(event)) for event in events]
+
+    assert lines[0] == ["[turn 1] latency=0.00s"]
+    # 内訳の集計に使えないイベントも捨てずにそのまま返す
+    assert lines[1] == [json.dumps(events[1])]
+    assert lines[2] == [json.dumps(events[2])]
+    assert lines[3] == [json.dumps(events[3])]
+    assert decoder.summary()["usage"] == dict.fromkeys(decoder.usage(), 0)
+
+
+class _BrokenDecoder(StreamJsonDecoder):
+    def feed(self, line):
+        if "broken" in line:
+            raise TypeError("unexpected event")
+        return super().feed(line)
+
+
+def test_decode_error_does_not_stop_reading_stdout(tmp_path, monkeypatch):
+    script = tmp_path / "bin" / "claude"
+    script.parent.mkdir()
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import json\n"
+        "print('broken')\n"
+        "for n in range(100):\n"
+        "    print(json.dumps({'type': 'assistant', 'message': {'id': 'm', 'content': [{'type': 'text', 'text': f'line {n}'}]}}))\n",
+        encoding="utf-8",
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{script.parent}{os.pathsep}{os.environ.get('PATH', '')}")
+
+    logger = SimpleLogger(str(tmp_path / "run.jsonl"), structured=True)
+    exit_code = execute.execute_with_claude(logger, "prompt", decoder=_BrokenDecoder())
+    logger.close()
+
+    assert exit_code == 0
+    messages = [record["message"] for record in iter_records(logger.log_file)]
+    assert "broken" in messages
+    assert any("デコードに失敗しました" in message for message in messages)
+    assert "line 99" in messages
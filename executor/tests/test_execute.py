@@ -0,0 +1,64 @@
+"""execute.py の監視モードの実行キューのテスト"""
+
+import threading
+import time
+import types
+
+import pytest
+
+import execute
+
+
+def _run_watch(monkeypatch, board, on_poll):
+    """監視モードを同時実行数1で動かし、実行したチケットの順を返す
+
+    1件目のチケットはポーリングを2回終えるまで実行中のままにします。
+    on_poll(n) は n 回目のポーリングの後に呼ばれ、Trueを返すと監視を終了します。
+    """
+    started: list[int] = []
+    release = threading.Event()
+
+    def prepare_ticket(owner, repo, issue_number, output_format):
+        started.append(issue_number)
+        if len(started) == 1:
+            assert release.wait(10)
+        return "", None
+
+    polls = 0
+
+    def sleep(seconds):
+        nonlocal polls
+        polls += 1
+        if polls == 2:
+            release.set()
+        if on_poll(polls, started):
+            raise KeyboardInterrupt
+        time.sleep(0.05)
+
+    monkeypatch.setattr(execute, "prepare_ticket", prepare_ticket)
+    monkeypatch.setattr(execute, "time", types.SimpleNamespace(sleep=sleep, time=time.time))
+    execute.watch("fake", "fake", 1, 0.01, 1, "prompt", False)
+    return started
+
+
+@pytest.mark.parametrize("new_status", ["Done", "In progress"])
+def test_queued_ticket_moved_out_of_backlog_is_not_run(fake_github, board, monkeypatch, capsys, new_status):
+    # Backlog は #10（P2）、#20（Priority 未設定）、#30（P1）
+    assert [n for n, status in board.statuses.items() if status == "Backlog"] == [10, 20, 30]
+
+    def on_poll(polls, started):
+        if polls == 1:
+            # #30 の実行中に、実行待ちの #10 を他の人が Backlog から動かす
+            board.set_status(10, new_status)
+        return polls >= 4 and len(started) >= 2 or polls >= 40
+
+    started = _run_watch(monkeypatch, board, on_poll)
+
+    assert started == [30, 20]
+    assert f"#10 は {new_status} に移動された" in capsys.readouterr().out
+
+
+def test_backlog_tickets_run_in_priority_order(fake_github, board, monkeypatch):
+    started = _run_watch(monkeypatch, board, lambda polls, started: len(started) >= 3 or polls >= 40)
+
+    assert started == [30, 10, 20]
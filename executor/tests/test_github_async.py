@@ -0,0 +1,23 @@
+"""github_async.py のテスト"""
+
+import asyncio
+import time
+
+import github_async
+
+
+def test_semaphores_of_closed_event_loops_are_released(monkeypatch):
+    monkeypatch.setattr(github_async, "_semaphores", {})
+    github_async.set_concurrency_limit(1)
+    sleep = github_async._to_async(time.sleep)
+
+    async def run() -> None:
+        # セマフォを待機させて、セマフォがイベントループを参照するようにする
+        await asyncio.gather(sleep(0.01), sleep(0.01), sleep(0.01))
+
+    try:
+        for _ in range(5):
+            asyncio.run(run())
+        assert len(github_async._semaphores) == 1
+    finally:
+        github_async.set_concurrency_limit(github_async.DEFAULT_CONCURRENCY)
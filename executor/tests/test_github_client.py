@@ -0,0 +1,58 @@
+"""github_client.GitHubClient の接続プールのテスト"""
+
+import time
+
+import pytest
+
+from fake_github import start_server
+from github_client import GitHubAPIError, GitHubClient
+
+ISSUE_QUERY = (
+    'query($number:Int!) { repository(owner: "fake", name: "fake") '
+    "{ issue(number: $number) { number } } }"
+)
+
+
+@pytest.fixture
+def idle_closing_server(board):
+    """待機中の接続を0.2秒で閉じるスタブサーバー"""
+    server = start_server(board, idle_timeout=0.2)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _issue_number(client: GitHubClient, number: int) -> int:
+    return client.graphql(ISSUE_QUERY, {"number": number})["data"]["repository"]["issue"]["number"]
+
+
+def test_reuses_connection_after_server_closed_idle_connection(idle_closing_server, board):
+    client = GitHubClient(api_url=idle_closing_server.url, token="fake-token")
+
+    assert _issue_number(client, 1) == 1
+    time.sleep(0.5)
+    assert _issue_number(client, 2) == 2
+    assert board.stats["issue_details"] == 2
+
+
+def test_resends_when_pooled_connection_is_dropped_after_sending(fake_github, board):
+    client = GitHubClient(api_url=fake_github.url, token="fake-token")
+    assert _issue_number(client, 1) == 1
+
+    # プールした接続に送信したリクエストが、処理されずに切断される
+    board.faults.append("drop")
+    assert _issue_number(client, 2) == 2
+    assert board.stats["issue_details"] == 2
+
+
+def test_does_not_resend_when_new_connection_is_dropped(fake_github, board):
+    client = GitHubClient(api_url=fake_github.url, token="fake-token")
+
+    board.faults.append("drop_after")
+    with pytest.raises(GitHubAPIError) as excinfo:
+        client.graphql(ISSUE_QUERY, {"number": 1})
+
+    assert excinfo.value.transient
+    assert excinfo.value.sent
+    assert not excinfo.value.safe_to_retry_write
+    assert board.stats["issue_details"] == 1
@@ -0,0 +1,25 @@
+"""Issue詳細情報の一括取得のテスト"""
+
+import github
+
+
+def test_missing_issue_does_not_fail_the_chunk(fake_github, board):
+    # 削除・移管されたIssue
+    del board.statuses[5]
+
+    result = github.get_issue_details_bulk("fake", "fake", [3, 5, 7, 3, 12], chunk_size=2)
+
+    assert sorted(result.details) == [3, 7, 12]
+    assert result.details[7]["title"] == "Ticket 7"
+    assert result.missing == [5]
+    assert board.stats["issue_details_bulk"] == 2
+
+
+def test_transient_error_is_retried(fake_github, board):
+    board.faults.append("graphql_error")
+
+    result = github.get_issue_details_bulk("fake", "fake", [1, 2])
+
+    assert sorted(result.details) == [1, 2]
+    assert result.missing == []
+    assert board.faults == []
@@ -0,0 +1,38 @@
+"""log_files.py のテスト"""
+
+import gzip
+import os
+
+from log_files import apply_retention, index_path, open_log, trace_path
+
+
+def _write(path, size, mtime):
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+
+
+def test_size_limit_counts_index_and_trace_sidecars(tmp_path):
+    logs = [tmp_path / f"issue_{number}_20240501_12000{number}_abcd1234.jsonl" for number in range(3)]
+    for offset, log in enumerate(logs):
+        mtime = 1_700_000_000 + offset
+        _write(log, 100 * 1024, mtime)
+        _write(index_path(log), 50 * 1024, mtime)
+        _write(trace_path(log), 200 * 1024, mtime)
+
+    # ログだけなら300KBで上限に収まるが、サイドカーを含めると1050KB
+    removed = apply_retention(tmp_path, max_age_days=None, max_total_mb=0.5)
+
+    assert removed == logs[:2]
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        [logs[2].name, index_path(logs[2]).name, trace_path(logs[2]).name]
+    )
+
+
+def test_reads_every_member_of_an_appended_gzip_log(tmp_path):
+    path = tmp_path / "run.log.gz"
+    with open(path, "ab") as f:
+        for number in range(5):
+            f.write(gzip.compress(f"line {number}\n".encode("utf-8")))
+
+    with open_log(path) as f:
+        assert f.read().splitlines() == [f"line {number}" for number in range(5)]
@@ -0,0 +1,59 @@
+"""logger.SimpleLogger のテスト"""
+
+import threading
+
+import pytest
+
+from log_files import iter_records
+from logger import SimpleLogger
+
+
+@pytest.mark.parametrize("options", [{"buffered": True}, {"compress": True, "structured": True}])
+def test_records_logged_while_closing_are_not_lost(tmp_path, capsys, options):
+    logger = SimpleLogger(str(tmp_path / "run.log"), **options)
+    threads_count, lines = 4, 2000
+    started = threading.Barrier(threads_count + 1)
+
+    def produce(thread: int) -> None:
+        started.wait()
+        for number in range(lines):
+            logger.info(f"{thread}-{number}")
+
+    threads = [threading.Thread(target=produce, args=(index,)) for index in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    started.wait()
+    logger.close()
+    for thread in threads:
+        thread.join()
+
+    messages = {record["message"] for record in iter_records(logger.log_file)}
+    assert len(messages) == threads_count * lines
+    assert "破棄しました" not in capsys.readouterr().err
+
+
+def test_full_queue_does_not_block_other_loggers(tmp_path):
+    logger = SimpleLogger(str(tmp_path / "run.log"), buffered=True, max_queue_size=1, flush_size=1)
+    release = threading.Event()
+    write_records = logger._write_records
+
+    def slow_write(records):
+        release.wait()
+        write_records(records)
+
+    logger._write_records = slow_write
+    producer = threading.Thread(target=lambda: [logger.info(f"stdout {n}") for n in range(5)])
+    producer.start()
+    try:
+        # 一杯のキューに積もうと待っているスレッドがあっても、ロックは保持されない
+        producer.join(timeout=0.5)
+        assert producer.is_alive()
+        assert logger._write_lock.acquire(timeout=1)
+        logger._write_lock.release()
+    finally:
+        release.set()
+        producer.join()
+        logger.close()
+
+    messages = [record["message"] for record in iter_records(logger.log_file)]
+    assert len(messages) == 5
@@ -0,0 +1,50 @@
+"""PRコメントの差分取得（保存したカーソル以降だけを取得する）のテスト"""
+
+import github
+
+
+def _bodies(comments):
+    return [comment["body"] for comment in comments]
+
+
+def test_first_run_fetches_latest_page_and_stores_cursor(fake_github, board):
+    context = github.fetch_ticket_context("fake", "fake", 3)
+
+    assert context["pr"]["number"] == 100003
+    assert len(context["pr_comments"]) == board.comments
+    assert board.stats["ticket_context"] == 1
+    # 1リクエストで取得し、続きのページは取得しない
+    assert board.stats["pr_comments"] == 0
+    state = github._pr_comment_state.get(github._pr_comments_key("fake", "fake", 100003))
+    assert state["cursor"] == str(board.comments - 1)
+
+
+def test_later_runs_fetch_only_new_comments(fake_github, board):
+    first = github.fetch_ticket_context("fake", "fake", 3)["pr_comments"]
+    nodes_before = board.stats["ticket_context.nodes"]
+
+    board.add_pr_comment(3, "new comment 1")
+    board.add_pr_comment(3, "new comment 2")
+    second = github.fetch_ticket_context("fake", "fake", 3)["pr_comments"]
+
+    assert _bodies(second) == _bodies(first) + ["new comment 1", "new comment 2"]
+    # Issue 1件と新しいコメント2件だけが返される
+    assert board.stats["ticket_context.nodes"] - nodes_before == 3
+
+    # 新しいコメントがない場合もカーソルを失わない
+    third = github.fetch_ticket_context("fake", "fake", 3)["pr_comments"]
+    assert third == second
+    state = github._pr_comment_state.get(github._pr_comments_key("fake", "fake", 100003))
+    assert state["cursor"] == str(board.comments + 1)
+
+
+def test_get_pr_comments_advances_cursor(fake_github, board):
+    first = github.get_pr_comments("fake", "fake", 100003)
+    assert len(first) == board.comments
+
+    board.add_pr_comment(3, "follow-up")
+    nodes_before = board.stats["pr_comments.nodes"]
+    second = github.get_pr_comments("fake", "fake", 100003)
+
+    assert _bodies(second) == _bodies(first) + ["follow-up"]
+    assert board.stats["pr_comments.nodes"] - nodes_before == 1
@@ -0,0 +1,41 @@
+"""Issue番号からProjectV2 ItemのIDへの索引のテスト"""
+
+import github
+
+
+def _page(*items):
+    return {"repository": {"projectV2": {"items": {"nodes": list(items)}}}}
+
+
+def _item(item_id, typename, name_with_owner, number):
+    return {
+        "id": item_id,
+        "content": {"__typename": typename, "repository": {"nameWithOwner": name_with_owner}, "number": number},
+    }
+
+
+def test_board_scan_fills_the_index(fake_github, board):
+    list(github.fetch_tickets_iter("fake", "fake", 1))
+
+    assert github.get_issue_item_id("fake", "fake", 1, 12) == "PVTI_12"
+    assert board.stats["project_items"] == 0
+
+
+def test_items_of_other_repositories_and_prs_do_not_shadow_issues(fake_github, board):
+    # ボードには他のリポジトリのIssueやPRも載る。PRは nameWithOwner を持たない
+    github._index_project_items("fake", "fake", 1, _page(
+        _item("PVTI_other", "Issue", "octo/other", 12),
+        {"id": "PVTI_pr", "content": {"__typename": "PullRequest", "number": 12}},
+    ))
+
+    assert github.get_issue_item_id("fake", "fake", 1, 12) == "PVTI_12"
+    assert board.stats["project_items"] == 1
+
+
+def test_forget_issue_item_id(fake_github, board):
+    github._index_project_items("fake", "fake", 1, _page(_item("PVTI_stale", "Issue", "fake/fake", 5)))
+    assert github.get_issue_item_id("fake", "fake", 1, 5) == "PVTI_stale"
+
+    github.forget_issue_item_id("fake", "fake", 1, 5)
+
+    assert github.get_issue_item_id("fake", "fake", 1, 5) == "PVTI_5"
@@ -0,0 +1,44 @@
+"""query_logs.py のテスト"""
+
+import pytest
+
+from logger import SimpleLogger
+from query_logs import scan_log
+
+
+@pytest.fixture(params=[False, True], ids=["jsonl", "jsonl.gz"])
+def jsonl_log(request, tmp_path):
+    logger = SimpleLogger(
+        str(tmp_path / "issue_7_20240501_120000_abcd1234.jsonl"),
+        structured=True,
+        compress=request.param,
+        issue_number=7,
+    )
+    logger.info('reviewer said "ship it"')
+    logger.info("first line\nsecond line")
+    logger.error("Claude Codeの実行に失敗しました")
+    logger.info("Exit Code: 1")
+    logger.close()
+    return logger.log_file
+
+
+def test_pattern_matches_message_not_json_keys(jsonl_log):
+    assert scan_log(jsonl_log, "level")["matches"] == 0
+    assert scan_log(jsonl_log, "message")["matches"] == 0
+
+
+def test_pattern_matches_unescaped_message(jsonl_log):
+    quoted = scan_log(jsonl_log, 'said "ship')
+    assert quoted["matches"] == 1
+    assert quoted["match_lines"] == ['reviewer said "ship it"']
+
+    assert scan_log(jsonl_log, "first line\nsecond")["matches"] == 1
+
+
+def test_summary_is_read_from_records(jsonl_log):
+    run = scan_log(jsonl_log, "ship")
+
+    assert run["issue"] == 7
+    assert run["exit_code"] == 1
+    assert run["status"] == "failed"
+    assert run["errors"] == ["Claude Codeの実行に失敗しました"]
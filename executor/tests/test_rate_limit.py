@@ -0,0 +1,98 @@
+"""rate_limit.RateLimiter のテスト"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import rate_limit
+from rate_limit import HIGH, LOW, RateLimiter
+
+
+def _reset_in(seconds):
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _start_acquire(limiter, priority, points=1):
+    thread = threading.Thread(target=limiter.acquire, args=(priority, points), daemon=True)
+    thread.start()
+    thread.join(timeout=0.2)
+    return thread
+
+
+def test_low_priority_waits_while_primary_remaining_is_in_reserve():
+    limiter = RateLimiter()
+    limiter.record({"limit": 5000, "remaining": 400, "resetAt": _reset_in(3600), "cost": 1})
+
+    # 予備分（10%）を下回ると、優先度の低いリクエストだけが待つ
+    low = _start_acquire(limiter, LOW)
+    assert low.is_alive()
+    high = _start_acquire(limiter, HIGH)
+    assert not high.is_alive()
+
+    # 残量が回復したことが報告されると、待っていたリクエストも送られる
+    limiter.record({"remaining": 4999})
+    low.join(timeout=1)
+    assert not low.is_alive()
+
+
+def test_reserve_is_not_enforced_after_reset_time():
+    limiter = RateLimiter()
+    limiter.record({"limit": 5000, "remaining": 0, "resetAt": _reset_in(-1)})
+
+    assert not _start_acquire(limiter, LOW).is_alive()
+    assert limiter.remaining is None
+
+
+def test_low_priority_leaves_bucket_reserve_for_writes():
+    limiter = RateLimiter(points_per_minute=600, reserve_ratio=0.1)
+
+    assert not _start_acquire(limiter, LOW, 530).is_alive()
+    limiter.acquire(HIGH, 60)
+    # バケットの予備分（60ポイント）は書き込みだけが使える
+    low = _start_acquire(limiter, LOW, 1)
+    assert low.is_alive()
+    assert not _start_acquire(limiter, HIGH, rate_limit.MUTATION_POINTS).is_alive()
+
+    with limiter._cond:
+        limiter.reserve_ratio = 0.0
+        limiter._tokens = limiter.capacity
+        limiter._cond.notify_all()
+    low.join(timeout=1)
+    assert not low.is_alive()
+
+
+def test_recommended_interval_grows_as_remaining_shrinks():
+    limiter = RateLimiter()
+    assert limiter.recommended_interval(30) == 30
+
+    limiter.record({"limit": 5000, "remaining": 3000, "resetAt": _reset_in(3600)})
+    assert limiter.recommended_interval(30) == 30
+
+    limiter.record({"remaining": 1250})
+    assert limiter.recommended_interval(30) == 60
+
+    # リセットまでの時間より長くは待たない
+    limiter.record({"remaining": 10, "resetAt": _reset_in(120)})
+    assert 30 <= limiter.recommended_interval(30) <= 120
+
+
+def test_priority_context():
+    assert rate_limit.current_priority(LOW) == LOW
+    with rate_limit.priority(HIGH):
+        assert rate_limit.current_priority(LOW) == HIGH
+        with rate_limit.priority(LOW):
+            assert rate_limit.current_priority(HIGH) == LOW
+        assert rate_limit.current_priority(LOW) == HIGH
+    assert rate_limit.current_priority(HIGH) == HIGH
+
+
+def test_snapshot_reports_reported_state():
+    limiter = RateLimiter(points_per_minute=120)
+    limiter.acquire(HIGH, 20)
+    limiter.record({"limit": 5000, "remaining": 4990, "resetAt": "2030-01-01T00:00:00Z", "cost": 3})
+
+    snapshot = limiter.snapshot()
+
+    assert snapshot["remaining"] == 4990 and snapshot["last_cost"] == 3
+    assert snapshot["reset_at"] == datetime(2030, 1, 1, tzinfo=timezone.utc).timestamp()
+    assert 99 <= snapshot["bucket_tokens"] < 100 + (time.monotonic() - limiter._refilled_at) * 2 + 1
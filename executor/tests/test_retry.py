@@ -0,0 +1,81 @@
+"""GitHub API呼び出しの再試行のテスト"""
+
+import pytest
+
+import github
+import retry
+from github_client import GitHubAPIError
+
+
+def test_read_is_retried_after_graphql_internal_error(fake_github, board):
+    board.faults.append("graphql_error")
+
+    assert github.get_issue_details("fake", "fake", 1)["number"] == 1
+    assert board.faults == []
+
+
+def test_read_is_retried_after_connection_drop(fake_github, board):
+    board.faults.append("drop_after")
+
+    assert github.get_issue_details("fake", "fake", 1)["number"] == 1
+    assert board.stats["issue_details"] == 2
+
+
+def test_write_is_not_retried_after_it_was_sent(fake_github, board):
+    # サーバーで処理された後に接続が切れた場合、投稿を再試行すると二重に投稿される
+    board.faults.append("drop_after")
+
+    with pytest.raises(RuntimeError, match="Failed to post comment"):
+        github.post_issue_comment("fake", "fake", 3, "result")
+    assert board.posted_comments == {3: 1}
+
+
+def test_write_is_not_retried_after_graphql_internal_error(fake_github, board):
+    board.faults.extend(["graphql_error", "graphql_error"])
+
+    with pytest.raises(GitHubAPIError) as excinfo:
+        github._call_github_graphql(
+            "mutation($subjectId:ID!, $body:String!) "
+            "{ addComment(input: {subjectId: $subjectId, body: $body}) { commentEdge { node { id } } } }",
+            {"subjectId": "I_3", "body": "result"},
+        )
+
+    assert excinfo.value.transient
+    assert board.faults == ["graphql_error"]
+
+
+def _open_breaker(cooldown):
+    breaker = retry.CircuitBreaker(failure_threshold=1, cooldown=cooldown)
+    policy = retry.RetryPolicy(max_attempts=1, base_delay=0.0, max_delay=0.0, breaker=breaker)
+
+    def fail():
+        raise GitHubAPIError("GitHub API error: HTTP 502", status=502, transient=True)
+
+    with pytest.raises(GitHubAPIError):
+        policy.call(fail)
+    assert breaker.is_open
+    return policy
+
+
+def test_circuit_breaker_rejects_calls_while_open():
+    policy = _open_breaker(cooldown=60.0)
+
+    with pytest.raises(GitHubAPIError, match="一時的に停止しています") as excinfo:
+        policy.call(lambda: "ok")
+    assert not excinfo.value.sent
+
+
+def test_non_github_error_does_not_close_half_open_breaker():
+    policy = _open_breaker(cooldown=0.0)
+
+    def broken():
+        raise KeyError("data")
+
+    # 半開の試行がGitHub以外の原因で失敗しても、ブレーカーは閉じない
+    with pytest.raises(KeyError):
+        policy.call(broken)
+    assert policy.breaker.is_open
+
+    # 試行の枠は解放され、次の呼び出しで再び試行できる
+    assert policy.call(lambda: "ok") == "ok"
+    assert not policy.breaker.is_open
@@ -0,0 +1,124 @@
+"""scheduler（チケットの優先順位付けと実行待ちのキュー）のテスト"""
+
+import pytest
+
+import scheduler
+from scheduler import FairScheduler, TicketPriority, TicketQueue
+
+
+@pytest.mark.parametrize("value, rank", [
+    (None, scheduler.DEFAULT_PRIORITY_RANK),
+    ("", scheduler.DEFAULT_PRIORITY_RANK),
+    ("P0", 0),
+    ("p1", 1),
+    ("P3 - Low", 3),
+    ("Urgent", 0),
+    ("🔥 Critical", 0),
+    ("High", 1),
+    ("Medium", 2),
+    ("Lowest", 4),
+    ("Someday maybe", scheduler.DEFAULT_PRIORITY_RANK),
+])
+def test_priority_rank(value, rank):
+    assert scheduler.priority_rank(value) == rank
+
+
+def _ticket(number, priority=None, labels=(), created_at=None):
+    return {"number": number, "priority": priority, "labels": list(labels), "created_at": created_at}
+
+
+def test_labels_move_rank_by_one():
+    assert scheduler.ticket_priority(_ticket(1, "P2")).rank == 2
+    assert scheduler.ticket_priority(_ticket(1, "P2", ["Hotfix"])).rank == 1
+    assert scheduler.ticket_priority(_ticket(1, "P2", ["nice to have"])).rank == 3
+    assert scheduler.ticket_priority(_ticket(1, "P2", ["urgent", "security"])).rank == 1
+
+
+def test_failure_penalty_is_capped():
+    ticket = _ticket(1, "P0")
+
+    assert scheduler.ticket_priority(ticket, failures=1).rank == 1
+    assert scheduler.ticket_priority(ticket, failures=10).rank == scheduler.MAX_FAILURE_PENALTY
+    assert scheduler.ticket_priority(ticket, failures=10).failures == 10
+
+
+def test_select_tickets_orders_by_rank_failures_then_age():
+    tickets = [
+        _ticket(1, "P2", created_at="2024-01-01T00:00:00Z"),
+        _ticket(2, "P1", created_at="2024-03-01T00:00:00Z"),
+        _ticket(3, "P1", created_at="2024-02-01T00:00:00Z"),
+        _ticket(4, "P1"),
+        _ticket(5, "P0", created_at="2024-04-01T00:00:00Z"),
+    ]
+
+    selected = scheduler.select_tickets(tickets, 4, failures={5: 1, 3: 0})
+
+    # #5 は失敗1回で順位1になり、同じ順位では失敗回数の多いものが後になる
+    assert [ticket["number"] for ticket in selected] == [3, 2, 4, 5]
+
+
+def test_failure_counts_are_recorded_per_repository():
+    scheduler.record_result("octo", "web", 7, False)
+    scheduler.record_result("octo", "web", 7, False)
+    scheduler.record_result("octo", "web", 8, False)
+    scheduler.record_result("octo", "api", 7, True)
+
+    assert scheduler.get_failure_counts("octo", "web") == {7: 2, 8: 1}
+    assert scheduler.get_failure_counts("octo", "api") == {}
+
+    scheduler.record_result("octo", "web", 7, True)
+    assert scheduler.get_failure_counts("octo", "web") == {8: 1}
+
+
+def _priority(rank, number):
+    return TicketPriority(rank, 0, "2024-01-01T00:00:00Z", number)
+
+
+def test_ticket_queue_pops_by_priority_and_updates_in_place():
+    queue = TicketQueue()
+    assert queue.push(1, _priority(2, 1))
+    assert queue.push(2, _priority(1, 2))
+    assert queue.push(3, _priority(3, 3))
+
+    # 同じ優先度で追加し直しても変わらない。優先度を変えると更新される
+    assert not queue.push(2, _priority(1, 2))
+    assert not queue.push(3, _priority(0, 3))
+    assert len(queue) == 3 and 3 in queue
+
+    assert queue.discard(1)
+    assert not queue.discard(1)
+    assert sorted(queue) == [2, 3]
+
+    assert [queue.pop(), queue.pop(), queue.pop()] == [3, 2, None]
+    assert len(queue) == 0
+
+
+def test_ticket_queue_compacts_invalidated_entries():
+    queue = TicketQueue()
+    for update in range(200):
+        for number in range(5):
+            queue.push(number, _priority(update % 7, number))
+
+    assert len(queue) == 5
+    assert len(queue._heap) <= 2 * len(queue) + 16 + 1
+    assert sorted(queue.pop() for _ in range(5)) == list(range(5))
+
+
+def test_fair_scheduler_round_robin_with_per_key_limits():
+    fair = FairScheduler({"web": 1, "api": 2})
+    for number in (1, 2, 3):
+        fair.queues["web"].push(number, _priority(0, number))
+    for number in (11, 12, 13):
+        fair.queues["api"].push(number, _priority(0, number))
+
+    assert fair.acquire() == ("web", 1)
+    assert fair.acquire() == ("api", 11)
+    # web は上限（1件）に達しているので api だけから取り出す
+    assert fair.acquire() == ("api", 12)
+    assert fair.acquire() is None
+    assert len(fair) == 3
+
+    fair.release("api")
+    assert fair.acquire() == ("api", 13)
+    fair.release("web")
+    assert fair.acquire() == ("web", 2)
@@ -0,0 +1,91 @@
+"""設定ファイル（targets.load_config）の読み込みのテスト"""
+
+import json
+
+import pytest
+
+import worktree
+from targets import Target, load_config
+
+REMOTE = ("octo", "web")
+
+
+@pytest.fixture
+def write_config(tmp_path):
+    def write(data):
+        path = tmp_path / "config" / "targets.json"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(json.dumps(data), encoding="utf-8")
+        return path
+
+    return write
+
+
+def test_defaults_and_relative_paths(tmp_path, write_config):
+    (tmp_path / "web").mkdir()
+    (tmp_path / "api").mkdir()
+    config = load_config(write_config({"targets": [
+        {"owner": "octo", "repo": "web", "project": 1, "concurrency": 2, "path": "../web"},
+        {"owner": "octo", "repo": "api", "project": 3, "path": str(tmp_path / "api")},
+    ]}), REMOTE)
+
+    assert config.targets == [
+        Target("octo", "web", 1, 2, tmp_path / "web"),
+        Target("octo", "api", 3, 1, tmp_path / "api"),
+    ]
+    # concurrency を省略した場合はターゲットごとの上限の合計
+    assert config.concurrency == 3
+    assert config.targets[0].key == "octo/web#1"
+
+
+def test_single_target_for_current_repository_needs_no_path(write_config):
+    config = load_config(write_config({"concurrency": 2, "targets": [
+        {"owner": "Octo", "repo": "Web", "project": 1},
+    ]}), REMOTE)
+
+    assert config.targets[0].path is None
+    assert config.concurrency == 2
+
+
+@pytest.mark.parametrize("targets, message", [
+    ([{"owner": "octo", "repo": "api", "project": 1}], "path を指定してください"),
+    (
+        [{"owner": "octo", "repo": "web", "project": 1}, {"owner": "octo", "repo": "web", "project": 2}],
+        "ターゲットが複数ある場合は path を指定してください",
+    ),
+])
+def test_path_is_required_unless_target_is_current_repository(write_config, targets, message):
+    with pytest.raises(RuntimeError, match=message):
+        load_config(write_config({"targets": targets}), REMOTE)
+
+
+@pytest.mark.parametrize("data, message", [
+    ({}, "targets を1件以上"),
+    ({"targets": []}, "targets を1件以上"),
+    ({"targets": ["octo/web"]}, r"targets\[0\] はオブジェクト"),
+    ({"targets": [{"owner": "octo", "project": 1}]}, r"targets\[0\]\.repo を指定"),
+    ({"targets": [{"owner": "octo", "repo": "web"}]}, r"targets\[0\]\.project には1以上"),
+    ({"targets": [{"owner": "octo", "repo": "web", "project": True}]}, r"targets\[0\]\.project には1以上"),
+    ({"targets": [{"owner": "octo", "repo": "web", "project": 1, "concurrency": 0}]}, "concurrency には1以上"),
+    ({"targets": [{"owner": "octo", "repo": "web", "project": 1, "branch": "main"}]}, "不明な項目があります: branch"),
+    ({"targets": [{"owner": "octo", "repo": "web", "project": 1, "path": "missing"}]}, "path が見つかりません"),
+    ({"concurrency": 0, "targets": [{"owner": "octo", "repo": "web", "project": 1}]}, "concurrency には1以上"),
+])
+def test_invalid_config(write_config, data, message):
+    with pytest.raises(RuntimeError, match=message):
+        load_config(write_config(data), REMOTE)
+
+
+def test_duplicate_targets(tmp_path, write_config):
+    target = {"owner": "octo", "repo": "web", "project": 1, "path": str(tmp_path)}
+    with pytest.raises(RuntimeError, match="重複しています: octo/web#1"):
+        load_config(write_config({"targets": [target, target]}), REMOTE)
+
+
+def test_worktree_paths_do_not_collide_between_targets(tmp_path):
+    web = worktree._worktree_path(5, tmp_path, "octo/web#1")
+    api = worktree._worktree_path(5, tmp_path, "octo/api#3")
+
+    assert web != api
+    assert web.name == api.name == "issue_5"
+    assert web.parent.parent == worktree.WORKTREE_DIR
@@ -0,0 +1,79 @@
+"""watcher.BoardWatcher（ボードとPRコメントの差分同期）のテスト"""
+
+import pytest
+
+import watcher
+from prompt_budget import EXECUTOR_COMMENT_MARKER
+
+
+@pytest.fixture
+def board_watcher(fake_github):
+    return watcher.BoardWatcher("fake", "fake", 1)
+
+
+def test_backlog_tickets_are_returned_once_until_updated(board_watcher, board):
+    assert board_watcher.sync() == [10, 20, 30]
+    assert board_watcher.sync() == []
+
+    board.set_status(5, "Backlog")
+    assert board_watcher.sync() == [5]
+
+    # Backlog から出て戻ってきたチケットは再び返す
+    board.set_status(10, "In progress")
+    assert board_watcher.sync() == []
+    board.set_status(10, "Backlog")
+    assert board_watcher.sync() == [10]
+
+
+def test_incremental_sync_until_full_sync_is_due(board_watcher, board, monkeypatch):
+    board_watcher.sync()
+    assert len(board_watcher.tickets) == 30
+
+    # 差分同期ではボードから削除されたアイテムを検出できない
+    del board.statuses[7]
+    board_watcher.sync()
+    assert 7 in board_watcher.tickets
+
+    monkeypatch.setattr(watcher, "FULL_SYNC_INTERVAL", 0)
+    board_watcher.sync()
+    assert 7 not in board_watcher.tickets
+    assert len(board_watcher.tickets) == 29
+
+
+def test_first_sync_does_not_return_existing_pr_comments(board_watcher, board):
+    board_watcher.sync()
+
+    assert board_watcher.pr_activity == set()
+
+
+def test_new_pr_comments_are_detected(board_watcher, board):
+    board_watcher.sync()
+
+    board.add_pr_comment(6, "please rename this", created_at="2030-01-01T00:00:00Z")
+    assert board_watcher.sync() == [6]
+    assert board_watcher.pr_activity == {6}
+
+    # 前回と同じ秒に付いたコメントも検出する
+    board.add_pr_comment(6, "and add a test", created_at="2030-01-01T00:00:00Z")
+    assert board_watcher.sync() == [6]
+
+    assert board_watcher.sync() == []
+    assert board_watcher.pr_activity == set()
+
+
+def test_executor_comments_are_ignored(board_watcher, board):
+    board_watcher.sync()
+
+    board.add_pr_comment(9, f"## {EXECUTOR_COMMENT_MARKER}", created_at="2030-01-01T00:00:00Z")
+    assert board_watcher.sync() == []
+
+
+def test_pr_comments_for_backlog_ticket_are_not_duplicated(board_watcher, board):
+    board_watcher.sync()
+
+    board.set_status(30, "In progress")
+    board_watcher.sync()
+    board.set_status(30, "Backlog")
+    board.add_pr_comment(30, "one more thing", created_at="2030-01-01T00:00:00Z")
+    assert board_watcher.sync() == [30]
+    assert board_watcher.pr_activity == {30}
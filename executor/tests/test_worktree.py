@@ -0,0 +1,82 @@
+"""チケット用のworktreeの作成のテスト"""
+
+import subprocess
+
+import pytest
+
+import worktree
+
+
+def _git(cwd, *args):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def _commit(cwd, message):
+    _git(cwd, "commit", "-q", "--allow-empty", "-m", message)
+    return _git(cwd, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def clone(tmp_path, monkeypatch):
+    """origin（ベアリポジトリ）とそのクローン（masterをチェックアウト済み）を用意する"""
+    monkeypatch.setattr(worktree, "WORKTREE_DIR", tmp_path / "worktrees")
+    for name, value in {
+        "GIT_AUTHOR_NAME": "test", "GIT_AUTHOR_EMAIL": "test@example.com",
+        "GIT_COMMITTER_NAME": "test", "GIT_COMMITTER_EMAIL": "test@example.com",
+    }.items():
+        monkeypatch.setenv(name, value)
+
+    origin = tmp_path / "origin.git"
+    _git(tmp_path, "init", "-q", "--bare", "-b", "master", str(origin))
+    upstream = tmp_path / "upstream"
+    _git(tmp_path, "clone", "-q", str(origin), str(upstream))
+    _git(upstream, "checkout", "-q", "-b", "master")
+    _commit(upstream, "initial")
+    _git(upstream, "push", "-q", "origin", "master")
+
+    local = tmp_path / "local"
+    _git(tmp_path, "clone", "-q", str(origin), str(local))
+    return upstream, local
+
+
+def test_new_branch_starts_from_latest_origin_master(clone):
+    upstream, local = clone
+    # クローンした後にmasterが進んでいても、ローカルのHEADではなく最新のmasterから作成する
+    latest = _commit(upstream, "newer")
+    _git(upstream, "push", "-q", "origin", "master")
+
+    path = worktree.create_worktree(7, local)
+    try:
+        assert _git(path, "branch", "--show-current") == "feature/7"
+        assert _git(path, "rev-parse", "HEAD") == latest
+        # origin/master を追跡しない（push先がmasterにならない）
+        assert _git(local, "config", "--default", "", "branch.feature/7.merge") == ""
+        assert _git(local, "branch", "--show-current") == "master"
+    finally:
+        worktree.remove_worktree(path, local)
+
+
+def test_existing_remote_branch_is_checked_out(clone):
+    upstream, local = clone
+    _git(upstream, "checkout", "-q", "-b", "feature/8")
+    tip = _commit(upstream, "work on #8")
+    _git(upstream, "push", "-q", "origin", "feature/8")
+
+    path = worktree.create_worktree(8, local)
+    try:
+        assert _git(path, "branch", "--show-current") == "feature/8"
+        assert _git(path, "rev-parse", "HEAD") == tip
+        assert _git(path, "rev-parse", "--abbrev-ref", "@{upstream}") == "origin/feature/8"
+    finally:
+        worktree.remove_worktree(path, local)
+
+    # 2回目の実行では、残ったローカルブランチをリモートに追いつかせて使う
+    newer = _commit(upstream, "more work on #8")
+    _git(upstream, "push", "-q", "origin", "feature/8")
+    path = worktree.create_worktree(8, local)
+    try:
+        assert _git(path, "rev-parse", "HEAD") == newer
+    finally:
+        worktree.remove_worktree(path, local)
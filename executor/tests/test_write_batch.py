@@ -0,0 +1,73 @@
+"""github.WriteBatch のテスト"""
+
+import os
+
+import pytest
+
+import github
+from conftest import EXECUTOR_DIR
+
+
+@pytest.fixture(params=["http", "gh"])
+def transport(request, monkeypatch):
+    """HTTPクライアントとスタブの gh コマンドの両方で実行する"""
+    monkeypatch.setenv("EXECUTOR_GITHUB_TRANSPORT", request.param)
+    if request.param == "gh":
+        bin_dir = EXECUTOR_DIR / "benchmarks" / "bin"
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    return request.param
+
+
+def test_failed_alias_does_not_lose_other_results(fake_github, board, transport):
+    batch = github.WriteBatch("fake", "fake")
+    batch.add_comment(3, "123")
+    batch.add_reaction("INVALID_comment", "+1")
+    batch.update_status(1, 3, "Done")
+
+    comment, reaction, status = batch.execute()
+
+    assert comment.ok and comment.data["commentEdge"]["node"]["id"]
+    assert not reaction.ok
+    assert reaction.data is None
+    assert "Could not resolve to a node" in reaction.error
+    assert status.ok and status.data == {"projectV2Item": {"id": "PVTI_3"}}
+    assert len(batch) == 0
+
+
+@pytest.mark.parametrize("body", ["123", "true", "@/etc/hostname", "line\nwith \"quotes\""])
+def test_comment_body_is_sent_as_string(fake_github, board, transport, body):
+    batch = github.WriteBatch("fake", "fake")
+    batch.add_comment(3, body)
+
+    [result] = batch.execute()
+
+    assert result.ok
+    assert board.added_comment_bodies == [body]
+
+
+def test_error_without_path_does_not_fail_successful_operations(fake_github, board):
+    # リアクションの追加はIDの解決が不要なので、障害はミューテーションに注入される
+    board.faults.append("graphql_notice")
+    batch = github.WriteBatch("fake", "fake")
+    batch.add_reaction("IC_3_0", "+1")
+    batch.add_reaction("INVALID_comment", "+1")
+
+    added, reaction = batch.execute()
+
+    assert added.ok and added.error is None
+    assert not reaction.ok
+    assert "Could not resolve to a node" in reaction.error
+    assert "IP allow list" not in reaction.error
+
+
+def test_error_without_path_fails_operations_without_results(fake_github, board):
+    # 処理されずに data が返されなかった場合は、どの操作のものでもないエラーを各操作の失敗の理由にする
+    board.faults.append("graphql_error")
+    batch = github.WriteBatch("fake", "fake")
+    batch.add_reaction("IC_3_0", "+1")
+    batch.add_reaction("IC_6_0", "+1")
+
+    results = batch.execute()
+
+    assert [result.ok for result in results] == [False, False]
+    assert all("Something went wrong" in result.error for result in results)
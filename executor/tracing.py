@@ -0,0 +1,262 @@
+"""実行パイプラインのスパン計測（Chromeトレース形式で出力）
+
+GitHub API呼び出し、プロンプト生成、Claude Codeの実行、結果の報告などをスパンで囲み、
+1回の実行ごとに Chrome トレース（chrome://tracing や https://ui.perfetto.dev で開けるJSON）
+として出力します。
+
+トレースは trace_scope() の中でのみ記録されます。無効の場合（既定）は span() と
+traced() がコンテキスト変数を1回参照するだけなので、オーバーヘッドは無視できます。
+
+環境変数:
+    EXECUTOR_TRACE: "1" を指定するとトレースを有効にする（execute.py の --trace と同じ）
+
+使用例:
+    with tracing.trace_scope() as tracer:
+        with tracing.span("prepare", issue=12):
+            ...
+        if tracer:
+            tracer.export_path = Path("logs/issue_12.trace.json")
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+_enabled = os.environ.get("EXECUTOR_TRACE") == "1"
+
+_current: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar(
+    "executor_tracer", default=None
+)
+
+
+def set_enabled(enabled: bool) -> None:
+    """トレースの有効・無効を切り替える
+
+    Args:
+        enabled: Trueの場合は以降の trace_scope() でトレースを記録する
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    """トレースが有効かどうか"""
+    return _enabled
+
+
+class Tracer:
+    """1回の実行のスパンを記録する
+
+    複数スレッドから同時に記録しても安全です（スパンはスレッドごとのトラックに表示されます）。
+    """
+
+    def __init__(self, name: str = "executor"):
+        """初期化
+
+        Args:
+            name: トレースに表示するプロセス名
+        """
+        self.name = name
+        self.export_path: Optional[Path] = None
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._events: list[dict[str, Any]] = []
+        self._threads: dict[int, str] = {}
+
+    def add(
+        self, name: str, category: str, start_ns: int, end_ns: int, args: Optional[dict[str, Any]] = None
+    ) -> None:
+        """完了したスパンを記録
+
+        Args:
+            name: スパン名
+            category: カテゴリ（"github"、"claude" など）
+            start_ns: 開始時刻（time.perf_counter_ns）
+            end_ns: 終了時刻（time.perf_counter_ns）
+            args: スパンに付ける属性
+        """
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": self._pid,
+            "tid": thread.native_id,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+            self._threads.setdefault(thread.native_id, thread.name)
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Chromeトレース形式に変換
+
+        Returns:
+            {"traceEvents": [...], "displayTimeUnit": "ms"} の辞書
+        """
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+
+        metadata = [{"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": self.name}}]
+        metadata.extend(
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        )
+        return {"traceEvents": metadata + events, "displayTimeUnit": "ms"}
+
+    def export(self, path: Optional[Path] = None) -> Path:
+        """トレースをJSONファイルに書き出す
+
+        Args:
+            path: 出力先（Noneの場合は export_path）
+
+        Returns:
+            出力したファイルのパス
+        """
+        path = Path(path or self.export_path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return path
+
+
+class _NullSpan:
+    """トレース無効時のスパン（何もしない）"""
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+    def set(self, **args: Any) -> None:
+        """属性を追加（何もしない）"""
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """with ブロックの実行時間を記録するスパン"""
+
+    __slots__ = ("_tracer", "_name", "_category", "_args", "_start_ns")
+
+    def __init__(self, tracer: Tracer, name: str, category: str, args: dict[str, Any]):
+        self._tracer = tracer
+        self._name = name
+        self._category = category
+        self._args = args
+
+    def __enter__(self) -> "_Span":
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        end_ns = time.perf_counter_ns()
+        if exc is not None:
+            self._args["error"] = f"{exc_type.__name__}: {exc}"
+        self._tracer.add(self._name, self._category, self._start_ns, end_ns, self._args)
+
+    def set(self, **args: Any) -> None:
+        """属性を追加
+
+        Args:
+            **args: スパンに付ける属性
+        """
+        self._args.update(args)
+
+
+def current_tracer() -> Optional[Tracer]:
+    """現在のコンテキストのTracerを取得
+
+    Returns:
+        Tracer（トレース中でない場合はNone）
+    """
+    return _current.get()
+
+
+def span(name: str, category: str = "executor", **args: Any) -> Any:
+    """with ブロックをスパンとして記録
+
+    Args:
+        name: スパン名
+        category: カテゴリ
+        **args: スパンに付ける属性
+
+    Returns:
+        コンテキストマネージャ（.set() で属性を追加できる）
+    """
+    tracer = _current.get()
+    if tracer is None:
+        return _NULL_SPAN
+    return _Span(tracer, name, category, args)
+
+
+def traced(name: Optional[str] = None, category: str = "executor") -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """関数の呼び出しをスパンとして記録するデコレータ
+
+    Args:
+        name: スパン名（Noneの場合は関数名）
+        category: カテゴリ
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            tracer = _current.get()
+            if tracer is None:
+                return func(*args, **kwargs)
+            with _Span(tracer, span_name, category, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextlib.contextmanager
+def trace_scope(name: str = "executor") -> Iterator[Optional[Tracer]]:
+    """トレースの記録範囲を開始
+
+    トレースが無効の場合や、既に記録中の場合は新しいTracerを作りません。
+    終了時に Tracer.export_path が設定されていれば、トレースを書き出します。
+
+    Args:
+        name: トレースに表示するプロセス名
+
+    Yields:
+        記録中のTracer（トレースが無効の場合はNone）
+    """
+    tracer = _current.get()
+    if tracer is not None or not _enabled:
+        yield tracer
+        return
+
+    tracer = Tracer(name)
+    token = _current.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current.reset(token)
+        if tracer.export_path is not None:
+            try:
+                tracer.export()
+            except OSError as e:
+                print(f"⚠ トレースの書き出し中にエラーが発生しました: {e}", file=sys.stderr)
@@ -0,0 +1,149 @@
+"""GitHub Projectのボード状態を保持し、差分だけを同期するモジュール"""
+
+import re
+import time
+from typing import Any, Optional
+
+from github import fetch_tickets_iter, get_open_pr_activity
+from prompt_budget import is_executor_comment
+
+# 差分同期だけでは検出できない変化（ボードからの削除など）を拾うための全件同期の間隔（秒）
+FULL_SYNC_INTERVAL = 60 * 60
+
+# 実行対象とするStatus
+BACKLOG_STATUS = "Backlog"
+
+# チケットのブランチ名（feature/{issue_number}）
+FEATURE_BRANCH_PATTERN = re.compile(r"^feature/(\d+)$")
+
+
+class BoardWatcher:
+    """ボード状態をメモリ上に保持し、更新のあったアイテムだけを取得して同期する
+
+    sync() を呼ぶたびに、新たに Backlog に入ったチケットと、
+    `feature/{issue_number}` のPRに新しいコメント（botやexecutor自身の結果コメントを除く）が
+    付いたチケットを返します。
+    一度返したBacklogのチケットは、アイテムが更新されるまで再び返しません。
+    初回の同期ではPRコメントの状態を取り込むだけで、PRコメントによる実行対象は返しません。
+
+    Attributes:
+        tickets: Issue番号をキーとするボード上のチケット情報
+        pr_activity: 直前の sync() で、新しいPRコメントが付いたために返したIssue番号
+    """
+
+    def __init__(self, owner: str, repo: str, project_number: int):
+        """初期化
+
+        Args:
+            owner: リポジトリオーナー
+            repo: リポジトリ名
+            project_number: プロジェクト番号
+        """
+        self.owner = owner
+        self.repo = repo
+        self.project_number = project_number
+
+        self.tickets: dict[int, dict[str, Any]] = {}
+        self.pr_activity: set[int] = set()
+        self._watermark: Optional[str] = None
+        self._last_full_sync = 0.0
+        self._pr_watermark: Optional[str] = None
+        self._seen_comments: dict[int, set[str]] = {}
+        self._dispatched: dict[int, Optional[str]] = {}
+
+    def _sync_board(self) -> None:
+        """ボードのアイテムを同期（前回以降に更新されたものだけを取得）"""
+        full_sync = (
+            self._watermark is None
+            or time.monotonic() - self._last_full_sync >= FULL_SYNC_INTERVAL
+        )
+
+        if full_sync:
+            tickets = {}
+            for ticket in fetch_tickets_iter(self.owner, self.repo, self.project_number):
+                tickets[ticket["number"]] = ticket
+            self.tickets = tickets
+            self._last_full_sync = time.monotonic()
+        else:
+            for ticket in fetch_tickets_iter(
+                self.owner, self.repo, self.project_number, updated_since=self._watermark
+            ):
+                self.tickets[ticket["number"]] = ticket
+
+        # サーバー側の更新日時を基準にすることで、ローカルの時計のずれの影響を受けない
+        updated = [t["updated_at"] for t in self.tickets.values() if t.get("updated_at")]
+        if updated:
+            self._watermark = max(updated)
+
+    def _sync_pr_comments(self) -> list[int]:
+        """チケットのPRに付いた新しいコメントを検出
+
+        PRごとに最近の数件のコメントを確認するため、人間のコメントの直後にbotやCIの
+        コメントが続いても検出できます。
+        コメントの作成日時とPRの更新日時は秒単位で、コメントするとPRの更新日時も同じ秒に
+        なるため、前回確認したPRのコメントは日時ではなくIDで新しいものを判定します。
+        前回の一覧になかったPRは、前回の更新日時と同じ秒以降のコメントを新しいものとみなします。
+
+        Returns:
+            前回の同期以降に新しいコメントが付いたPRに対応するIssue番号のリスト
+        """
+        activity = get_open_pr_activity(self.owner, self.repo)
+
+        previous = self._pr_watermark
+        updated = [pr["updated_at"] for pr in activity if pr.get("updated_at")]
+        self._pr_watermark = max([*updated, previous or ""])
+
+        seen = self._seen_comments
+        self._seen_comments = {
+            pr["number"]: {comment.get("id") for comment in pr.get("recent_comments") or []}
+            for pr in activity
+        }
+
+        if previous is None:
+            return []
+
+        issue_numbers = []
+        for pr in activity:
+            match = FEATURE_BRANCH_PATTERN.match(pr.get("head_ref_name") or "")
+            if not match:
+                continue
+            seen_ids = seen.get(pr["number"])
+            if not any(
+                (
+                    comment.get("id") not in seen_ids if seen_ids is not None
+                    else (comment.get("created_at") or "") >= previous
+                )
+                and not is_executor_comment(comment)
+                for comment in pr.get("recent_comments") or []
+            ):
+                continue
+            issue_number = int(match.group(1))
+            if issue_number in self.tickets:
+                issue_numbers.append(issue_number)
+
+        return issue_numbers
+
+    def sync(self) -> list[int]:
+        """ボードとPRコメントを同期し、実行対象のチケットを返す
+
+        Returns:
+            実行対象のIssue番号のリスト（Backlogのチケット、新しいPRコメントが付いたチケットの順）
+        """
+        self._sync_board()
+
+        candidates = []
+        for number, ticket in self.tickets.items():
+            if ticket.get("status") != BACKLOG_STATUS:
+                continue
+            if number in self._dispatched and self._dispatched[number] == ticket.get("updated_at"):
+                continue
+            self._dispatched[number] = ticket.get("updated_at")
+            candidates.append(number)
+
+        pr_activity = self._sync_pr_comments()
+        self.pr_activity = set(pr_activity)
+        for number in pr_activity:
+            if number not in candidates:
+                candidates.append(number)
+
+        return candidates
@@ -0,0 +1,110 @@
+"""チケットごとのgit worktreeを管理するモジュール"""
+
+import hashlib
+import re
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+# worktreeの作成先
+WORKTREE_DIR = Path(__file__).parent / "worktrees"
+
+# ブランチの取得元のリモートと、新しいブランチの作成元のブランチ
+REMOTE = "origin"
+BASE_BRANCH = "master"
+
+
+def _run_git(args: list[str], cwd: Path | None = None) -> subprocess.CompletedProcess:
+    """gitコマンドを実行"""
+    return subprocess.run(
+        ["git", *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+
+def _worktree_path(issue_number: int, repo_dir: Optional[Path], namespace: Optional[str]) -> Path:
+    """worktreeの作成先（別のリポジトリ・ターゲットのworktreeはそれぞれのディレクトリに分ける）"""
+    if namespace is not None:
+        name = re.sub(r"[^\w.-]+", "_", namespace)
+    elif repo_dir is not None:
+        namespace = str(repo_dir.resolve())
+        name = repo_dir.resolve().name
+    else:
+        return WORKTREE_DIR / f"issue_{issue_number}"
+    digest = hashlib.sha256(namespace.encode()).hexdigest()[:8]
+    return WORKTREE_DIR / f"{name}_{digest}" / f"issue_{issue_number}"
+
+
+def _has_ref(ref: str, repo_dir: Optional[Path]) -> bool:
+    """参照が存在するかどうか"""
+    return _run_git(["rev-parse", "--verify", "--quiet", ref], cwd=repo_dir).returncode == 0
+
+
+def create_worktree(
+    issue_number: int, repo_dir: Optional[Path] = None, namespace: Optional[str] = None
+) -> Path:
+    """チケット用のworktreeを作成
+
+    複数のチケットを並行して実行しても `feature/{issue_number}` のチェックアウトが
+    衝突しないよう、チケットごとに独立した作業ディレクトリを用意します。
+    `git fetch` のあと、worktreeには `feature/{issue_number}` をチェックアウトします。
+    ブランチがなければ、リモートの同名ブランチ、なければ最新の `origin/master` から作成します。
+    masterは他の作業ツリーでチェックアウトされていることが多いため、worktreeでは扱いません。
+
+    Args:
+        issue_number: Issue番号
+        repo_dir: worktreeを作成するリポジトリのディレクトリ（Noneの場合はカレントディレクトリ）
+        namespace: worktreeの作成先を分けるための名前（例: Target.key）。
+            別のリポジトリの同じ番号のIssueを並行して実行しても作成先が衝突しない
+
+    Returns:
+        worktreeのパス
+
+    Raises:
+        RuntimeError: worktreeの作成に失敗した場合
+    """
+    path = _worktree_path(issue_number, repo_dir, namespace)
+    branch = f"feature/{issue_number}"
+    remote_branch = f"{REMOTE}/{branch}"
+
+    # 前回の実行で残ったworktreeがあれば削除する
+    if path.exists():
+        remove_worktree(path, repo_dir)
+    _run_git(["worktree", "prune"], cwd=repo_dir)
+
+    result = _run_git(["fetch", REMOTE], cwd=repo_dir)
+    if result.returncode != 0:
+        raise RuntimeError(f"{REMOTE} の取得に失敗しました: {result.stderr.strip()}")
+
+    has_remote_branch = _has_ref(f"refs/remotes/{remote_branch}", repo_dir)
+    if _has_ref(f"refs/heads/{branch}", repo_dir):
+        args = [str(path), branch]
+    elif has_remote_branch:
+        args = ["--track", "-b", branch, str(path), remote_branch]
+    else:
+        # origin/master を追跡させると、push先がmasterになってしまう
+        args = ["--no-track", "-b", branch, str(path), f"{REMOTE}/{BASE_BRANCH}"]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    result = _run_git(["worktree", "add", *args], cwd=repo_dir)
+    if result.returncode != 0:
+        raise RuntimeError(f"worktreeの作成に失敗しました: {result.stderr.strip()}")
+
+    # ローカルのブランチがリモートより古ければ追いつかせる（分岐している場合はそのまま）
+    if has_remote_branch:
+        _run_git(["merge", "--ff-only", remote_branch], cwd=path)
+
+    return path
+
+
+def remove_worktree(path: Path, repo_dir: Optional[Path] = None) -> None:
+    """worktreeを削除
+
+    Args:
+        path: worktreeのパス
+        repo_dir: worktreeを作成したリポジトリのディレクトリ（Noneの場合はカレントディレクトリ）
+    """
+    _run_git(["worktree", "remove", "--force", str(path)], cwd=repo_dir)